@@ -0,0 +1,78 @@
+import { useState, useEffect, useCallback, useMemo } from 'react';
+import { AttendanceStatus, Subject } from '@/types';
+import { useAuth } from '@/contexts/AuthContext';
+import { attendanceApi } from '@/lib/api';
+import { decodeBitmap, getDayStatus, setDayStatus } from '@/lib/calendarBitmap';
+
+// Attendance for one month (YYYY-MM) across all subjects, loaded as a packed bitmap
+export function useCalendarMonth(subjects: Subject[], month: string) {
+  const { user } = useAuth();
+  const [bytes, setBytes] = useState<Uint8Array>(new Uint8Array(0));
+  const [isLoading, setIsLoading] = useState(true);
+
+  const subjectIds = useMemo(() => subjects.map(s => s.id), [subjects]);
+  const rowOf = useMemo(
+    () => new Map(subjectIds.map((id, index) => [id, index])),
+    [subjectIds]
+  );
+
+  const loadMonth = useCallback(async () => {
+    if (!user || subjectIds.length === 0) {
+      setBytes(new Uint8Array(0));
+      setIsLoading(false);
+      return;
+    }
+
+    setIsLoading(true);
+    const { data, error } = await attendanceApi.getCalendar(month, subjectIds);
+
+    if (data && !error) {
+      setBytes(decodeBitmap(data.bitmap));
+    } else {
+      console.error('Failed to load calendar:', error);
+      setBytes(new Uint8Array(0));
+    }
+    setIsLoading(false);
+  }, [user, month, subjectIds]);
+
+  useEffect(() => {
+    loadMonth();
+  }, [loadMonth]);
+
+  const getAttendanceForDate = (subjectId: string, date: string): AttendanceStatus | null => {
+    const row = rowOf.get(subjectId);
+    if (row === undefined || date.slice(0, 7) !== month) return null;
+    return getDayStatus(bytes, row, Number(date.slice(8, 10)));
+  };
+
+  const markAttendance = async (
+    subjectId: string,
+    date: string,
+    status: AttendanceStatus
+  ): Promise<{ error: Error | null }> => {
+    if (!user) return { error: new Error('Not authenticated') };
+
+    const { data, error } = await attendanceApi.mark(
+      subjectId,
+      date,
+      status as 'present' | 'absent'
+    );
+
+    if (error || !data) {
+      return { error: new Error(error || 'Failed to mark attendance') };
+    }
+
+    const row = rowOf.get(subjectId);
+    if (row !== undefined && date.slice(0, 7) === month) {
+      setBytes(prev => setDayStatus(prev, row, Number(date.slice(8, 10)), status));
+    }
+    return { error: null };
+  };
+
+  return {
+    isLoading,
+    getAttendanceForDate,
+    markAttendance,
+    refetch: loadMonth,
+  };
+}
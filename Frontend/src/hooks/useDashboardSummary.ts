@@ -0,0 +1,51 @@
+import { useState, useEffect, useCallback } from 'react';
+import { DashboardStats } from '@/types';
+import { useAuth } from '@/contexts/AuthContext';
+import { attendanceApi } from '@/lib/api';
+
+const EMPTY_STATS: DashboardStats = {
+  totalSubjects: 0,
+  overallPercentage: 0,
+  totalPresent: 0,
+  totalAbsent: 0,
+  totalLeave: 0,
+  subjectStats: [],
+};
+
+// refreshKey: the summary is refetched whenever it changes (e.g. the subject ids)
+export function useDashboardSummary(refreshKey = '') {
+  const { user } = useAuth();
+  const [stats, setStats] = useState<DashboardStats>(EMPTY_STATS);
+  const [isLoading, setIsLoading] = useState(true);
+
+  // Totals are computed server-side in one aggregation, so the dashboard
+  // never has to download raw attendance records
+  const loadSummary = useCallback(async () => {
+    if (!user) {
+      setStats(EMPTY_STATS);
+      setIsLoading(false);
+      return;
+    }
+
+    setIsLoading(true);
+    const { data, error } = await attendanceApi.getSummary();
+
+    if (data && !error) {
+      setStats(data as DashboardStats);
+    } else {
+      console.error('Failed to load dashboard summary:', error);
+      setStats(EMPTY_STATS);
+    }
+    setIsLoading(false);
+  }, [user, refreshKey]);
+
+  useEffect(() => {
+    loadSummary();
+  }, [loadSummary]);
+
+  return {
+    stats,
+    isLoading,
+    refetch: loadSummary,
+  };
+}
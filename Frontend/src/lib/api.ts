@@ -2,9 +2,20 @@
  * API Service - Connects React frontend to FastAPI backend
  */
 
+import type { CalendarMonth } from "./calendarBitmap";
+import { expandColumnar } from "./columnar";
+import { decodeMsgpack } from "./msgpack";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// List endpoints are requested as columnar tables (each key sent once), and
+// as MessagePack when VITE_API_MSGPACK=true; gzip/brotli is negotiated by
+// the browser itself
+const COMPACT_ACCEPT =
+  import.meta.env.VITE_API_MSGPACK === "true"
+    ? "application/msgpack; layout=columnar, application/json; layout=columnar; q=0.9"
+    : "application/json; layout=columnar";
+
 interface ApiResponse<T> {
   data?: T;
   error?: string;
@@ -13,8 +24,13 @@ interface ApiResponse<T> {
 // Auth token handling
 let authToken: string | null = null;
 
+// Last response body per GET URL with its ETag, so unchanged data can be
+// revalidated with If-None-Match and served from memory on a 304
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
 export function setAuthToken(token: string | null) {
   authToken = token;
+  etagCache.clear();
   if (token) {
     localStorage.setItem("auth_token", token);
   } else {
@@ -31,12 +47,13 @@ export function getAuthToken(): string | null {
 
 async function apiRequest<T>(
   endpoint: string,
-  options: RequestInit = {}
+  { compact = false, ...options }: RequestInit & { compact?: boolean } = {}
 ): Promise<ApiResponse<T>> {
   const token = getAuthToken();
 
   const headers: HeadersInit = {
     "Content-Type": "application/json",
+    ...(compact ? { Accept: COMPACT_ACCEPT } : {}),
     ...(options.headers || {}),
   };
 
@@ -44,18 +61,37 @@ async function apiRequest<T>(
     (headers as Record<string, string>)["Authorization"] = `Bearer ${token}`;
   }
 
+  const isGet = !options.method || options.method === "GET";
+  const cached = isGet ? etagCache.get(endpoint) : undefined;
+  if (cached) {
+    (headers as Record<string, string>)["If-None-Match"] = cached.etag;
+  }
+
   try {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       ...options,
       headers,
     });
 
-    const data = await response.json();
+    if (response.status === 304 && cached) {
+      return { data: cached.data as T };
+    }
+
+    const contentType = response.headers.get("Content-Type") || "";
+    const body = contentType.startsWith("application/msgpack")
+      ? decodeMsgpack(new Uint8Array(await response.arrayBuffer()))
+      : await response.json();
+    const data = compact ? expandColumnar(body) : body;
 
     if (!response.ok) {
       return { error: data.detail || "Request failed" };
     }
 
+    const etag = response.headers.get("ETag");
+    if (isGet && etag) {
+      etagCache.set(endpoint, { etag, data });
+    }
+
     return { data };
   } catch (error) {
     console.error("API Error:", error);
@@ -94,7 +130,7 @@ export const authApi = {
 
 export const subjectsApi = {
   async getAll() {
-    return apiRequest("/api/subjects");
+    return apiRequest("/api/subjects", { compact: true });
   },
 
   async create(name: string) {
@@ -104,11 +140,16 @@ export const subjectsApi = {
     });
   },
 
+  // Returns 202 with the deletion status; attendance is removed in the background
   async delete(id: string) {
     return apiRequest(`/api/subjects/${id}`, {
       method: "DELETE",
     });
   },
+
+  async getDeletionStatus(id: string) {
+    return apiRequest(`/api/subjects/${id}/deletion`);
+  },
 };
 
 
@@ -117,8 +158,40 @@ export const subjectsApi = {
 // ---------------- ATTENDANCE API ----------------
 
 export const attendanceApi = {
-  async getBySubject(subjectId: string) {
-    return apiRequest(`/api/attendance/${subjectId}`);
+  async getSummary(params: { from?: string; to?: string } = {}) {
+    const query = new URLSearchParams();
+    if (params.from) query.set("from", params.from);
+    if (params.to) query.set("to", params.to);
+    const qs = query.toString();
+    return apiRequest(`/api/attendance/summary${qs ? `?${qs}` : ""}`);
+  },
+
+  // One month as a packed 2-bit bitmap per subject (decode with lib/calendarBitmap)
+  async getCalendar(month: string, subjectIds: string[] = []) {
+    const query = new URLSearchParams({ month });
+    if (subjectIds.length > 0) query.set("subject_ids", subjectIds.join(","));
+    return apiRequest<CalendarMonth>(`/api/attendance/calendar?${query.toString()}`);
+  },
+
+  // Classes to attend / safe to skip per subject; remaining is N or "subjectId:N,..."
+  async getProjection(target = 75, remaining?: string) {
+    const query = new URLSearchParams({ target: String(target) });
+    if (remaining) query.set("remaining", remaining);
+    return apiRequest(`/api/attendance/projection?${query.toString()}`);
+  },
+
+  async getBySubject(
+    subjectId: string,
+    params: { from?: string; to?: string; limit?: number; after?: string } = {}
+  ) {
+    const query = new URLSearchParams();
+    if (params.from) query.set("from", params.from);
+    if (params.to) query.set("to", params.to);
+    if (params.limit) query.set("limit", String(params.limit));
+    if (params.after) query.set("after", params.after);
+    const qs = query.toString();
+    // Returns { records, next_cursor }
+    return apiRequest(`/api/attendance/${subjectId}${qs ? `?${qs}` : ""}`, { compact: true });
   },
 
   async mark(subjectId: string, date: string, status: "present" | "absent") {
@@ -132,6 +205,25 @@ export const attendanceApi = {
     });
   },
 
+  async markBulk(
+    records: { subject_id: string; date: string; status: "present" | "absent" | "leave" }[]
+  ) {
+    return apiRequest("/api/attendance/bulk", {
+      method: "POST",
+      body: JSON.stringify({ records }),
+    });
+  },
+
+  async importFile(file: File, createMissingSubjects = false) {
+    const isNdjson = /\.(ndjson|jsonl)$/i.test(file.name);
+    const query = createMissingSubjects ? "?create_missing_subjects=true" : "";
+    return apiRequest(`/api/attendance/import${query}`, {
+      method: "POST",
+      headers: { "Content-Type": isNdjson ? "application/x-ndjson" : "text/csv" },
+      body: file,
+    });
+  },
+
   async getStats(subjectId: string) {
     return apiRequest(`/api/attendance/${subjectId}/stats`);
   },
@@ -0,0 +1,51 @@
+/**
+ * Decoder for GET /api/attendance/calendar
+ *
+ * Each subject has a fixed 8-byte row; day d (1-based) uses the 2 bits at
+ * bit offset (d - 1) * 2 of the row: 0 none, 1 present, 2 absent, 3 leave.
+ */
+
+import { AttendanceStatus } from '@/types';
+
+export const CALENDAR_ROW_BYTES = 8;
+
+const STATUSES: (AttendanceStatus | null)[] = [null, 'present', 'absent', 'leave'];
+const CODES: Record<AttendanceStatus, number> = { present: 1, absent: 2, leave: 3 };
+
+export interface CalendarMonth {
+  month: string;
+  days: number;
+  bitmap: string;
+  subject_ids?: string[];
+}
+
+export function decodeBitmap(bitmap: string): Uint8Array {
+  const binary = atob(bitmap);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+export function getDayStatus(bytes: Uint8Array, row: number, day: number): AttendanceStatus | null {
+  const slot = (day - 1) * 2;
+  const byte = bytes[row * CALENDAR_ROW_BYTES + (slot >> 3)] ?? 0;
+  return STATUSES[(byte >> (slot & 7)) & 3];
+}
+
+/** Returns a copy of bytes with one day updated (for optimistic updates). */
+export function setDayStatus(
+  bytes: Uint8Array,
+  row: number,
+  day: number,
+  status: AttendanceStatus | null
+): Uint8Array {
+  const next = new Uint8Array(Math.max(bytes.length, (row + 1) * CALENDAR_ROW_BYTES));
+  next.set(bytes);
+  const slot = (day - 1) * 2;
+  const index = row * CALENDAR_ROW_BYTES + (slot >> 3);
+  const shift = slot & 7;
+  next[index] = (next[index] & ~(3 << shift)) | ((status ? CODES[status] : 0) << shift);
+  return next;
+}
@@ -0,0 +1,47 @@
+/**
+ * Expands `layout=columnar` API responses back to rows
+ *
+ * A columnar table sends each key once: values shared by every row in
+ * `constants`, the rest as one array per key in `columns`.
+ */
+
+export interface ColumnarTable {
+  layout: "columnar";
+  count: number;
+  constants: Record<string, unknown>;
+  columns: Record<string, unknown[]>;
+}
+
+function isColumnarTable(value: unknown): value is ColumnarTable {
+  return (
+    typeof value === "object" &&
+    value !== null &&
+    (value as { layout?: unknown }).layout === "columnar"
+  );
+}
+
+export function tableToRows(table: ColumnarTable): Record<string, unknown>[] {
+  const keys = Object.keys(table.columns);
+  const rows = new Array(table.count);
+  for (let i = 0; i < table.count; i++) {
+    const row: Record<string, unknown> = { ...table.constants };
+    for (const key of keys) row[key] = table.columns[key][i];
+    rows[i] = row;
+  }
+  return rows;
+}
+
+/** Replaces a top-level table, or tables one level down (e.g. `records`, grouped lists). */
+export function expandColumnar(data: unknown): unknown {
+  if (isColumnarTable(data)) return tableToRows(data);
+  if (typeof data !== "object" || data === null || Array.isArray(data)) return data;
+
+  let expanded: Record<string, unknown> | null = null;
+  for (const [key, value] of Object.entries(data)) {
+    if (isColumnarTable(value)) {
+      expanded = expanded ?? { ...data };
+      expanded[key] = tableToRows(value);
+    }
+  }
+  return expanded ?? data;
+}
@@ -0,0 +1,88 @@
+/**
+ * Minimal MessagePack decoder for `application/msgpack` API responses
+ *
+ * Covers what the backend sends: nil, booleans, ints, floats, strings,
+ * binary, arrays and maps (dates arrive as ISO strings, like in JSON).
+ * Extension types are rejected.
+ */
+
+const textDecoder = new TextDecoder();
+
+export function decodeMsgpack(bytes: Uint8Array): unknown {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let offset = 0;
+
+  function uint(size: 1 | 2 | 4): number {
+    const value =
+      size === 1 ? view.getUint8(offset) : size === 2 ? view.getUint16(offset) : view.getUint32(offset);
+    offset += size;
+    return value;
+  }
+
+  function str(length: number): string {
+    const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+    offset += length;
+    return value;
+  }
+
+  function bin(length: number): Uint8Array {
+    const value = bytes.slice(offset, offset + length);
+    offset += length;
+    return value;
+  }
+
+  function array(length: number): unknown[] {
+    const value = new Array(length);
+    for (let i = 0; i < length; i++) value[i] = read();
+    return value;
+  }
+
+  function map(length: number): Record<string, unknown> {
+    const value: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = String(read());
+      value[key] = read();
+    }
+    return value;
+  }
+
+  function read(): unknown {
+    const byte = view.getUint8(offset++);
+
+    if (byte <= 0x7f) return byte;
+    if (byte >= 0xe0) return byte - 0x100;
+    if ((byte & 0xe0) === 0xa0) return str(byte & 0x1f);
+    if ((byte & 0xf0) === 0x90) return array(byte & 0x0f);
+    if ((byte & 0xf0) === 0x80) return map(byte & 0x0f);
+
+    let value: number;
+    switch (byte) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return bin(uint(1));
+      case 0xc5: return bin(uint(2));
+      case 0xc6: return bin(uint(4));
+      case 0xca: value = view.getFloat32(offset); offset += 4; return value;
+      case 0xcb: value = view.getFloat64(offset); offset += 8; return value;
+      case 0xcc: return uint(1);
+      case 0xcd: return uint(2);
+      case 0xce: return uint(4);
+      case 0xcf: value = Number(view.getBigUint64(offset)); offset += 8; return value;
+      case 0xd0: value = view.getInt8(offset); offset += 1; return value;
+      case 0xd1: value = view.getInt16(offset); offset += 2; return value;
+      case 0xd2: value = view.getInt32(offset); offset += 4; return value;
+      case 0xd3: value = Number(view.getBigInt64(offset)); offset += 8; return value;
+      case 0xd9: return str(uint(1));
+      case 0xda: return str(uint(2));
+      case 0xdb: return str(uint(4));
+      case 0xdc: return array(uint(2));
+      case 0xdd: return array(uint(4));
+      case 0xde: return map(uint(2));
+      case 0xdf: return map(uint(4));
+    }
+    throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`);
+  }
+
+  return read();
+}
@@ -2,7 +2,7 @@ import { useState, useMemo } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '@/contexts/AuthContext';
 import { useSubjects } from '@/hooks/useSubjects';
-import { useAttendance } from '@/hooks/useAttendance';
+import { useCalendarMonth } from '@/hooks/useCalendarMonth';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { useToast } from '@/hooks/use-toast';
@@ -36,10 +36,13 @@ import {
 export default function AttendanceCalendar() {
   const { user, signOut } = useAuth();
   const { subjects } = useSubjects();
-  const { markAttendance, getAttendanceForDate } = useAttendance(subjects);
   const { toast } = useToast();
 
   const [currentMonth, setCurrentMonth] = useState(new Date());
+  const { markAttendance, getAttendanceForDate } = useCalendarMonth(
+    subjects,
+    format(currentMonth, 'yyyy-MM')
+  );
   const [selectedSubject, setSelectedSubject] = useState<Subject | null>(null);
   const [selectedDate, setSelectedDate] = useState<Date | null>(null);
 
@@ -2,7 +2,7 @@ import { useState } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '@/contexts/AuthContext';
 import { useSubjects } from '@/hooks/useSubjects';
-import { useAttendance } from '@/hooks/useAttendance';
+import { useDashboardSummary } from '@/hooks/useDashboardSummary';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
@@ -46,15 +46,14 @@ import {
 export default function Dashboard() {
   const { user, signOut } = useAuth();
   const { subjects, addSubject, deleteSubject } = useSubjects();
-  const { getDashboardStats } = useAttendance(subjects);
+  // Adding or deleting a subject changes the totals, so refetch the summary then
+  const { stats } = useDashboardSummary(subjects.map((s) => s.id).join(','));
   const { toast } = useToast();
   
   const [newSubjectName, setNewSubjectName] = useState('');
   const [isAddDialogOpen, setIsAddDialogOpen] = useState(false);
   const [isAddingSubject, setIsAddingSubject] = useState(false);
 
-  const stats = getDashboardStats();
-
   const handleAddSubject = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!newSubjectName.trim()) return;
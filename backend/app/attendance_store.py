@@ -0,0 +1,547 @@
+"""
+Attendance storage layouts
+The routes read and write attendance through a store so either layout works:
+
+    documents  one document per (user, subject, date) in `attendance` (default)
+        {"_id": ObjectId, "user_id", "subject_id", "date": "2024-01-05",
+         "status": "present", "created_at": datetime}
+
+    buckets    one document per (user, subject, month) in `attendance_buckets`
+        {"_id": ObjectId, "user_id", "subject_id", "month": "2024-01",
+         "days": {"05": {"s": "present", "t": datetime}, ...}}
+
+    dual       reads from documents, writes to both; used while
+               `python -m app.bucket_migration` copies existing data
+
+Pick one with ATTENDANCE_STORAGE. Every store yields records in the
+documents shape ({_id, user_id, subject_id, date, status, created_at}), so
+callers never see the layout. Bucket record ids are "<bucket id>-<day>".
+
+Queries are plain record filters on user_id / subject_id / date (equality,
+$in or ranges); the bucket store turns date conditions into month
+conditions for the bucket match and applies the exact filter after
+unwinding the days.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from app.database import get_database
+from app.serialization import ATTENDANCE_PROJECTION
+from app.settings import get_settings
+
+
+STATUSES = ("present", "absent", "leave")
+
+# Upserts in flight at once for one bulk_upsert call
+BULK_UPSERT_CONCURRENCY = 16
+
+
+def _counts(docs: List[dict]) -> dict:
+    counts = {"present": 0, "absent": 0, "leave": 0, "total": 0}
+    for doc in docs:
+        counts[doc["_id"]] = doc["count"]
+    counts["total"] = sum(counts[s] for s in STATUSES)
+    return counts
+
+
+def _bulk_errors(exc: BulkWriteError) -> Tuple[Dict[int, ObjectId], Dict[int, str]]:
+    upserted = {item["index"]: item["_id"] for item in exc.details.get("upserted", [])}
+    errors = {
+        error["index"]: error.get("errmsg", "Write failed")
+        for error in exc.details.get("writeErrors", [])
+    }
+    return upserted, errors
+
+
+async def _upsert_each(store, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+    """
+    bulk_upsert for any store: one store.upsert per item, run concurrently.
+    Each previous status comes from its own atomic write, so counter deltas
+    built from them stay exact under concurrent marks.
+    """
+    semaphore = asyncio.Semaphore(BULK_UPSERT_CONCURRENCY)
+
+    async def upsert_one(subject_id: str, date: str, status: str) -> dict:
+        async with semaphore:
+            try:
+                record, previous = await store.upsert(user_id, subject_id, date, status)
+            except PyMongoError as exc:
+                return {"previous": None, "id": None, "error": str(exc) or "Write failed"}
+        return {"previous": previous, "id": str(record["_id"]), "error": None}
+
+    return list(await asyncio.gather(*(upsert_one(*item) for item in items)))
+
+
+class DocumentStore:
+    """One document per (user, subject, date)."""
+
+    collection_name = "attendance"
+
+    def __init__(self, database):
+        self.collection = database[self.collection_name]
+
+    def record_stages(self, match: dict) -> list:
+        """Aggregation stages yielding records that match a record filter."""
+        return [{"$match": match}]
+
+    def find(
+        self,
+        query: dict,
+        sort: Optional[list] = None,
+        limit: int = 0,
+        batch_size: int = 0,
+        projection: Optional[dict] = None
+    ):
+        """Async-iterable cursor of records matching query (all record fields by default)."""
+        cursor = self.collection.find(query, projection or ATTENDANCE_PROJECTION)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
+    def aggregate_records(self, match: dict, stages: list, **kwargs):
+        return self.collection.aggregate(self.record_stages(match) + stages, **kwargs)
+
+    def lookup_stage(self, let: dict, match: dict, stages: list, as_field: str) -> dict:
+        """$lookup joining each input document with its matching records."""
+        return {"$lookup": {
+            "from": self.collection_name,
+            "let": let,
+            "pipeline": self.record_stages(match) + stages,
+            "as": as_field
+        }}
+
+    async def count_statuses(self, user_id: str, subject_id: str) -> dict:
+        """
+        Counters for one subject computed from the records.
+
+        Example MongoDB aggregation:
+        attendance.aggregate([
+            {"$match": {"subject_id": "...", "user_id": "..."}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ])
+        """
+        cursor = self.aggregate_records(
+            {"subject_id": subject_id, "user_id": user_id},
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        )
+        return _counts([doc async for doc in cursor])
+
+    async def upsert(self, user_id: str, subject_id: str, date: str, status: str) -> Tuple[dict, Optional[str]]:
+        """
+        Set the status for one day. Returns (record, previous status or None).
+
+        Example MongoDB upsert:
+        attendance.find_one_and_update(
+            {"subject_id": "...", "user_id": "...", "date": "2024-01-15"},
+            {"$set": {"status": "present"}, "$setOnInsert": {"created_at": ...}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        """
+        record_filter = {"subject_id": subject_id, "user_id": user_id, "date": date}
+        new_id = ObjectId()
+        now = datetime.utcnow()
+        update = {
+            "$set": {"status": status},
+            "$setOnInsert": {"_id": new_id, "created_at": now}
+        }
+
+        try:
+            previous = await self.collection.find_one_and_update(
+                record_filter, update, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race with a concurrent request; the record exists now
+            previous = await self.collection.find_one_and_update(
+                record_filter, update, return_document=ReturnDocument.BEFORE
+            )
+
+        record = {
+            "_id": previous["_id"] if previous else new_id,
+            "subject_id": subject_id,
+            "user_id": user_id,
+            "date": date,
+            "status": status,
+            "created_at": previous["created_at"] if previous else now,
+        }
+        return record, previous["status"] if previous else None
+
+    async def bulk_upsert(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        """
+        Set many (subject_id, date, status) items, each (subject_id, date) at
+        most once, with one find_one_and_update each (run concurrently).
+        Returns [{"previous", "id", "error"}] per item; "previous" is exact,
+        so callers can $inc counters from it.
+        """
+        return await _upsert_each(self, user_id, items)
+
+    async def bulk_set(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        """
+        Same contract as bulk_upsert, but reads the current statuses in one
+        query and then writes one unordered bulk_write. A mark landing
+        between the two makes "previous" stale, so callers must recount the
+        counters of the subjects they touched instead of applying deltas.
+        """
+        if not items:
+            return []
+
+        dates_by_subject: Dict[str, list] = {}
+        for subject_id, date, _ in items:
+            dates_by_subject.setdefault(subject_id, []).append(date)
+
+        existing = {}
+        cursor = self.collection.find(
+            {
+                "user_id": user_id,
+                "$or": [
+                    {"subject_id": subject_id, "date": {"$in": dates}}
+                    for subject_id, dates in dates_by_subject.items()
+                ]
+            },
+            {"subject_id": 1, "date": 1, "status": 1}
+        )
+        async for doc in cursor:
+            existing[(doc["subject_id"], doc["date"])] = doc
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"subject_id": subject_id, "user_id": user_id, "date": date},
+                {"$set": {"status": status}, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            )
+            for subject_id, date, status in items
+        ]
+
+        errors: Dict[int, str] = {}
+        try:
+            upserted = (await self.collection.bulk_write(operations, ordered=False)).upserted_ids
+        except BulkWriteError as exc:
+            upserted, errors = _bulk_errors(exc)
+
+        results = []
+        for index, (subject_id, date, _) in enumerate(items):
+            doc = existing.get((subject_id, date))
+            record_id = upserted.get(index) or (doc["_id"] if doc else None)
+            results.append({
+                "previous": doc["status"] if doc else None,
+                "id": str(record_id) if record_id and index not in errors else None,
+                "error": errors.get(index),
+            })
+        return results
+
+    async def delete_batch(self, user_id: str, subject_id: str, limit: int) -> int:
+        """
+        Delete up to `limit` records of a subject. Returns the number deleted.
+
+        Example MongoDB batch:
+        ids = attendance.find({"user_id": "...", "subject_id": "..."}, {"_id": 1}).limit(500)
+        attendance.delete_many({"_id": {"$in": ids}})
+        """
+        batch = await self.collection.find(
+            {"user_id": user_id, "subject_id": subject_id}, {"_id": 1}
+        ).limit(limit).to_list(length=limit)
+        if not batch:
+            return 0
+        result = await self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        return result.deleted_count
+
+
+def _is_date_range(condition) -> bool:
+    """True for no date condition or a plain $gt/$gte/$lt/$lte range."""
+    if condition is None:
+        return True
+    return isinstance(condition, dict) and set(condition) <= {"$gt", "$gte", "$lt", "$lte"}
+
+
+def _month_condition(condition):
+    """Map a date condition on YYYY-MM-DD strings to one on YYYY-MM months."""
+    if isinstance(condition, str):
+        return condition[:7]
+    month = {}
+    for op, value in condition.items():
+        if op in ("$gte", "$gt"):
+            month["$gte"] = value[:7]
+        elif op in ("$lte", "$lt"):
+            month["$lte"] = value[:7]
+        elif op == "$in":
+            month["$in"] = sorted({date[:7] for date in value})
+    return month
+
+
+class BucketStore:
+    """One document per (user, subject, month) with a day-keyed map."""
+
+    collection_name = "attendance_buckets"
+
+    def __init__(self, database):
+        self.collection = database[self.collection_name]
+
+    def _bucket_match(self, match: dict) -> Tuple[dict, Optional[dict]]:
+        bucket_match = {key: value for key, value in match.items() if key != "date"}
+        if "date" not in match:
+            return bucket_match, None
+        bucket_match["month"] = _month_condition(match["date"])
+        return bucket_match, {"date": match["date"]}
+
+    def _unwind_stages(self) -> list:
+        return [
+            {"$project": {"user_id": 1, "subject_id": 1, "month": 1, "days": {"$objectToArray": "$days"}}},
+            {"$unwind": "$days"},
+            {"$project": {
+                "_id": {"$concat": [{"$toString": "$_id"}, "-", "$days.k"]},
+                "user_id": 1,
+                "subject_id": 1,
+                "date": {"$concat": ["$month", "-", "$days.k"]},
+                "status": "$days.v.s",
+                "created_at": "$days.v.t",
+            }},
+        ]
+
+    def record_stages(self, match: dict, bucket_stages: Optional[list] = None) -> list:
+        bucket_match, record_match = self._bucket_match(match)
+        stages = [{"$match": bucket_match}, *(bucket_stages or []), *self._unwind_stages()]
+        if record_match:
+            stages.append({"$match": record_match})
+        return stages
+
+    def find(
+        self,
+        query: dict,
+        sort: Optional[list] = None,
+        limit: int = 0,
+        batch_size: int = 0,
+        projection: Optional[dict] = None
+    ):
+        bucket_stages = []
+        if limit and sort == [("date", 1)] and _is_date_range(query.get("date")):
+            # Each bucket holds at least one record. A date range can only
+            # empty its boundary months: the first (nothing past a page
+            # cursor) and the last, which ends the range anyway, so one month
+            # more than `limit` is enough
+            bucket_stages = [{"$sort": {"month": 1}}, {"$limit": limit + 1}]
+
+        pipeline = self.record_stages(query, bucket_stages)
+        if sort:
+            pipeline.append({"$sort": dict(sort)})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if projection:
+            pipeline.append({"$project": projection})
+
+        kwargs = {"batchSize": batch_size} if batch_size else {}
+        return self.collection.aggregate(pipeline, allowDiskUse=True, **kwargs)
+
+    def aggregate_records(self, match: dict, stages: list, **kwargs):
+        return self.collection.aggregate(self.record_stages(match) + stages, **kwargs)
+
+    def lookup_stage(self, let: dict, match: dict, stages: list, as_field: str) -> dict:
+        return {"$lookup": {
+            "from": self.collection_name,
+            "let": let,
+            "pipeline": self.record_stages(match) + stages,
+            "as": as_field
+        }}
+
+    async def count_statuses(self, user_id: str, subject_id: str) -> dict:
+        cursor = self.aggregate_records(
+            {"subject_id": subject_id, "user_id": user_id},
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        )
+        return _counts([doc async for doc in cursor])
+
+    async def upsert(self, user_id: str, subject_id: str, date: str, status: str) -> Tuple[dict, Optional[str]]:
+        """
+        Example MongoDB upsert:
+        attendance_buckets.find_one_and_update(
+            {"user_id": "...", "subject_id": "...", "month": "2024-01"},
+            {"$set": {"days.15.s": "present"}, "$min": {"days.15.t": now}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        """
+        month, day = date[:7], date[8:10]
+        bucket_filter = {"user_id": user_id, "subject_id": subject_id, "month": month}
+        new_id = ObjectId()
+        now = datetime.utcnow()
+        update = {
+            "$set": {f"days.{day}.s": status},
+            # $min keeps the first time the day was marked, like created_at
+            "$min": {f"days.{day}.t": now},
+            "$setOnInsert": {"_id": new_id}
+        }
+        projection = {f"days.{day}": 1}
+
+        try:
+            previous = await self.collection.find_one_and_update(
+                bucket_filter, update, projection=projection,
+                upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            previous = await self.collection.find_one_and_update(
+                bucket_filter, update, projection=projection, return_document=ReturnDocument.BEFORE
+            )
+
+        previous_day = (previous or {}).get("days", {}).get(day)
+        bucket_id = previous["_id"] if previous else new_id
+        record = {
+            "_id": f"{bucket_id}-{day}",
+            "subject_id": subject_id,
+            "user_id": user_id,
+            "date": date,
+            "status": status,
+            "created_at": previous_day["t"] if previous_day else now,
+        }
+        return record, previous_day["s"] if previous_day else None
+
+    async def bulk_upsert(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        """Same contract as DocumentStore.bulk_upsert."""
+        return await _upsert_each(self, user_id, items)
+
+    async def bulk_set(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        """
+        Same contract as DocumentStore.bulk_set; items in the same month are
+        written with a single $set on their bucket.
+        """
+        if not items:
+            return []
+
+        months_by_subject: Dict[str, set] = {}
+        for subject_id, date, _ in items:
+            months_by_subject.setdefault(subject_id, set()).add(date[:7])
+
+        existing = {}
+        cursor = self.collection.find(
+            {
+                "user_id": user_id,
+                "$or": [
+                    {"subject_id": subject_id, "month": {"$in": sorted(months)}}
+                    for subject_id, months in months_by_subject.items()
+                ]
+            },
+            {"subject_id": 1, "month": 1, "days": 1}
+        )
+        async for bucket in cursor:
+            existing[(bucket["subject_id"], bucket["month"])] = bucket
+
+        now = datetime.utcnow()
+        op_of_bucket: Dict[tuple, int] = {}
+        updates: List[dict] = []
+        for subject_id, date, status in items:
+            key = (subject_id, date[:7])
+            if key not in op_of_bucket:
+                op_of_bucket[key] = len(updates)
+                updates.append({"$set": {}, "$min": {}})
+            day = date[8:10]
+            updates[op_of_bucket[key]]["$set"][f"days.{day}.s"] = status
+            updates[op_of_bucket[key]]["$min"][f"days.{day}.t"] = now
+
+        keys = sorted(op_of_bucket, key=op_of_bucket.get)
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "subject_id": subject_id, "month": month},
+                updates[index],
+                upsert=True
+            )
+            for index, (subject_id, month) in enumerate(keys)
+        ]
+
+        errors: Dict[int, str] = {}
+        try:
+            upserted = (await self.collection.bulk_write(operations, ordered=False)).upserted_ids
+        except BulkWriteError as exc:
+            upserted, errors = _bulk_errors(exc)
+
+        results = []
+        for subject_id, date, _ in items:
+            key = (subject_id, date[:7])
+            op_index = op_of_bucket[key]
+            bucket = existing.get(key)
+            previous_day = (bucket or {}).get("days", {}).get(date[8:10])
+            bucket_id = upserted.get(op_index) or (bucket["_id"] if bucket else None)
+            failed = op_index in errors
+            results.append({
+                "previous": previous_day["s"] if previous_day else None,
+                "id": f"{bucket_id}-{date[8:10]}" if bucket_id and not failed else None,
+                "error": errors.get(op_index),
+            })
+        return results
+
+    async def delete_batch(self, user_id: str, subject_id: str, limit: int) -> int:
+        """Delete up to `limit` buckets of a subject. Returns the number of records removed."""
+        batch = await self.collection.find(
+            {"user_id": user_id, "subject_id": subject_id}, {"days": 1}
+        ).limit(limit).to_list(length=limit)
+        if not batch:
+            return 0
+        await self.collection.delete_many({"_id": {"$in": [bucket["_id"] for bucket in batch]}})
+        return sum(len(bucket.get("days", {})) for bucket in batch)
+
+
+class DualStore:
+    """Reads from `primary`, writes to both; for migrating between layouts online."""
+
+    def __init__(self, primary, secondary):
+        self.primary = primary
+        self.secondary = secondary
+        self.collection_name = primary.collection_name
+
+    def record_stages(self, match: dict) -> list:
+        return self.primary.record_stages(match)
+
+    def find(self, *args, **kwargs):
+        return self.primary.find(*args, **kwargs)
+
+    def aggregate_records(self, *args, **kwargs):
+        return self.primary.aggregate_records(*args, **kwargs)
+
+    def lookup_stage(self, *args, **kwargs) -> dict:
+        return self.primary.lookup_stage(*args, **kwargs)
+
+    async def count_statuses(self, user_id: str, subject_id: str) -> dict:
+        return await self.primary.count_statuses(user_id, subject_id)
+
+    async def upsert(self, user_id: str, subject_id: str, date: str, status: str):
+        result = await self.primary.upsert(user_id, subject_id, date, status)
+        await self.secondary.upsert(user_id, subject_id, date, status)
+        return result
+
+    async def bulk_upsert(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        results = await self.primary.bulk_upsert(user_id, items)
+        written = [item for item, result in zip(items, results) if not result["error"]]
+        await self.secondary.bulk_upsert(user_id, written)
+        return results
+
+    async def bulk_set(self, user_id: str, items: List[Tuple[str, str, str]]) -> List[dict]:
+        results = await self.primary.bulk_set(user_id, items)
+        written = [item for item, result in zip(items, results) if not result["error"]]
+        await self.secondary.bulk_set(user_id, written)
+        return results
+
+    async def delete_batch(self, user_id: str, subject_id: str, limit: int) -> int:
+        # Report the primary's count, but keep going until both layouts are empty
+        deleted = await self.primary.delete_batch(user_id, subject_id, limit)
+        secondary_deleted = await self.secondary.delete_batch(user_id, subject_id, limit)
+        return deleted or secondary_deleted
+
+
+def get_attendance_store(database=None, layout: Optional[str] = None):
+    """Store for the configured ATTENDANCE_STORAGE layout (or `layout`)."""
+    database = database if database is not None else get_database()
+    layout = layout or get_settings().attendance_storage
+
+    if layout == "buckets":
+        return BucketStore(database)
+    if layout == "dual":
+        return DualStore(DocumentStore(database), BucketStore(database))
+    return DocumentStore(database)
@@ -0,0 +1,182 @@
+"""
+Attendance bucket migration
+Copies the per-day `attendance` documents into month buckets in
+`attendance_buckets` while the app keeps serving traffic.
+
+Run it online:
+    1. deploy with ATTENDANCE_STORAGE=dual (reads documents, writes both)
+    2. python -m app.bucket_migration --verify
+    3. deploy with ATTENDANCE_STORAGE=buckets
+    4. python -m app.bucket_migration --drop-source  (optional, once happy)
+
+Records are copied in _id order in batches of --batch-size, pausing
+--pause seconds between batches. Progress is saved in the `migrations`
+collection after every batch, so an interrupted run resumes where it
+stopped. A day that is already in its bucket is never overwritten: under
+dual writes the bucket copy is at least as new as the record being copied.
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.attendance_store import BucketStore, DocumentStore
+
+MIGRATION_ID = "attendance_buckets"
+DUPLICATE_KEY = 11000
+
+logger = logging.getLogger(__name__)
+
+
+async def copy_records(database, batch_size: int = 1000, pause: float = 0.05) -> int:
+    """
+    Copy every record not yet migrated. Returns the number of records copied in this run.
+
+    Example MongoDB write per record:
+    attendance_buckets.update_one(
+        {"user_id": "...", "subject_id": "...", "month": "2024-01", "days.15": {"$exists": False}},
+        {"$set": {"days.15": {"s": "present", "t": created_at}}},
+        upsert=True
+    )
+    """
+    source = database[DocumentStore.collection_name]
+    buckets = database[BucketStore.collection_name]
+    migrations = database["migrations"]
+
+    state = await migrations.find_one({"_id": MIGRATION_ID}) or {}
+    last_id = state.get("last_id")
+    copied = 0
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await source.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {
+                    "user_id": record["user_id"],
+                    "subject_id": record["subject_id"],
+                    "month": record["date"][:7],
+                    f"days.{record['date'][8:10]}": {"$exists": False},
+                },
+                {"$set": {f"days.{record['date'][8:10]}": {
+                    "s": record["status"],
+                    "t": record.get("created_at") or record["_id"].generation_time.replace(tzinfo=None),
+                }}},
+                upsert=True
+            )
+            for record in batch
+        ]
+
+        try:
+            await buckets.bulk_write(operations, ordered=False)
+        except BulkWriteError as exc:
+            # Duplicate key: the day is already in its bucket, which is what we want
+            errors = [
+                error for error in exc.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY
+            ]
+            if errors:
+                raise
+
+        last_id = batch[-1]["_id"]
+        copied += len(batch)
+        await migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}, "$inc": {"copied": len(batch)}},
+            upsert=True
+        )
+        logger.info("Bucket migration batch copied", extra={"copied": copied, "last_id": str(last_id)})
+
+        if len(batch) < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    return copied
+
+
+async def _status_counts(store) -> Dict[Tuple[str, str, str], int]:
+    group = [{"$group": {
+        "_id": {"user_id": "$user_id", "subject_id": "$subject_id", "status": "$status"},
+        "count": {"$sum": 1}
+    }}]
+    counts = {}
+    async for doc in store.aggregate_records({}, group, allowDiskUse=True):
+        counts[(doc["_id"]["user_id"], doc["_id"]["subject_id"], doc["_id"]["status"])] = doc["count"]
+    return counts
+
+
+async def verify(database) -> list:
+    """
+    Compare per-(user, subject, status) record counts between the layouts.
+    Returns [{user_id, subject_id, status, documents, buckets}] for every mismatch.
+    """
+    documents = await _status_counts(DocumentStore(database))
+    buckets = await _status_counts(BucketStore(database))
+
+    return [
+        {
+            "user_id": key[0],
+            "subject_id": key[1],
+            "status": key[2],
+            "documents": documents.get(key, 0),
+            "buckets": buckets.get(key, 0),
+        }
+        for key in sorted(set(documents) | set(buckets))
+        if documents.get(key, 0) != buckets.get(key, 0)
+    ]
+
+
+async def _main(batch_size: int, pause: float, check: bool, drop_source: bool) -> None:
+    from app.database import connect_to_mongo, close_mongo_connection, get_database, prepare_database
+    from app.logging_config import start_logging, stop_logging
+    from app.settings import load_env
+
+    load_env()
+    start_logging()
+    await connect_to_mongo()
+    await prepare_database()
+    try:
+        database = get_database()
+        copied = await copy_records(database, batch_size, pause)
+        print(f"✅ Copied {copied} attendance record(s) into buckets")
+
+        mismatches = await verify(database) if check or drop_source else []
+        for report in mismatches:
+            print(
+                f"⚠️ Subject {report['subject_id']} (user {report['user_id']}) {report['status']}: "
+                f"documents {report['documents']} buckets {report['buckets']}"
+            )
+        if check or drop_source:
+            print(f"✅ Verification done: {len(mismatches)} mismatch(es)")
+
+        if drop_source:
+            if mismatches:
+                print("❌ Not dropping `attendance`: layouts differ")
+            else:
+                await database[DocumentStore.collection_name].drop()
+                await database["migrations"].delete_one({"_id": MIGRATION_ID})
+                print("✅ Dropped `attendance`")
+    finally:
+        await close_mongo_connection()
+        stop_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy attendance records into month buckets")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records per bulk write")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    parser.add_argument("--verify", action="store_true", help="compare record counts between layouts")
+    parser.add_argument(
+        "--drop-source", action="store_true",
+        help="drop the `attendance` collection if verification finds no mismatches"
+    )
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size, args.pause, args.verify, args.drop_source))
@@ -0,0 +1,133 @@
+"""
+In-process caching helpers
+Bounded LRU + TTL cache with single-flight loading for async code.
+
+All bookkeeping happens between awaits on the event loop, so no lock is
+needed: two coroutines can never interleave inside get/set/invalidate.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class AsyncLRUCache:
+    """
+    LRU cache whose entries expire after ttl seconds.
+
+    get_or_load() de-duplicates concurrent misses: while a key is being loaded,
+    other callers await the same future instead of hitting the database again.
+    Loaders returning None are not cached.
+
+    Each in-flight load is a generation of its key: invalidate() detaches
+    it, so the load still returns its value to the callers already waiting
+    but does not store it, and the next caller starts a fresh load.
+
+    Waiters are shielded from each other: a cancelled waiter leaves the load
+    running for the rest, and if the caller running the load is cancelled,
+    its waiters start their own.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting the least recently used entries if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry (no-op if absent) and any load in flight for it."""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._inflight.clear()
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Optional[Any]:
+        """
+        Return the cached value for key, calling loader() on a miss.
+        Concurrent misses for the same key share one loader call.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The load was cancelled along with the caller running it
+            return await self.get_or_load(key, loader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # Mark retrieved so an unawaited future does not log a warning
+                future.exception()
+            raise
+        else:
+            # Not stored if the key was invalidated while loading
+            if value is not None and self._inflight.get(key) is future:
+                self.set(key, value)
+            if not future.done():
+                future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
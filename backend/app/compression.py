@@ -0,0 +1,219 @@
+"""
+Response compression
+Pure ASGI middleware that compresses responses for clients sending
+Accept-Encoding, so list and history responses cost less on mobile data.
+
+- Encodings are tried in COMPRESSION_ENCODINGS order (default "br,gzip");
+  br needs the brotli package and is skipped without it. An empty value
+  disables compression.
+- Complete responses smaller than COMPRESSION_MIN_BYTES (default 1024) are
+  sent as is: the headers would eat most of the saving.
+- Streaming responses (the CSV/NDJSON export) are compressed chunk by chunk
+  without buffering the whole body.
+- Only text-like media types are compressed (JSON, MessagePack, CSV,
+  NDJSON, text/*); compressible responses get Vary: Accept-Encoding.
+
+COMPRESSION_GZIP_LEVEL (1-9, default 6) and COMPRESSION_BROTLI_QUALITY
+(0-11, default 4) trade CPU for size. Counts of responses and bytes before
+and after compression are exported on /metrics as `compression`.
+"""
+
+import os
+import zlib
+from functools import lru_cache
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+COMPRESSION_ENCODINGS = [
+    coding.strip() for coding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if coding.strip()
+]
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+@lru_cache(maxsize=None)
+def load_brotli():
+    """The brotli module, imported when the first middleware is built; None if not installed."""
+    try:
+        import brotli
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return brotli
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "text/",
+)
+
+
+def accepted_encodings(accept_encoding: str) -> dict:
+    """Accept-Encoding header -> {coding: q}."""
+    accepted = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._brotli = load_brotli().Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish()
+
+
+class CompressionStats:
+    """Counters shared by every CompressionMiddleware instance."""
+
+    def __init__(self):
+        self.responses = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def stats(self) -> dict:
+        return {
+            "responses": self.responses,
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Compresses eligible responses in the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app,
+        encodings: List[str] = None,
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.encodings = [
+            coding for coding in (COMPRESSION_ENCODINGS if encodings is None else encodings)
+            if coding == "gzip" or (coding == "br" and load_brotli() is not None)
+        ]
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.counters = compression_stats
+
+    def choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        for coding in self.encodings:
+            if accepted.get(coding, accepted.get("*", 0)) > 0:
+                return coding
+        return None
+
+    def _compressor(self, coding: str):
+        if coding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=list(start.get("headers", [])))
+                media_type = headers.get("content-type", "")
+                eligible = (
+                    "content-encoding" not in headers
+                    and media_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                self.counters.responses += 1
+
+                too_small = not more_body and (not body or len(body) < self.minimum_size)
+                if not eligible or coding is None or too_small:
+                    passthrough = True
+                    start["headers"] = headers.raw
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = self._compressor(coding)
+                self.counters.compressed += 1
+                headers["Content-Encoding"] = coding
+                if more_body:
+                    del headers["Content-Length"]
+                    start["headers"] = headers.raw
+                    await send(start)
+                else:
+                    self.counters.bytes_in += len(body)
+                    compressed = compressor.compress(body) + compressor.finish()
+                    self.counters.bytes_out += len(compressed)
+                    headers["Content-Length"] = str(len(compressed))
+                    start["headers"] = headers.raw
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            self.counters.bytes_in += len(body)
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            self.counters.bytes_out += len(chunk)
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
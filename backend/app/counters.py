@@ -0,0 +1,153 @@
+"""
+Per-subject attendance counters
+Each subject document carries running totals that the write paths keep in
+sync with $inc, so /stats is a single document read instead of an
+aggregation over every attendance record.
+
+    subjects: {"_id": ..., "counts": {"present": 3, "absent": 1, "leave": 0, "total": 4}}
+
+Counters can drift if a request dies between the attendance write and the
+$inc; `python -m app.counters` rebuilds them from the raw records.
+"""
+
+import argparse
+import asyncio
+from typing import Dict, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.attendance_store import get_attendance_store
+from app.deletions import ACTIVE_SUBJECT
+
+STATUSES = ("present", "absent", "leave")
+
+EMPTY_COUNTS = {"present": 0, "absent": 0, "leave": 0, "total": 0}
+
+
+def status_delta(old_status: Optional[str], new_status: str) -> Dict[str, int]:
+    """
+    Counter changes for moving a record from old_status to new_status.
+    old_status is None for a newly inserted record.
+    """
+    if old_status == new_status:
+        return {}
+    if old_status is None:
+        return {new_status: 1, "total": 1}
+    return {old_status: -1, new_status: 1}
+
+
+def merge_delta(target: Dict[str, int], delta: Dict[str, int]) -> None:
+    for field, amount in delta.items():
+        target[field] = target.get(field, 0) + amount
+
+
+async def apply_counter_deltas(subjects, user_id: str, deltas: Dict[str, Dict[str, int]]) -> None:
+    """
+    Apply {subject_id: {field: amount}} to the subjects' counters in one bulk_write.
+
+    Subjects without counters yet (created before counters existed) are
+    skipped; they get a full count on their first /stats read instead.
+
+    Example MongoDB update:
+    subjects.update_one(
+        {"_id": ObjectId("..."), "user_id": "..."},
+        {"$inc": {"counts.present": 1, "counts.absent": -1}}
+    )
+    """
+    operations = [
+        UpdateOne(
+            {"_id": ObjectId(subject_id), "user_id": user_id, "counts": {"$exists": True}},
+            {"$inc": {f"counts.{field}": amount for field, amount in delta.items()}}
+        )
+        for subject_id, delta in deltas.items()
+        if any(delta.values())
+    ]
+
+    if operations:
+        await subjects.bulk_write(operations, ordered=False)
+
+
+def normalize_counts(counts: Optional[dict]) -> dict:
+    """Fill in missing counter fields with zero."""
+    return {**EMPTY_COUNTS, **(counts or {})}
+
+
+async def reconcile_counters(database, fix: bool = False) -> list:
+    """
+    Rebuild every subject's counters from the attendance records (in
+    whichever layout ATTENDANCE_STORAGE selects).
+
+    Returns a list of drift reports ({subject_id, user_id, stored, actual}).
+    With fix=True the stored counters are overwritten with the actual values.
+    """
+    attendance = get_attendance_store(database)
+    subjects = database["subjects"]
+
+    group = [
+        {"$group": {
+            "_id": {"subject_id": "$subject_id", "user_id": "$user_id", "status": "$status"},
+            "count": {"$sum": 1}
+        }}
+    ]
+
+    actual: Dict[tuple, dict] = {}
+    async for doc in attendance.aggregate_records({}, group, allowDiskUse=True):
+        key = (doc["_id"]["subject_id"], doc["_id"]["user_id"])
+        counts = actual.setdefault(key, dict(EMPTY_COUNTS))
+        counts[doc["_id"]["status"]] = doc["count"]
+        counts["total"] += doc["count"]
+
+    drift = []
+    fixes = []
+    # Subjects pending deletion are skipped; their records are being removed
+    async for subject in subjects.find(ACTIVE_SUBJECT, {"user_id": 1, "counts": 1}):
+        key = (str(subject["_id"]), subject["user_id"])
+        stored = normalize_counts(subject.get("counts"))
+        expected = actual.get(key, dict(EMPTY_COUNTS))
+
+        if stored != expected or "counts" not in subject:
+            drift.append({
+                "subject_id": key[0],
+                "user_id": key[1],
+                "stored": stored,
+                "actual": expected,
+            })
+            fixes.append(UpdateOne({"_id": subject["_id"]}, {"$set": {"counts": expected}}))
+
+    if fix and fixes:
+        await subjects.bulk_write(fixes, ordered=False)
+
+    return drift
+
+
+async def _main(fix: bool) -> None:
+    from app.database import connect_to_mongo, close_mongo_connection, get_database, prepare_database
+    from app.logging_config import start_logging, stop_logging
+    from app.settings import load_env
+
+    load_env()
+    start_logging()
+    await connect_to_mongo()
+    await prepare_database()
+    try:
+        drift = await reconcile_counters(get_database(), fix=fix)
+    finally:
+        await close_mongo_connection()
+        stop_logging()
+
+    for report in drift:
+        print(
+            f"⚠️ Subject {report['subject_id']} (user {report['user_id']}): "
+            f"stored {report['stored']} actual {report['actual']}"
+        )
+
+    action = "fixed" if fix else "found"
+    print(f"✅ Counter reconciliation done: {len(drift)} drifted subject(s) {action}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-subject attendance counters")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted counters")
+    args = parser.parse_args()
+    asyncio.run(_main(args.fix))
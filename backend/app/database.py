@@ -8,39 +8,71 @@ Works for:
 """
 
 
-from dotenv import load_dotenv
-load_dotenv()
+import asyncio
+import logging
+import time
 
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
-
-# MongoDB connection string
-MONGO_URL = os.getenv("MONGO_URL")
-
-if not MONGO_URL:
-    raise RuntimeError("❌ MONGO_URL environment variable not set")
+from app.indexes import ensure_indexes, verify_indexes
+from app.metrics import mongo_command_listener, mongo_pool_listener
+from app.settings import Settings, get_settings
 
 # Global MongoDB client & database
-client: AsyncIOMotorClient | None = None
+client = None
 database = None
 
+# Builds the client from MONGO_URL (None = Motor's AsyncIOMotorClient,
+# imported on first connect); benchmarks swap in an in-memory stand-in
+client_factory = None
+
+logger = logging.getLogger(__name__)
 
 
-async def connect_to_mongo():
+
+async def connect_to_mongo(settings: Settings = None):
     """
     Connect to MongoDB when FastAPI starts.
     Connection remains open during app lifecycle.
+    Only connects and pings; prepare_database does the warm-up.
     """
     global client, database
 
-    print("🔌 Connecting to MongoDB...")
+    settings = settings or get_settings()
+    if not settings.mongo_url:
+        raise RuntimeError("❌ MONGO_URL environment variable not set")
+
+    logger.info("Connecting to MongoDB")
 
-    client = AsyncIOMotorClient(MONGO_URL)
+    factory = client_factory
+    if factory is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        factory = AsyncIOMotorClient
+
+    client = factory(
+        settings.mongo_url,
+        **settings.mongo_client_options(),
+        event_listeners=[mongo_command_listener, mongo_pool_listener],
+    )
     database = client.get_default_database()
 
     # Verify connection
     await client.admin.command("ping")
-    print("✅ MongoDB connected successfully")
+    logger.info("MongoDB connected")
+
+
+async def prepare_database(settings: Settings = None):
+    """
+    Warm the connection pool, create indexes (idempotent) and check the hot
+    queries use them. Run after connect_to_mongo, before or after the app
+    starts serving (STARTUP_WARMUP).
+    """
+    settings = settings or get_settings()
+
+    warmed = await warm_pool(settings.mongo_warm_connections)
+    logger.info("MongoDB pool warmed", extra={"connections": warmed, "pool": mongo_pool_listener.stats()})
+
+    indexes = await ensure_indexes(database)
+    await verify_indexes(database)
+    logger.info("MongoDB indexes ready", extra={"indexes": indexes})
 
 
 async def close_mongo_connection():
@@ -51,7 +83,38 @@ async def close_mongo_connection():
 
     if client:
         client.close()
-        print("🔒 MongoDB connection closed")
+        logger.info("MongoDB connection closed")
+
+
+async def warm_pool(connections: int) -> int:
+    """
+    Open up to `connections` pooled connections by running that many pings
+    concurrently (each concurrent ping needs its own connection).
+    Returns how many succeeded; failures are logged, never raised.
+    """
+    if connections <= 0:
+        return 0
+
+    results = await asyncio.gather(
+        *[client.admin.command("ping") for _ in range(connections)],
+        return_exceptions=True,
+    )
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.warning("MongoDB pool warm-up incomplete", extra={"failed": len(failures), "error": str(failures[0])})
+    return connections - len(failures)
+
+
+async def ping() -> float:
+    """Round-trip a ping to MongoDB; returns the latency in milliseconds."""
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
+def get_pool_stats() -> dict:
+    """Connection pool usage gathered by the pool event listener."""
+    return mongo_pool_listener.stats()
 
 
 def get_database():
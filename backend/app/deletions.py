@@ -0,0 +1,180 @@
+"""
+Subject deletion jobs
+Deleting a subject only marks it with deleted_at and queues a job. A
+background worker removes the subject's attendance in batches of
+DELETE_BATCH_SIZE, pausing DELETE_BATCH_PAUSE_SECONDS between batches so a
+large cleanup never turns into a write burst, and finally removes the
+subject document.
+
+Progress is kept in the deletion_jobs collection (one job per subject,
+keyed by subject id). On startup every subject still marked deleted_at is
+queued again, so work interrupted by a restart resumes. Each step is
+idempotent, so re-running a half-finished job is safe.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+
+from app.attendance_store import get_attendance_store
+
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "500"))
+DELETE_BATCH_PAUSE_SECONDS = float(os.getenv("DELETE_BATCH_PAUSE_SECONDS", "0.1"))
+DELETE_RETRY_SECONDS = float(os.getenv("DELETE_RETRY_SECONDS", "30"))
+
+# Filter for subjects that have not been deleted; add it to every subject read
+ACTIVE_SUBJECT = {"deleted_at": {"$exists": False}}
+
+logger = logging.getLogger(__name__)
+
+
+async def deleted_subject_ids(database, user_id: str) -> List[str]:
+    """Ids of the user's subjects whose attendance is still being cleaned up."""
+    cursor = database["subjects"].find(
+        {"user_id": user_id, "deleted_at": {"$exists": True}}, {"_id": 1}
+    )
+    return [str(subject["_id"]) async for subject in cursor]
+
+
+class DeletionQueue:
+    """In-process queue of subject ids with a single worker task."""
+
+    def __init__(self):
+        self.database = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._retries: set = set()
+
+    async def start(self, database) -> int:
+        """Start the worker and requeue every subject still marked deleted."""
+        self.database = database
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+        resumed = 0
+        async for subject in database["subjects"].find(
+            {"deleted_at": {"$exists": True}}, {"user_id": 1, "deleted_at": 1}
+        ):
+            await self._save_job(str(subject["_id"]), subject["user_id"], subject["deleted_at"])
+            self._queue.put_nowait(str(subject["_id"]))
+            resumed += 1
+
+        if resumed:
+            logger.info("Resumed subject deletions", extra={"jobs": resumed})
+        return resumed
+
+    async def stop(self) -> None:
+        """Cancel the worker; unfinished jobs resume on the next start."""
+        for task in [self._worker, *self._retries]:
+            if task:
+                task.cancel()
+        if self._worker:
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._retries.clear()
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def enqueue(self, user_id: str, subject_id: str, deleted_at: datetime) -> dict:
+        """Record a job for an already-marked subject and queue it."""
+        job = await self._save_job(subject_id, user_id, deleted_at)
+        self._queue.put_nowait(subject_id)
+        return job
+
+    async def get_job(self, user_id: str, subject_id: str) -> Optional[dict]:
+        return await self.database["deletion_jobs"].find_one({"_id": subject_id, "user_id": user_id})
+
+    async def _save_job(self, subject_id: str, user_id: str, deleted_at: datetime) -> dict:
+        jobs = self.database["deletion_jobs"]
+        await jobs.update_one(
+            {"_id": subject_id},
+            {"$setOnInsert": {
+                "user_id": user_id,
+                "status": "pending",
+                "deleted_records": 0,
+                "created_at": deleted_at,
+                "finished_at": None,
+            }},
+            upsert=True
+        )
+        return await jobs.find_one({"_id": subject_id})
+
+    async def _run(self) -> None:
+        while True:
+            subject_id = await self._queue.get()
+            try:
+                await self.process(subject_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Subject deletion failed", extra={"subject_id": subject_id})
+                await self.database["deletion_jobs"].update_one(
+                    {"_id": subject_id}, {"$set": {"status": "pending", "last_error": str(exc)}}
+                )
+                self._retry_later(subject_id)
+
+    def _retry_later(self, subject_id: str) -> None:
+        async def retry():
+            await asyncio.sleep(DELETE_RETRY_SECONDS)
+            self._queue.put_nowait(subject_id)
+
+        task = asyncio.create_task(retry())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def process(self, subject_id: str) -> int:
+        """
+        Delete the subject's attendance batch by batch, then the subject.
+        Returns the number of attendance records deleted in this run.
+
+        Example MongoDB batch:
+        ids = attendance.find({"user_id": "...", "subject_id": "..."}, {"_id": 1}).limit(500)
+        attendance.delete_many({"_id": {"$in": ids}})
+        """
+        jobs = self.database["deletion_jobs"]
+        attendance = get_attendance_store(self.database)
+        subjects = self.database["subjects"]
+
+        job = await jobs.find_one({"_id": subject_id})
+        if not job or job["status"] == "done":
+            return 0
+
+        user_id = job["user_id"]
+        await jobs.update_one({"_id": subject_id}, {"$set": {"status": "running"}})
+
+        deleted = 0
+        while True:
+            removed = await attendance.delete_batch(user_id, subject_id, DELETE_BATCH_SIZE)
+            if not removed:
+                break
+
+            deleted += removed
+            await jobs.update_one({"_id": subject_id}, {"$inc": {"deleted_records": removed}})
+            await asyncio.sleep(DELETE_BATCH_PAUSE_SECONDS)
+
+        await subjects.delete_one({
+            "_id": ObjectId(subject_id),
+            "user_id": user_id,
+            "deleted_at": {"$exists": True}
+        })
+        await jobs.update_one(
+            {"_id": subject_id},
+            {"$set": {"status": "done", "finished_at": datetime.utcnow()}, "$unset": {"last_error": ""}}
+        )
+
+        logger.info(
+            "Subject deletion finished",
+            extra={"user_id": user_id, "subject_id": subject_id, "deleted_records": deleted},
+        )
+        return deleted
+
+
+deletion_queue = DeletionQueue()
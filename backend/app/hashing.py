@@ -0,0 +1,113 @@
+"""
+Password hashing
+Runs bcrypt on a dedicated, bounded thread pool so a burst of logins does not
+block the event loop for every other request.
+
+bcrypt releases the GIL while hashing, so threads give real parallelism.
+When more than PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE calls are
+pending, new calls fail fast with HashingOverloaded (mapped to 503 by the
+auth routes) instead of queueing without bound.
+
+passlib and the bcrypt backend are imported on the first hash (or by the
+startup warm-up), not when this module is imported.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# 0 workers runs bcrypt inline on the event loop (the old behaviour)
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+HASH_RETRY_AFTER_SECONDS = 1
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto"
+    )
+
+
+def load_hashing_backend() -> None:
+    """Import passlib and initialise the bcrypt backend (blocking; run in a thread)."""
+    get_pwd_context().handler("bcrypt").get_backend()
+
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Bounded executor wrapper with queue-depth accounting."""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker."""
+        return max(0, self.pending - self.workers)
+
+    async def _run(self, func, *args):
+        if self.workers <= 0:
+            self.completed += 1
+            return func(*args)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HashingOverloaded("Password hashing queue is full")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_pwd_context().hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(get_pwd_context().verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(HASH_WORKERS, HASH_MAX_QUEUE)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
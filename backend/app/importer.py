@@ -0,0 +1,255 @@
+"""
+Attendance import
+Parses an uploaded CSV/NDJSON body incrementally and writes it in fixed-size
+unordered bulk_write batches through the configured attendance store.
+
+Accepted columns / keys (the same ones /api/attendance/export produces):
+    subject_id or subject_name, date (YYYY-MM-DD), status
+
+Only one batch of rows is held in memory at a time, and at most
+MAX_LINE_LENGTH characters of a line: longer lines are skipped as they
+stream in and reported as rejected. CSV fields must not contain embedded
+newlines.
+"""
+
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.attendance_store import get_attendance_store
+from app.counters import EMPTY_COUNTS, STATUSES
+from app.deletions import ACTIVE_SUBJECT
+from app.models.subject import SUBJECT_COLORS
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+# A row is three short fields; anything this long is not one
+MAX_LINE_LENGTH = 4096
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int = MAX_LINE_LENGTH
+) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Yield (line_number, line) from a stream of byte chunks. A line longer
+    than max_length characters is yielded as None; its text is dropped as
+    it arrives instead of being buffered until its newline.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    too_long = False
+    line_number = 0
+
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        start = 0
+        while True:
+            newline = text.find("\n", start)
+            if newline < 0:
+                break
+            line = pending + text[start:newline]
+            start = newline + 1
+            line_number += 1
+            yield line_number, None if too_long or len(line) > max_length else line.rstrip("\r")
+            pending = ""
+            too_long = False
+
+        if not too_long:
+            pending += text[start:]
+            if len(pending) > max_length:
+                pending = ""
+                too_long = True
+
+    pending += decoder.decode(b"", final=True)
+    if too_long or len(pending) > max_length:
+        yield line_number + 1, None
+    elif pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (line_number, row, error) for every non-blank data line.
+    Exactly one of row / error is set.
+    """
+    header: Optional[List[str]] = None
+
+    async for line_number, line in iter_lines(chunks):
+        if line is None:
+            yield line_number, None, f"Line longer than {MAX_LINE_LENGTH} characters"
+            continue
+        if not line.strip():
+            continue
+
+        if fmt == "ndjson":
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Invalid JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, row, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+def validate_date(value) -> bool:
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return False
+    return len(value) == 10
+
+
+class AttendanceImporter:
+    """
+    Imports rows for one user.
+
+    Subject names are resolved to ids once via an in-memory map loaded at
+    start; missing subjects are created on first use when
+    create_missing_subjects is set.
+    """
+
+    def __init__(self, database, user_id: str, create_missing_subjects: bool = False):
+        self.attendance = get_attendance_store(database)
+        self.subjects = database["subjects"]
+        self.user_id = user_id
+        self.create_missing_subjects = create_missing_subjects
+
+        self.subject_ids: set = set()
+        self.subject_by_name: Dict[str, str] = {}
+        self.touched_subjects: set = set()
+
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.created_subjects: List[str] = []
+        self.errors: List[dict] = []
+
+        # Pending batch: (subject_id, date) -> (line_number, status)
+        self._batch: Dict[Tuple[str, str], Tuple[int, str]] = {}
+
+    async def load_subjects(self) -> None:
+        async for subject in self.subjects.find({"user_id": self.user_id, **ACTIVE_SUBJECT}, {"name": 1}):
+            subject_id = str(subject["_id"])
+            self.subject_ids.add(subject_id)
+            self.subject_by_name[subject["name"].strip().lower()] = subject_id
+
+    def reject(self, line_number: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": error})
+
+    async def resolve_subject(self, row: dict) -> Optional[str]:
+        subject_id = str(row.get("subject_id") or "").strip()
+        if subject_id in self.subject_ids:
+            return subject_id
+
+        name = str(row.get("subject_name") or row.get("subject") or "").strip()
+        if not name:
+            return None
+
+        subject_id = self.subject_by_name.get(name.lower())
+        if subject_id or not self.create_missing_subjects or len(name) > 100:
+            return subject_id
+
+        new_subject = {
+            "user_id": self.user_id,
+            "name": name,
+            "color": SUBJECT_COLORS[len(self.subject_ids) % len(SUBJECT_COLORS)],
+            "counts": dict(EMPTY_COUNTS),
+            "created_at": datetime.utcnow(),
+        }
+        result = await self.subjects.insert_one(new_subject)
+        subject_id = str(result.inserted_id)
+
+        self.subject_ids.add(subject_id)
+        self.subject_by_name[name.lower()] = subject_id
+        self.created_subjects.append(name)
+        return subject_id
+
+    async def add(self, line_number: int, row: dict) -> None:
+        subject_id = await self.resolve_subject(row)
+        if subject_id is None:
+            self.reject(line_number, "Unknown subject")
+            return
+
+        date = str(row.get("date") or "").strip()
+        if not validate_date(date):
+            self.reject(line_number, "Invalid date, expected YYYY-MM-DD")
+            return
+
+        status = str(row.get("status") or "").strip().lower()
+        if status not in STATUSES:
+            self.reject(line_number, "Invalid status")
+            return
+
+        key = (subject_id, date)
+        if key in self._batch:
+            # Keep later rows winning: write what we have before overwriting
+            await self.flush()
+
+        self._batch[key] = (line_number, status)
+        if len(self._batch) >= IMPORT_BATCH_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write the pending batch as one unordered bulk_write of upserts.
+
+        Example MongoDB bulk write:
+        attendance.bulk_write([UpdateOne({...}, {"$set": {...}}, upsert=True), ...], ordered=False)
+        """
+        if not self._batch:
+            return
+
+        batch = list(self._batch.items())
+        self._batch = {}
+
+        results = await self.attendance.bulk_set(
+            self.user_id,
+            [(subject_id, date, status) for (subject_id, date), (_, status) in batch]
+        )
+        for ((_, _), (line_number, _)), result in zip(batch, results):
+            if result["error"]:
+                self.reject(line_number, result["error"])
+            elif result["previous"] is None:
+                self.inserted += 1
+            else:
+                self.updated += 1
+
+        self.touched_subjects.update(subject_id for (subject_id, _), _ in batch)
+
+    async def finish(self) -> None:
+        """Flush the last batch and recount counters for every touched subject."""
+        await self.flush()
+
+        for subject_id in self.touched_subjects:
+            counts = await self.attendance.count_statuses(self.user_id, subject_id)
+            await self.subjects.update_one(
+                {"_id": ObjectId(subject_id), "user_id": self.user_id},
+                {"$set": {"counts": counts}}
+            )
+
+    def summary(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "created_subjects": self.created_subjects,
+            "errors": self.errors,
+        }
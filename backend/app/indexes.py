@@ -0,0 +1,142 @@
+"""
+Index manager
+Creates the MongoDB indexes the routes rely on and checks that the hot
+queries actually use them.
+
+Runs once at startup from prepare_database. create_index is idempotent, so
+restarting the server against an existing database is a no-op.
+"""
+
+import logging
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+# ---------- Index definitions ----------
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "attendance": [
+        (
+            [("user_id", ASCENDING), ("subject_id", ASCENDING), ("date", ASCENDING)],
+            {"name": "user_subject_date_unique", "unique": True},
+        ),
+    ],
+    # ATTENDANCE_STORAGE=buckets: one document per (user, subject, month)
+    "attendance_buckets": [
+        (
+            [("user_id", ASCENDING), ("subject_id", ASCENDING), ("month", ASCENDING)],
+            {"name": "user_subject_month_unique", "unique": True},
+        ),
+    ],
+    "subjects": [
+        (
+            [("user_id", ASCENDING), ("name", ASCENDING)],
+            {"name": "user_name"},
+        ),
+        (
+            [("deleted_at", ASCENDING)],
+            {"name": "deleted_at", "sparse": True},
+        ),
+    ],
+    "deletion_jobs": [
+        (
+            [("finished_at", ASCENDING)],
+            {"name": "finished_at_ttl", "expireAfterSeconds": 7 * 24 * 3600},
+        ),
+    ],
+    # RATE_LIMIT_BACKEND=mongo: buckets are removed once they would be full again
+    "rate_limits": [
+        (
+            [("expires_at", ASCENDING)],
+            {"name": "expires_at_ttl", "expireAfterSeconds": 0},
+        ),
+    ],
+    "users": [
+        (
+            [("email", ASCENDING)],
+            {"name": "email_unique", "unique": True},
+        ),
+    ],
+}
+
+logger = logging.getLogger(__name__)
+
+# Representative queries from the routes, checked with explain()
+PROBE_QUERIES = {
+    "attendance": {"user_id": "probe", "subject_id": "probe", "date": "1970-01-01"},
+    "attendance_buckets": {"user_id": "probe", "subject_id": "probe", "month": "1970-01"},
+    "subjects": {"user_id": "probe"},
+    "users": {"email": "probe@example.com"},
+}
+
+
+async def ensure_indexes(database) -> list:
+    """
+    Create all indexes in INDEXES.
+
+    A failure on one index (for example existing duplicates blocking a unique
+    index) is reported and skipped so the app can still start.
+    Returns the names of indexes that are in place.
+    """
+    created = []
+
+    for collection_name, specs in INDEXES.items():
+        collection = database[collection_name]
+        for keys, options in specs:
+            try:
+                created.append(await collection.create_index(keys, **options))
+            except OperationFailure as exc:
+                logger.warning(
+                    "Could not create index",
+                    extra={"index": options["name"], "collection": collection_name, "error": str(exc)},
+                )
+
+    return created
+
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() query plan tree."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def explain_uses_index(collection, query: dict) -> bool:
+    """
+    Return True if the winning plan for query avoids a collection scan.
+
+    Example:
+    attendance.find({"user_id": "...", "subject_id": "...", "date": "..."}).explain()
+    """
+    explanation = await collection.find(query).explain()
+    winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    stages = set(_plan_stages(winning_plan))
+    return "COLLSCAN" not in stages and bool(stages)
+
+
+async def verify_indexes(database) -> dict:
+    """
+    Run explain() on the probe queries and report which ones use an index.
+    Returns {collection_name: bool}.
+    """
+    report = {}
+
+    for collection_name, query in PROBE_QUERIES.items():
+        try:
+            report[collection_name] = await explain_uses_index(database[collection_name], query)
+        except Exception as exc:
+            # Diagnostics only; never block startup on explain()
+            logger.warning("explain() failed", extra={"collection": collection_name, "error": str(exc)})
+            report[collection_name] = False
+
+        if not report[collection_name]:
+            logger.warning("Query is not using an index", extra={"collection": collection_name})
+
+    return report
@@ -1,50 +1,241 @@
 """
 College Attendance Tracker - FastAPI Backend
 Main entry point for the application
+
+`create_app()` builds the app from settings resolved once; uvicorn serves
+the module-level `app` (app.main:app). App modules are imported inside the
+factory, after `.env` is loaded, and each import and lifespan phase is timed
+(printed with STARTUP_PROFILE=1).
 """
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routes.auth import router as auth_router
-from app.routes.subjects import router as subjects_router
-from app.routes.attendance import router as attendance_router
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Connect to MongoDB
-    await connect_to_mongo()
-    yield
-    # Shutdown: Close MongoDB connection
-    await close_mongo_connection()
-
-app = FastAPI(
-    title="College Attendance Tracker API",
-    description="Backend API for tracking college attendance",
-    version="1.0.0",
-    lifespan=lifespan
-)
-
-# CORS middleware - allows React frontend to connect from any origin (for local dev)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for local development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(subjects_router, prefix="/api/subjects", tags=["Subjects"])
-app.include_router(attendance_router, prefix="/api/attendance", tags=["Attendance"])
-
-@app.get("/")
-async def root():
-    return {"message": "College Attendance Tracker API is running!"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+
+from app.settings import Settings, get_settings
+from app.startup_profile import StartupProfile
+
+startup_profile = StartupProfile()
+
+with startup_profile.phase("import", "fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+_component_gauges_registered = False
+
+
+def register_component_gauges() -> None:
+    """Cache and hashing pool stats, refreshed on every scrape (once per process)."""
+    global _component_gauges_registered
+    if _component_gauges_registered:
+        return
+    _component_gauges_registered = True
+
+    from app.compression import compression_stats
+    from app.hashing import password_hasher
+    from app.logging_config import DroppingQueueHandler
+    from app.metrics import Gauge, registry
+    from app.projection import projection_cache
+    from app.rate_limit import rate_limiter
+    from app.response_cache import response_cache
+    from app.routes.auth import user_cache
+    from app.write_behind import write_behind
+
+    user_cache_gauge = registry.register(Gauge("user_cache", "Authenticated user cache stats"))
+    password_hash_gauge = registry.register(Gauge("password_hashing", "Password hashing pool stats"))
+    projection_cache_gauge = registry.register(Gauge("projection_cache", "Attendance projection cache stats"))
+    write_behind_gauge = registry.register(Gauge("write_behind", "Write-behind attendance buffer stats"))
+    response_cache_gauge = registry.register(Gauge("response_cache", "Subject list / stats response cache stats"))
+    rate_limit_gauge = registry.register(Gauge("auth_rate_limit", "Login/register rate limiter stats"))
+    log_dropped_gauge = registry.register(Gauge("log_records_dropped", "Log records dropped because the log queue was full"))
+    compression_gauge = registry.register(Gauge("compression", "Response compression counts and bytes before/after"))
+    startup_gauge = registry.register(Gauge("startup_phase_ms", "Import and lifespan phase durations of this process"))
+
+    def collect_component_stats():
+        for key, value in user_cache.stats().items():
+            user_cache_gauge.set(value, stat=key)
+        for key, value in password_hasher.stats().items():
+            password_hash_gauge.set(value, stat=key)
+        for key, value in projection_cache.stats().items():
+            projection_cache_gauge.set(value, stat=key)
+        for key, value in write_behind.stats().items():
+            write_behind_gauge.set(value, stat=key)
+        for key, value in response_cache.stats().items():
+            response_cache_gauge.set(value, stat=key)
+        for key, value in rate_limiter.stats().items():
+            rate_limit_gauge.set(value, stat=key)
+        for key, value in compression_stats.stats().items():
+            compression_gauge.set(value, stat=key)
+        for key, value in startup_profile.stats().items():
+            startup_gauge.set(value, phase=key)
+        log_dropped_gauge.set(DroppingQueueHandler.dropped)
+
+    registry.add_collector(collect_component_stats)
+
+
+def create_app(settings: Settings = None) -> FastAPI:
+    settings = settings or get_settings()
+    profile = startup_profile
+    profile.enabled = settings.startup_profile
+
+    with profile.phase("import", "app.database"):
+        from app.database import (
+            close_mongo_connection, connect_to_mongo, get_database, get_pool_stats, ping, prepare_database
+        )
+    with profile.phase("import", "app support modules"):
+        from app.compression import CompressionMiddleware
+        from app.deletions import deletion_queue
+        from app.hashing import load_hashing_backend, password_hasher
+        from app.logging_config import RequestIdMiddleware, start_logging, stop_logging
+        from app.metrics import MetricsMiddleware, registry
+    with profile.phase("import", "app.routes"):
+        from app.routes.auth import router as auth_router
+        from app.routes.subjects import router as subjects_router
+        from app.routes.attendance import router as attendance_router
+        from app.write_behind import WRITE_BEHIND, write_behind
+
+    def load_auth_stack() -> None:
+        # PyJWT and passlib/bcrypt, so the first login does not import them
+        import jwt  # noqa: F401
+        load_hashing_backend()
+
+    async def warm_up() -> None:
+        """Pool warm-up, indexes and the auth stack: everything a request can wait for."""
+        with profile.phase("warm-up", "mongo pool + indexes"):
+            await prepare_database(settings)
+        with profile.phase("warm-up", "auth stack"):
+            await asyncio.to_thread(load_auth_stack)
+
+    async def background_warm_up() -> None:
+        try:
+            await warm_up()
+        except Exception:
+            logger.exception("Startup warm-up failed")
+            raise
+        logger.info("Startup warm-up finished", extra={"phases": profile.stats()})
+        profile.report("background warm-up finished")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Startup: Start the log writer thread, then connect to MongoDB
+        with profile.phase("lifespan", "logging"):
+            start_logging()
+        with profile.phase("lifespan", "mongo connect"):
+            await connect_to_mongo(settings)
+        # Resume subject deletions interrupted by the last shutdown
+        with profile.phase("lifespan", "deletion queue"):
+            await deletion_queue.start(get_database())
+        if WRITE_BEHIND:
+            await write_behind.start(get_database())
+
+        # Blocking: serve only once warm. Background: serve /health right
+        # away; /health/ready reports 503 until the warm-up has finished.
+        if settings.startup_warmup == "blocking":
+            await warm_up()
+            app.state.warm_up = None
+        else:
+            app.state.warm_up = asyncio.create_task(background_warm_up())
+
+        logger.info(
+            "Application started",
+            extra={"elapsed_ms": round(profile.elapsed_ms(), 1), "warmup": settings.startup_warmup},
+        )
+        profile.report("serving")
+        yield
+        # Shutdown: Stop a running warm-up, drain buffered marks, stop the
+        # deletion worker, close MongoDB and the hashing pool, then flush logs
+        if app.state.warm_up is not None and not app.state.warm_up.done():
+            app.state.warm_up.cancel()
+        await write_behind.stop()
+        await deletion_queue.stop()
+        await close_mongo_connection()
+        password_hasher.shutdown()
+        stop_logging()
+
+    with profile.phase("app", "assemble"):
+        app = FastAPI(
+            title="College Attendance Tracker API",
+            description="Backend API for tracking college attendance",
+            version="1.0.0",
+            lifespan=lifespan
+        )
+        app.state.warm_up = None
+
+        # Innermost: gzip/brotli for responses above COMPRESSION_MIN_BYTES
+        app.add_middleware(CompressionMiddleware)
+
+        # CORS middleware - allows React frontend to connect from any origin (for local dev)
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["*"],  # Allow all origins for local development
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=["ETag", "X-Request-ID"],  # ETag lets the frontend revalidate with If-None-Match
+        )
+
+        # Per-route latency histograms and in-flight counts, served at /metrics
+        app.add_middleware(MetricsMiddleware)
+
+        # Outermost: tags every log line written while serving a request with its X-Request-ID
+        app.add_middleware(RequestIdMiddleware)
+
+        # Include routers
+        app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
+        app.include_router(subjects_router, prefix="/api/subjects", tags=["Subjects"])
+        app.include_router(attendance_router, prefix="/api/attendance", tags=["Attendance"])
+
+        @app.get("/")
+        async def root():
+            return {"message": "College Attendance Tracker API is running!"}
+
+        @app.get("/health")
+        async def health_check():
+            """Liveness: the process is up (does not touch MongoDB)."""
+            return {"status": "healthy"}
+
+        @app.get("/health/ready")
+        async def readiness_check():
+            """
+            Readiness: pings MongoDB and reports the latency and pool usage.
+            Returns 503 while the startup warm-up is running (or if it failed) and
+            when MongoDB does not answer within READY_PING_TIMEOUT_SECONDS.
+            """
+            warm_up_task = app.state.warm_up
+            if warm_up_task is not None and not warm_up_task.done():
+                return JSONResponse(status_code=503, content={"status": "starting"})
+            # Error details go to the log only; the probe is unauthenticated
+            if warm_up_task is not None and not warm_up_task.cancelled() and warm_up_task.exception():
+                # background_warm_up already logged the traceback
+                return JSONResponse(status_code=503, content={"status": "unavailable"})
+
+            try:
+                latency_ms = await asyncio.wait_for(ping(), timeout=settings.ready_ping_timeout_seconds)
+            except Exception as exc:
+                logger.warning(
+                    "Readiness ping failed",
+                    extra={"error": str(exc) or type(exc).__name__, "pool": get_pool_stats()},
+                )
+                return JSONResponse(status_code=503, content={"status": "unavailable"})
+
+            return {
+                "status": "ready",
+                "mongo": {"ping_ms": round(latency_ms, 2), "pool": get_pool_stats()},
+            }
+
+        register_component_gauges()
+
+        @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(
+                registry.render(),
+                media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,335 @@
+"""
+Metrics
+Per-route request latency histograms and in-flight gauges (ASGI middleware),
+plus per-command MongoDB timings (pymongo CommandListener) and connection
+pool usage (pymongo ConnectionPoolListener), exposed at /metrics in the
+Prometheus text format.
+
+pymongo calls the listener from Motor's worker threads, so every metric
+guards its state with a lock.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Seconds; tuned for an API whose requests mostly finish in 1-500 ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    labels = _format_labels(key + (("le", repr(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(key + (("le", "+Inf"),))
+                lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {state[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Callback run before rendering, e.g. to copy cache stats into gauges."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route"
+))
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status"
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by command and collection"
+))
+mongo_command_failures = registry.register(Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by command and collection"
+))
+mongo_pool_checkout_wait = registry.register(Histogram(
+    "mongodb_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool"
+))
+mongo_pool_connections = registry.register(Gauge(
+    "mongodb_pool_connections", "Open and checked-out MongoDB connections"
+))
+mongo_pool_events = registry.register(Counter(
+    "mongodb_pool_events_total", "MongoDB pool events (created, closed, checkouts, failed checkouts)"
+))
+
+
+# ---------- HTTP middleware ----------
+
+def route_template(app, scope) -> str:
+    """Path template of the route that will handle scope (e.g. /api/attendance/{subject_id})."""
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and in-flight count per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope.get("app"), scope)
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method, route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method=method, route=route)
+            http_request_duration.observe(elapsed, method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+
+
+# ---------- MongoDB command listener ----------
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by command name and collection."""
+
+    def __init__(self):
+        self._collections: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event) -> None:
+        # getMore's first field is the cursor id; the collection is a separate field
+        field = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(field)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._collections.pop(self._key(event), "")
+
+    def succeeded(self, event) -> None:
+        collection = self._finish(event)
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, command=event.command_name, collection=collection
+        )
+
+    def failed(self, event) -> None:
+        collection = self._finish(event)
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, command=event.command_name, collection=collection
+        )
+        mongo_command_failures.inc(command=event.command_name, collection=collection)
+
+
+mongo_command_listener = MongoCommandMetrics()
+
+
+# ---------- MongoDB connection pool listener ----------
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Tracks open/checked-out connections and checkout wait times.
+
+    A checkout starts and finishes on the same driver thread, so the start
+    time is kept in a thread-local.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.max_checkout_wait_ms = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "max_checkout_wait_ms": round(self.max_checkout_wait_ms, 2),
+            }
+
+    def _publish(self) -> None:
+        mongo_pool_connections.set(self.open, state="open")
+        mongo_pool_connections.set(self.checked_out, state="checked_out")
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open += 1
+            self.created += 1
+            self._publish()
+        mongo_pool_events.inc(event="connection_created")
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+            self.closed += 1
+            self._publish()
+        mongo_pool_events.inc(event="connection_closed")
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.perf_counter()
+
+    def _checkout_wait(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_failed(self, event) -> None:
+        self._checkout_wait()
+        with self._lock:
+            self.checkout_failures += 1
+        mongo_pool_events.inc(event="checkout_failed")
+
+    def connection_checked_out(self, event) -> None:
+        waited = self._checkout_wait()
+        mongo_pool_checkout_wait.observe(waited)
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.max_checkout_wait_ms = max(self.max_checkout_wait_ms, waited * 1000)
+            self._publish()
+        mongo_pool_events.inc(event="checkout")
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+            self._publish()
+
+
+mongo_pool_listener = MongoPoolMetrics()
@@ -1,4 +1,11 @@
 # Models package
-from .user import UserRegister, UserLogin, UserResponse, TokenResponse, UserInDB
-from .subject import SubjectCreate, SubjectResponse, SubjectInDB
-from .attendance import AttendanceCreate, AttendanceResponse, AttendanceStats, AttendanceInDB
+from .user import UserResponse, TokenResponse, UserInDB
+from .subject import SubjectCreate, SubjectResponse, SubjectDeletionStatus, SubjectInDB
+from .attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceStats, AttendanceInDB,
+    AttendancePage, AttendanceCalendar,
+    AttendanceBulkCreate, AttendanceBulkItemResult, AttendanceBulkResponse,
+    SubjectStatsSummary, DashboardSummary,
+    SubjectProjection, AttendanceProjection,
+    AttendanceImportError, AttendanceImportResponse,
+)
@@ -3,18 +3,30 @@ Attendance model and schemas
 Defines the structure of attendance records in MongoDB
 """
 
-from pydantic import BaseModel, Field
-from typing import Literal
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 
+from .subject import SubjectResponse
+
 AttendanceStatus = Literal["present", "absent", "leave"]
 
 class AttendanceCreate(BaseModel):
     """Schema for marking attendance"""
     subject_id: str
-    date: str  # Format: YYYY-MM-DD
+    date: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")  # Format: YYYY-MM-DD
     status: AttendanceStatus
 
+    @field_validator("date")
+    @classmethod
+    def date_exists(cls, value: str) -> str:
+        """Reject impossible dates like 2024-02-31 that the pattern lets through."""
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("Invalid date, expected YYYY-MM-DD")
+        return value
+
 class AttendanceResponse(BaseModel):
     """Schema for attendance response"""
     id: str
@@ -27,6 +39,11 @@ class AttendanceResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AttendancePage(BaseModel):
+    """One page of attendance records with a keyset cursor for the next page"""
+    records: List[AttendanceResponse]
+    next_cursor: Optional[str] = None
+
 class AttendanceInDB(BaseModel):
     """Schema for attendance stored in MongoDB"""
     subject_id: str
@@ -42,3 +59,85 @@ class AttendanceStats(BaseModel):
     absent: int
     leave: int
     percentage: float
+
+class AttendanceBulkCreate(BaseModel):
+    """Schema for marking many attendance records in one request"""
+    records: List[AttendanceCreate] = Field(..., min_length=1, max_length=1000)
+
+class AttendanceBulkItemResult(BaseModel):
+    """Outcome of a single record inside a bulk request"""
+    index: int
+    subject_id: str
+    date: str
+    status: AttendanceStatus
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class AttendanceBulkResponse(BaseModel):
+    """Schema for bulk attendance response"""
+    written: int
+    failed: int
+    results: List[AttendanceBulkItemResult]
+
+class SubjectStatsSummary(BaseModel):
+    """Per-subject breakdown inside the dashboard summary"""
+    subject: SubjectResponse
+    total: int
+    present: int
+    absent: int
+    leave: int
+    percentage: int
+
+class DashboardSummary(BaseModel):
+    """Schema for the dashboard summary (matches the frontend DashboardStats)"""
+    totalSubjects: int
+    overallPercentage: int
+    totalPresent: int
+    totalAbsent: int
+    totalLeave: int
+    subjectStats: List[SubjectStatsSummary]
+
+class AttendanceCalendar(BaseModel):
+    """
+    One month of attendance as a packed bitmap.
+    Each subject gets an 8-byte row (2 bits per day, day 1 in the lowest
+    bits of the first byte): 0 none, 1 present, 2 absent, 3 leave.
+    subject_ids gives the row order; it is omitted when the request passed
+    subject_ids itself.
+    """
+    month: str
+    days: int
+    bitmap: str
+    subject_ids: Optional[List[str]] = None
+
+class SubjectProjection(BaseModel):
+    """Classes to attend / safe to skip for one subject"""
+    subject_id: str
+    name: str
+    present: int
+    total: int
+    percentage: float
+    classes_to_attend: Optional[int] = None
+    can_skip: int
+    remaining: Optional[int] = None
+    projected_percentage: Optional[float] = None
+    can_skip_remaining: Optional[int] = None
+
+class AttendanceProjection(BaseModel):
+    """Target projection for all of a user's subjects"""
+    target: float
+    subjects: List[SubjectProjection]
+
+class AttendanceImportError(BaseModel):
+    """A rejected row in an import"""
+    line: int
+    error: str
+
+class AttendanceImportResponse(BaseModel):
+    """Schema for import results"""
+    inserted: int
+    updated: int
+    rejected: int
+    created_subjects: List[str]
+    errors: List[AttendanceImportError]
@@ -4,9 +4,15 @@ Defines the structure of subject data in MongoDB
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+# Color palette for subjects created without one (routes and the importer)
+SUBJECT_COLORS = [
+    "#8B5CF6", "#EC4899", "#F59E0B", "#10B981",
+    "#3B82F6", "#EF4444", "#6366F1", "#14B8A6"
+]
+
 class SubjectCreate(BaseModel):
     """Schema for creating a new subject"""
     name: str = Field(..., min_length=1, max_length=100)
@@ -23,6 +29,14 @@ class SubjectResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SubjectDeletionStatus(BaseModel):
+    """Progress of a background subject deletion"""
+    subject_id: str
+    status: Literal["pending", "running", "done"]
+    deleted_records: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class SubjectInDB(BaseModel):
     """Schema for subject stored in MongoDB"""
     user_id: str
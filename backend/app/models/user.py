@@ -3,7 +3,7 @@ User model and schemas
 Defines the structure of user data in MongoDB
 """
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from bson import ObjectId
@@ -24,17 +24,8 @@ class PyObjectId(ObjectId):
     def __get_pydantic_json_schema__(cls, field_schema):
         field_schema.update(type="string")
 
-# Request schemas
-class UserRegister(BaseModel):
-    """Schema for user registration request"""
-    name: str = Field(..., min_length=2, max_length=100)
-    email: EmailStr
-    password: str = Field(..., min_length=6)
-
-class UserLogin(BaseModel):
-    """Schema for user login request"""
-    email: EmailStr
-    password: str
+# Request schemas (UserRegister, UserLogin) live in app.routes.auth: their
+# EmailStr fields import email-validator, which only the auth routes need
 
 # Response schemas
 class UserResponse(BaseModel):
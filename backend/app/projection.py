@@ -0,0 +1,102 @@
+"""
+Attendance target projection
+How many more classes each subject needs to reach a target percentage, or
+how many can be missed while staying above it, computed from the
+per-subject counters in one pass.
+
+Results are memoized per (user, data version, target, schedule). Every
+write bumps the user's data version, so a mark_attendance makes the old
+entries unreachable and they age out of the LRU.
+"""
+
+import math
+import os
+from fractions import Fraction
+from typing import Dict, List, Optional
+
+from app.cache import AsyncLRUCache
+
+projection_cache = AsyncLRUCache(
+    maxsize=int(os.getenv("PROJECTION_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PROJECTION_CACHE_TTL_SECONDS", "300")),
+)
+
+
+def parse_schedule(remaining: Optional[str]) -> Optional[Dict[str, int] | int]:
+    """
+    Parse the remaining-classes schedule: "20" for every subject, or
+    "subject_id:20,subject_id:12" per subject. Raises ValueError if malformed.
+    """
+    if not remaining:
+        return None
+    if ":" not in remaining:
+        value = int(remaining)
+        if value < 0:
+            raise ValueError("remaining must be >= 0")
+        return value
+
+    schedule = {}
+    for item in remaining.split(","):
+        subject_id, _, value = item.strip().partition(":")
+        schedule[subject_id.strip()] = int(value)
+        if schedule[subject_id.strip()] < 0:
+            raise ValueError("remaining must be >= 0")
+    return schedule
+
+
+def project(rows: List[dict], target: float, schedule=None) -> List[dict]:
+    """
+    rows: [{"subject_id", "name", "present", "total"}]; target in percent (0-100].
+
+    Per subject:
+      classes_to_attend  consecutive classes to attend to reach the target
+                         (None if unreachable, i.e. target 100 after a miss)
+      can_skip           classes that can be missed now and stay >= target
+    With a schedule of remaining classes R:
+      projected_percentage  percentage if every remaining class is attended
+      can_skip_remaining    remaining classes that can be missed and still end
+                            >= target (None if the target is out of reach)
+    """
+    # Exact fractions so 75% of 4 classes is exactly 3, not 2.9999
+    ratio = Fraction(target).limit_denominator(1000) / 100
+
+    results = []
+    for row in rows:
+        present, total = row["present"], row["total"]
+
+        if present >= ratio * total:
+            to_attend = 0
+            can_skip = math.floor(present / ratio) - total
+        elif ratio == 1:
+            to_attend = None
+            can_skip = 0
+        else:
+            to_attend = math.ceil((ratio * total - present) / (1 - ratio))
+            can_skip = 0
+
+        result = {
+            "subject_id": row["subject_id"],
+            "name": row["name"],
+            "present": present,
+            "total": total,
+            "percentage": round(present / total * 100, 1) if total else 0.0,
+            "classes_to_attend": to_attend,
+            "can_skip": can_skip,
+            "remaining": None,
+            "projected_percentage": None,
+            "can_skip_remaining": None,
+        }
+
+        remaining = schedule.get(row["subject_id"]) if isinstance(schedule, dict) else schedule
+        if remaining is not None:
+            final_total = total + remaining
+            slack = math.floor(present + remaining - ratio * final_total)
+            result["remaining"] = remaining
+            result["projected_percentage"] = (
+                round((present + remaining) / final_total * 100, 1) if final_total else 0.0
+            )
+            result["can_skip_remaining"] = min(slack, remaining) if slack >= 0 else None
+
+        results.append(result)
+
+    return results
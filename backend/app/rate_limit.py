@@ -0,0 +1,256 @@
+"""
+Auth rate limiting
+Token buckets per client IP and per email for /api/auth/login and
+/api/auth/register. Every attempt costs a full bcrypt run, so limits are
+checked first and a rejected attempt never reaches the hasher; the routes
+map RateLimited to 429 with Retry-After.
+
+A limit "N/S" allows bursts of N attempts and refills N tokens every S
+seconds. Bucket state lives in a backend:
+
+    memory  bounded in-process LRU (RATE_LIMIT_MAX_KEYS); idle buckets are
+            forgotten once they would be full again. Per worker.
+    mongo   the rate_limits collection (atomic pipeline update, TTL index),
+            shared by every worker and instance
+    off     no limiting
+
+Environment:
+    RATE_LIMIT_BACKEND             memory (default), mongo or off
+    RATE_LIMIT_LOGIN_PER_IP        default 20/60
+    RATE_LIMIT_LOGIN_PER_EMAIL     default 5/60
+    RATE_LIMIT_REGISTER_PER_IP     default 5/600
+    RATE_LIMIT_REGISTER_PER_EMAIL  default 3/600
+    RATE_LIMIT_TRUSTED_PROXIES     number of reverse proxies in front of the
+                                   app (default 0). With N > 0 the client IP
+                                   is the Nth X-Forwarded-For entry from the
+                                   right, the one the outermost proxy saw;
+                                   entries further left are client-supplied
+"""
+
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+
+
+class Limit:
+    """Bucket of `capacity` tokens refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        capacity, _, period = value.partition("/")
+        return cls(int(capacity), float(period or 60))
+
+    def __repr__(self) -> str:
+        return f"Limit({self.capacity}/{self.period:g}s)"
+
+
+LIMITS = {
+    "login": {
+        "ip": Limit.parse(os.getenv("RATE_LIMIT_LOGIN_PER_IP", "20/60")),
+        "email": Limit.parse(os.getenv("RATE_LIMIT_LOGIN_PER_EMAIL", "5/60")),
+    },
+    "register": {
+        "ip": Limit.parse(os.getenv("RATE_LIMIT_REGISTER_PER_IP", "5/600")),
+        "email": Limit.parse(os.getenv("RATE_LIMIT_REGISTER_PER_EMAIL", "3/600")),
+    },
+}
+
+
+class RateLimited(Exception):
+    """Raised when an attempt is over its limit."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+# ---------- Backends ----------
+# A backend implements `async take(key, limit) -> float`: take one token and
+# return 0, or leave the bucket untouched and return seconds until a token
+# is available.
+
+class MemoryBackend:
+    """Token buckets in a bounded LRU. All updates run between awaits, so no lock."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at, full_at) on the monotonic clock
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        tokens, updated_at, _ = self._buckets.get(key, (limit.capacity, now, now))
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        # Past full_at the bucket is full again, which is the same as no entry
+        full_at = now + (limit.capacity - tokens) / limit.rate
+        self._buckets[key] = (tokens, now, full_at)
+        self._buckets.move_to_end(key)
+        self._evict(now)
+
+        return 0.0 if allowed else (1 - tokens) / limit.rate
+
+    def _evict(self, now: float) -> None:
+        # Least recently used entries first; stop at the first still-draining one
+        while self._buckets:
+            _, _, full_at = next(iter(self._buckets.values()))
+            if full_at > now:
+                break
+            self._buckets.popitem(last=False)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+class MongoBackend:
+    """
+    Token buckets in MongoDB, shared between workers.
+
+    One atomic find_one_and_update per check: an update pipeline refills the
+    bucket from the elapsed time and takes a token if one is available.
+    Documents expire through the expires_at TTL index once full again.
+    """
+
+    collection_name = "rate_limits"
+
+    def __init__(self, database=None):
+        self.database = database
+
+    def _collection(self):
+        if self.database is None:
+            from app.database import get_database
+            return get_database()[self.collection_name]
+        return self.database[self.collection_name]
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = datetime.utcnow()
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [
+            limit.capacity,
+            {"$add": [{"$ifNull": ["$tokens", limit.capacity]}, {"$multiply": [elapsed_seconds, limit.rate]}]}
+        ]}
+
+        update = [
+            {"$set": {"tokens": refilled, "updated_at": now}},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                "expires_at": now + timedelta(seconds=limit.period),
+            }},
+        ]
+
+        try:
+            bucket = await self._collection().find_one_and_update(
+                {"_id": key}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost a first-hit upsert race with a concurrent attempt; the bucket exists now
+            bucket = await self._collection().find_one_and_update(
+                {"_id": key}, update, return_document=ReturnDocument.AFTER
+            )
+
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / limit.rate
+
+    def stats(self) -> dict:
+        return {}
+
+
+class RateLimiter:
+    """Checks attempts against LIMITS with a backend, counting outcomes."""
+
+    def __init__(self, backend, limits: dict):
+        self.backend = backend
+        self.limits = limits
+        self.allowed = 0
+        self.rejected = 0
+
+    async def check(self, action: str, ip: Optional[str], email: Optional[str] = None) -> None:
+        """
+        Take a token from each of the action's buckets, IP first. Raises
+        RateLimited at the first empty bucket; later buckets are not charged.
+        """
+        if self.backend is None:
+            return
+
+        checks: List[Tuple[str, Limit]] = []
+        limits = self.limits.get(action, {})
+        if "ip" in limits and ip:
+            checks.append((f"{action}:ip:{ip}", limits["ip"]))
+        if "email" in limits and email:
+            checks.append((f"{action}:email:{email.lower()}", limits["email"]))
+
+        for key, limit in checks:
+            retry_after = await self.backend.take(key, limit)
+            if retry_after > 0:
+                self.rejected += 1
+                raise RateLimited(retry_after)
+
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            **(self.backend.stats() if self.backend is not None else {}),
+        }
+
+
+def create_backend(name: str):
+    if name == "off":
+        return None
+    if name == "mongo":
+        return MongoBackend()
+    return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+
+
+def client_ip(request, trusted_proxies: int = None) -> Optional[str]:
+    """
+    Client address of a Starlette request.
+
+    Each proxy appends the address it received the request from, so behind
+    N trusted proxies the Nth X-Forwarded-For entry from the right is the
+    client. Anything left of it was sent by the client and can be forged; a
+    header with fewer entries than proxies falls back to the peer address.
+    """
+    if trusted_proxies is None:
+        trusted_proxies = RATE_LIMIT_TRUSTED_PROXIES
+    if trusted_proxies > 0:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return request.client.host if request.client else None
+
+rate_limiter = RateLimiter(create_backend(RATE_LIMIT_BACKEND), LIMITS)
@@ -0,0 +1,228 @@
+"""
+Response cache
+Read-through cache for per-user GET responses (the subject list and
+per-subject stats). Each user has one entry holding their data version and
+the cached bodies:
+
+    {"version": 7, "bodies": {"subjects": [...], "stats:<subject_id>": {...}}}
+
+A hit answers both the ETag check and the body without touching MongoDB.
+bump_data_version drops the user's entry, so every write handler that bumps
+the version also invalidates the cache.
+
+A miss loads the body after reading the version, and a write can land in
+between. get() therefore also returns a generation token, taken before the
+version is read, and put() stores the body only if the user's entry has not
+been invalidated since (compare-and-set). A body loaded for a superseded
+version is dropped instead of being served until the TTL.
+
+Backends (RESPONSE_CACHE_BACKEND):
+    memory  in-process LRU over users with TTL (default; per worker)
+    kv      external key-value store with get/set(ex=)/delete, e.g. Redis at
+            RESPONSE_CACHE_KV_URL (needs the `redis` package); without a URL
+            an in-process LocalKV stand-in is used
+    off     no caching
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.cache import AsyncLRUCache
+from app.serialization import dumps
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_KV_URL = os.getenv("RESPONSE_CACHE_KV_URL")
+
+
+class MemoryBackend:
+    """
+    Entries as Python objects in an AsyncLRUCache.
+
+    The token is a process-wide invalidation clock. put() is synchronous, so
+    checking the user's last invalidation and storing cannot interleave with
+    another coroutine. Invalidation times are kept for `maxsize` users; older
+    ones fold into a floor that rejects puts from before it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = AsyncLRUCache(maxsize=maxsize, ttl=ttl)
+        self._clock = 0
+        self._floor = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+
+    async def get(self, user_id: str) -> Tuple[int, Optional[dict]]:
+        return self._clock, self.cache.get(user_id)
+
+    async def put(self, user_id: str, token: int, entry: dict) -> bool:
+        if self._invalidated.get(user_id, self._floor) > token:
+            return False
+        self.cache.set(user_id, entry)
+        return True
+
+    async def delete(self, user_id: str) -> None:
+        self._clock += 1
+        self._invalidated[user_id] = self._clock
+        self._invalidated.move_to_end(user_id)
+        while len(self._invalidated) > self.cache.maxsize:
+            _, invalidated_at = self._invalidated.popitem(last=False)
+            self._floor = max(self._floor, invalidated_at)
+        self.cache.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return {"size": len(self.cache), "maxsize": self.cache.maxsize, "evictions": self.cache.evictions}
+
+
+class LocalKV:
+    """In-process stand-in for a Redis-like client (get / mget / set with ex / incr / delete)."""
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def mget(self, keys: list) -> list:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ex: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        expires_at = self._data[key][0] if key in self._data else None
+        self._data[key] = (expires_at, str(value).encode())
+        return value
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class KVBackend:
+    """
+    Entries as JSON under `resp:<user_id>`, and a generation counter under
+    `resp:<user_id>:gen` that invalidation increments. A get and a set are
+    separate round trips, so put() cannot check and store atomically;
+    instead every entry records the generation it was loaded under, and
+    get() ignores entries from an older generation. The store handles
+    expiry and eviction.
+    """
+
+    def __init__(self, client, ttl: float, prefix: str = "resp:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, user_id: str) -> Tuple[int, Optional[dict]]:
+        key = self.prefix + user_id
+        value, generation = await self.client.mget([key, key + ":gen"])
+        generation = int(generation or 0)
+        entry = json.loads(value) if value else None
+        if entry is not None and entry.get("generation") != generation:
+            entry = None
+        return generation, entry
+
+    async def put(self, user_id: str, token: int, entry: dict) -> bool:
+        key = self.prefix + user_id
+        # Skip a put that is already stale instead of evicting a current entry;
+        # one landing after this check is still ignored by get()
+        if int(await self.client.get(key + ":gen") or 0) != token:
+            return False
+        entry = {**entry, "generation": token}
+        await self.client.set(key, dumps(entry), ex=max(1, int(self.ttl)))
+        return True
+
+    async def delete(self, user_id: str) -> None:
+        key = self.prefix + user_id
+        await self.client.incr(key + ":gen")
+        await self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ResponseCache:
+    """Per-user response entries on a backend, with hit/miss/invalidation counters."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    async def get(self, user_id: str, name: str) -> Tuple[Optional[int], Optional[tuple]]:
+        """
+        Return (token, (version, body)) for a cached response, or (token, None)
+        on a miss. Pass the token to put() for the body loaded after the miss.
+        """
+        if self.backend is None:
+            return None, None
+
+        token, entry = await self.backend.get(user_id)
+        if entry is not None and name in entry["bodies"]:
+            self.hits += 1
+            return token, (entry["version"], entry["bodies"][name])
+
+        self.misses += 1
+        return token, None
+
+    async def put(self, user_id: str, token: Optional[int], version: int, name: str, body: Any) -> bool:
+        """
+        Add a body to the user's entry (starting a new entry if the version
+        moved on), unless the user was invalidated after get() returned
+        `token`. Returns whether the body was stored.
+        """
+        if self.backend is None:
+            return False
+
+        _, current = await self.backend.get(user_id)
+        bodies = current["bodies"] if current is not None and current["version"] == version else {}
+        # A new entry: the cached one may be shared and must stay untouched if the put loses
+        entry = {"version": version, "bodies": {**bodies, name: body}}
+        stored = await self.backend.put(user_id, token, entry)
+        if not stored:
+            self.stale_puts += 1
+        return stored
+
+    async def invalidate(self, user_id: str) -> None:
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        await self.backend.delete(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+            **(self.backend.stats() if self.backend is not None else {}),
+        }
+
+
+def create_backend(name: str):
+    if name == "off":
+        return None
+    if name == "kv":
+        if RESPONSE_CACHE_KV_URL:
+            import redis.asyncio as redis
+            client = redis.from_url(RESPONSE_CACHE_KV_URL)
+        else:
+            client = LocalKV()
+        return KVBackend(client, RESPONSE_CACHE_TTL_SECONDS)
+    return MemoryBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = ResponseCache(create_backend(RESPONSE_CACHE_BACKEND))
@@ -3,36 +3,570 @@ Attendance routes
 Handles attendance marking and retrieval
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Literal, Optional, Union
 from bson import ObjectId
+import base64
+import binascii
+import calendar
+import csv
+import io
+import json
+import logging
+import re
 
-from app.database import get_attendance_collection, get_subjects_collection
-from app.models.attendance import AttendanceCreate, AttendanceResponse, AttendanceStats
+from app.counters import (
+    apply_counter_deltas,
+    merge_delta,
+    normalize_counts,
+    status_delta,
+)
+from app.attendance_store import get_attendance_store
+from app.database import get_subjects_collection, get_database
+from app.deletions import ACTIVE_SUBJECT, deleted_subject_ids
+from app.importer import AttendanceImporter, iter_rows
+from app.projection import parse_schedule, project, projection_cache
+from app.models.attendance import (
+    AttendanceCreate,
+    AttendanceResponse,
+    AttendanceStats,
+    AttendanceBulkCreate,
+    AttendanceBulkItemResult,
+    AttendanceBulkResponse,
+    AttendanceCalendar,
+    AttendanceImportResponse,
+    AttendancePage,
+    AttendanceProjection,
+    DashboardSummary,
+    SubjectStatsSummary,
+)
+from app.models.subject import SubjectResponse
 from app.routes.auth import get_current_user
+from app.serialization import (
+    FAST_JSON_RESPONSES,
+    attendance_row,
+    encoded_response,
+    negotiate_encoding,
+)
+from app.versions import bump_data_version, get_data_version, not_modified, read_through
+from app.write_behind import pending_record, write_behind
 
 router = APIRouter()
 
-@router.get("/{subject_id}", response_model=List[AttendanceResponse])
+logger = logging.getLogger(__name__)
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+# Documents fetched per cursor round trip while streaming exports
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = ["subject_id", "subject_name", "date", "status", "created_at"]
+
+# Page size for the per-subject listing
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+# Calendar bitmap: 2 bits per day, fixed 8-byte row per subject (32 day slots)
+CALENDAR_CODES = {"present": 1, "absent": 2, "leave": 3}
+CALENDAR_ROW_BYTES = 8
+
+
+def encode_cursor(date: str) -> str:
+    """Opaque keyset cursor for the record dated `date`."""
+    return base64.urlsafe_b64encode(date.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        date = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        date = ""
+    if not re.match(DATE_PATTERN, date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return date
+
+
+def to_attendance_response(record: dict) -> AttendanceResponse:
+    """Build an AttendanceResponse from a raw MongoDB document."""
+    return AttendanceResponse(
+        id=str(record["_id"]),
+        subject_id=record["subject_id"],
+        user_id=record["user_id"],
+        date=record["date"],
+        status=record["status"],
+        created_at=record["created_at"]
+    )
+
+
+@router.get(
+    "/",
+    response_model=Union[List[AttendanceResponse], Dict[str, List[AttendanceResponse]]]
+)
+async def get_all_attendance(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    subject_ids: Optional[str] = Query(None, description="Comma-separated subject ids"),
+    group_by: Optional[Literal["subject"]] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get attendance records across all of the user's subjects in one query.
+
+    Records are scoped by user_id, so no per-subject ownership check is
+    needed. Pass group_by=subject to get {subject_id: [records]}.
+
+    Example MongoDB find:
+    attendance.find({
+        "user_id": "user123",
+        "subject_id": {"$in": ["...", "..."]},
+        "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}
+    }).sort([("subject_id", 1), ("date", 1)])
+    """
+    encoding = negotiate_encoding(request, response)
+
+    # Unflushed write-behind marks are merged in; such a response gets no ETag
+    if not write_behind.pending(current_user["id"]):
+        cached = await not_modified(request, response, current_user["id"], encoding=encoding)
+        if cached:
+            return cached
+
+    store = get_attendance_store()
+
+    query = {"user_id": current_user["id"]}
+
+    # Records of subjects pending background deletion are hidden
+    deleted_ids = await deleted_subject_ids(get_database(), current_user["id"])
+
+    if subject_ids:
+        ids = [sid.strip() for sid in subject_ids.split(",") if sid.strip()]
+        query["subject_id"] = {"$in": [sid for sid in ids if sid not in deleted_ids]}
+    elif deleted_ids:
+        query["subject_id"] = {"$nin": deleted_ids}
+
+    if date_from or date_to:
+        query["date"] = {}
+        if date_from:
+            query["date"]["$gte"] = date_from
+        if date_to:
+            query["date"]["$lte"] = date_to
+
+    cursor = store.find(query, sort=[("subject_id", 1), ("date", 1)])
+
+    def keep(subject_id: str, date: str) -> bool:
+        if subject_id in deleted_ids or (ids is not None and subject_id not in ids):
+            return False
+        return (not date_from or date >= date_from) and (not date_to or date <= date_to)
+
+    ids = set(query["subject_id"]["$in"]) if "$in" in query.get("subject_id", {}) else None
+    records = write_behind.merge_records(
+        current_user["id"], [record async for record in cursor], keep
+    )
+
+    if FAST_JSON_RESPONSES or encoding.compact:
+        if group_by == "subject":
+            grouped_rows: Dict[str, list] = {}
+            for record in records:
+                grouped_rows.setdefault(record["subject_id"], []).append(attendance_row(record))
+            return encoded_response(grouped_rows, encoding, response)
+        return encoded_response([attendance_row(record) for record in records], encoding, response)
+
+    if group_by == "subject":
+        grouped: Dict[str, List[AttendanceResponse]] = {}
+        for record in records:
+            grouped.setdefault(record["subject_id"], []).append(
+                to_attendance_response(record)
+            )
+        return grouped
+
+    return [to_attendance_response(record) for record in records]
+
+def rounded_percentage(present: int, total: int) -> int:
+    """Whole-number percentage, rounding halves up like the frontend's Math.round."""
+    return int(present * 100 / total + 0.5) if total > 0 else 0
+
+
+def dashboard_pipeline(store, user_id: str, date_from: Optional[str], date_to: Optional[str]) -> list:
+    """
+    Aggregation over subjects behind /summary: each subject joined with its
+    attendance counts per status (optionally within a date window), faceted
+    into per-subject rows and overall totals.
+    """
+    attendance_match = {
+        "user_id": user_id,
+        "$expr": {"$eq": ["$subject_id", "$$subject_id"]}
+    }
+    if date_from or date_to:
+        attendance_match["date"] = {}
+        if date_from:
+            attendance_match["date"]["$gte"] = date_from
+        if date_to:
+            attendance_match["date"]["$lte"] = date_to
+
+    return [
+        {"$match": {"user_id": user_id, **ACTIVE_SUBJECT}},
+        {"$sort": {"created_at": 1}},
+        store.lookup_stage(
+            {"subject_id": {"$toString": "$_id"}},
+            attendance_match,
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "counts"
+        ),
+        {"$facet": {
+            "subjects": [
+                {"$project": {
+                    "user_id": 1, "name": 1, "color": 1, "created_at": 1, "counts": 1
+                }}
+            ],
+            "totals": [
+                {"$unwind": "$counts"},
+                {"$group": {"_id": "$counts._id", "count": {"$sum": "$counts.count"}}}
+            ]
+        }}
+    ]
+
+
+def dashboard_summary(facets: dict) -> DashboardSummary:
+    """Build the DashboardStats shape from the result of dashboard_pipeline."""
+    subject_stats = []
+    for subject in facets["subjects"]:
+        counts = {doc["_id"]: doc["count"] for doc in subject["counts"]}
+        present = counts.get("present", 0)
+        absent = counts.get("absent", 0)
+        leave = counts.get("leave", 0)
+        total = present + absent + leave
+        subject_stats.append(SubjectStatsSummary(
+            subject=SubjectResponse(
+                id=str(subject["_id"]),
+                user_id=subject["user_id"],
+                name=subject["name"],
+                color=subject["color"],
+                created_at=subject["created_at"]
+            ),
+            total=total,
+            present=present,
+            absent=absent,
+            leave=leave,
+            percentage=rounded_percentage(present, total)
+        ))
+
+    totals = {doc["_id"]: doc["count"] for doc in facets["totals"]}
+    total_present = totals.get("present", 0)
+    total_absent = totals.get("absent", 0)
+    total_leave = totals.get("leave", 0)
+
+    return DashboardSummary(
+        totalSubjects=len(subject_stats),
+        overallPercentage=rounded_percentage(
+            total_present, total_present + total_absent + total_leave
+        ),
+        totalPresent=total_present,
+        totalAbsent=total_absent,
+        totalLeave=total_leave,
+        subjectStats=subject_stats
+    )
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the dashboard totals and per-subject breakdown in one aggregation.
+
+    Starts from the user's subjects, joins their attendance counts with
+    $lookup (optionally limited to a date window) and uses $facet to return
+    the per-subject rows and the overall totals together.
+
+    Example MongoDB aggregation:
+    subjects.aggregate([
+        {"$match": {"user_id": "user123"}},
+        {"$lookup": {"from": "attendance", ..., "as": "counts"}},
+        {"$facet": {"subjects": [...], "totals": [...]}}
+    ])
+    """
+    await write_behind.flush_user(current_user["id"])
+    cached = await not_modified(request, response, current_user["id"])
+    if cached:
+        return cached
+
+    pipeline = dashboard_pipeline(get_attendance_store(), current_user["id"], date_from, date_to)
+    result = await get_subjects_collection().aggregate(pipeline).to_list(length=1)
+    return dashboard_summary(result[0] if result else {"subjects": [], "totals": []})
+
+async def export_rows(cursor, subject_names: Dict[str, str]):
+    """Yield export rows (dicts in EXPORT_FIELDS order) one cursor batch at a time."""
+    batch = []
+    async for record in cursor:
+        batch.append({
+            "subject_id": record["subject_id"],
+            "subject_name": subject_names.get(record["subject_id"], ""),
+            "date": record["date"],
+            "status": record["status"],
+            "created_at": record["created_at"].isoformat(),
+        })
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def stream_csv(cursor, subject_names: Dict[str, str]):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    async for batch in export_rows(cursor, subject_names):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def stream_ndjson(cursor, subject_names: Dict[str, str]):
+    async for batch in export_rows(cursor, subject_names):
+        yield "".join(json.dumps(row) + "\n" for row in batch)
+
+
+@router.get("/export")
+async def export_attendance(
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream all of the user's attendance records as CSV or NDJSON.
+
+    Rows are read from the cursor in batches of EXPORT_BATCH_SIZE with a
+    projection and written out as they arrive, so memory use does not grow
+    with the number of records.
+
+    Example MongoDB find:
+    attendance.find(
+        {"user_id": "user123"},
+        {"_id": 0, "subject_id": 1, "date": 1, "status": 1, "created_at": 1}
+    ).sort([("subject_id", 1), ("date", 1)]).batch_size(1000)
+    """
+    await write_behind.flush_user(current_user["id"])
+    store = get_attendance_store()
+    subjects = get_subjects_collection()
+
+    # Subject names are small and needed on every row
+    subject_names = {}
+    async for subject in subjects.find({"user_id": current_user["id"], **ACTIVE_SUBJECT}, {"name": 1}):
+        subject_names[str(subject["_id"])] = subject["name"]
+
+    export_filter = {"user_id": current_user["id"]}
+    deleted_ids = await deleted_subject_ids(get_database(), current_user["id"])
+    if deleted_ids:
+        export_filter["subject_id"] = {"$nin": deleted_ids}
+
+    cursor = store.find(
+        export_filter, sort=[("subject_id", 1), ("date", 1)], batch_size=EXPORT_BATCH_SIZE
+    )
+
+    if format == "ndjson":
+        body = stream_ndjson(cursor, subject_names)
+        media_type = "application/x-ndjson"
+    else:
+        body = stream_csv(cursor, subject_names)
+        media_type = "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="attendance.{format}"'}
+    )
+
+def pack_month(records, rows: Dict[str, int], row_count: int) -> bytes:
+    """Pack {subject_id, date, status} records into row_count CALENDAR_ROW_BYTES rows."""
+    bitmap = bytearray(CALENDAR_ROW_BYTES * row_count)
+    for record in records:
+        row = rows.get(record["subject_id"])
+        if row is None:
+            continue
+        day = record["date"][8:10]
+        if not day.isdigit() or not 1 <= int(day) <= 31:
+            continue  # malformed date stored before dates were validated
+        slot = (int(day) - 1) * 2
+        bitmap[row * CALENDAR_ROW_BYTES + slot // 8] |= CALENDAR_CODES[record["status"]] << (slot % 8)
+    return bytes(bitmap)
+
+@router.get("/calendar", response_model=AttendanceCalendar, response_model_exclude_none=True)
+async def get_attendance_calendar(
+    request: Request,
+    response: Response,
+    month: str = Query(..., pattern=MONTH_PATTERN, description="YYYY-MM"),
+    subject_ids: Optional[str] = Query(None, description="Comma-separated subject ids (row order)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get a month of attendance for all subjects as a packed 2-bit bitmap.
+
+    Rows follow subject_ids when given (ids that are not the user's active
+    subjects get empty rows), else the user's subjects in creation order.
+    A month for 10 subjects is about 110 bytes of base64 instead of a JSON
+    record per marked day.
+
+    Example MongoDB find:
+    attendance.find(
+        {"user_id": "user123", "subject_id": {"$in": [...]},
+         "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}},
+        {"_id": 0, "subject_id": 1, "date": 1, "status": 1}
+    )
+    """
+    # Unflushed write-behind marks are merged in; such a response gets no ETag
+    if not write_behind.pending(current_user["id"]):
+        cached = await not_modified(request, response, current_user["id"])
+        if cached:
+            return cached
+
+    store = get_attendance_store()
+    subjects = get_subjects_collection()
+
+    active_ids = [
+        str(subject["_id"])
+        async for subject in subjects.find(
+            {"user_id": current_user["id"], **ACTIVE_SUBJECT}, {"_id": 1}
+        ).sort("_id", 1)
+    ]
+    row_ids = [sid.strip() for sid in subject_ids.split(",") if sid.strip()] if subject_ids else active_ids
+
+    active = set(active_ids)
+    rows = {sid: index for index, sid in enumerate(row_ids) if sid in active}
+
+    days = calendar.monthrange(int(month[:4]), int(month[5:7]))[1]
+
+    cursor = store.find(
+        {
+            "user_id": current_user["id"],
+            "subject_id": {"$in": list(rows)},
+            "date": {"$gte": f"{month}-01", "$lte": f"{month}-{days:02d}"}
+        },
+        projection={"_id": 0, "subject_id": 1, "date": 1, "status": 1}
+    )
+    records = write_behind.merge_records(
+        current_user["id"],
+        [record async for record in cursor],
+        lambda subject_id, date: subject_id in rows and date.startswith(month)
+    )
+    packed = pack_month(records, rows, len(row_ids))
+
+    return AttendanceCalendar(
+        month=month,
+        days=days,
+        bitmap=base64.b64encode(packed).decode("ascii"),
+        subject_ids=None if subject_ids else row_ids
+    )
+
+@router.get("/projection", response_model=AttendanceProjection)
+async def get_attendance_projection(
+    request: Request,
+    response: Response,
+    target: float = Query(75, gt=0, le=100, description="Target percentage"),
+    remaining: Optional[str] = Query(
+        None, description="Remaining classes: N for all subjects, or subject_id:N,..."
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Classes to attend to reach target, or classes that can be missed, for
+    every subject at once from the stored counters.
+
+    Memoized per (user, data version, target, remaining); any write bumps
+    the data version, so a cached projection is never stale.
+
+    Example MongoDB find:
+    subjects.find({"user_id": "user123"}, {"name": 1, "counts": 1})
+    """
+    await write_behind.flush_user(current_user["id"])
+    version = await get_data_version(current_user["id"])
+    cached = await not_modified(request, response, current_user["id"], version)
+    if cached:
+        return cached
+
+    try:
+        schedule = parse_schedule(remaining)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid remaining schedule"
+        )
+
+    async def load():
+        store = get_attendance_store()
+        subjects = get_subjects_collection()
+        rows = []
+        async for subject in subjects.find(
+            {"user_id": current_user["id"], **ACTIVE_SUBJECT}, {"name": 1, "counts": 1}
+        ).sort("_id", 1):
+            subject_id = str(subject["_id"])
+            if "counts" in subject:
+                counts = normalize_counts(subject["counts"])
+            else:
+                counts = await store.count_statuses(current_user["id"], subject_id)
+            rows.append({
+                "subject_id": subject_id,
+                "name": subject["name"],
+                "present": counts["present"],
+                "total": counts["total"],
+            })
+        return project(rows, target, schedule)
+
+    key = (current_user["id"], version, target, remaining or "")
+    projections = await projection_cache.get_or_load(key, load)
+
+    return AttendanceProjection(target=target, subjects=projections)
+
+@router.get("/{subject_id}", response_model=AttendancePage)
 async def get_attendance(
     subject_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get all attendance records for a subject.
+    Get a page of attendance records for a subject, ordered by date.
+    
+    Pages use a keyset cursor on date (unique per subject), so every page is
+    a bounded range scan on the (user_id, subject_id, date) index no matter
+    how deep the client pages.
     
     Example MongoDB find:
-    attendance.find({"subject_id": "...", "user_id": "user123"})
+    attendance.find({
+        "subject_id": "...", "user_id": "user123",
+        "date": {"$gt": "<after>", "$lte": "2024-01-31"}
+    }).sort("date", 1).limit(limit + 1)
     """
-    attendance = get_attendance_collection()
+    await write_behind.flush_user(current_user["id"])
+    encoding = negotiate_encoding(request, response)
+    cached = await not_modified(request, response, current_user["id"], encoding=encoding)
+    if cached:
+        return cached
+
+    store = get_attendance_store()
     subjects = get_subjects_collection()
     
     # Verify subject belongs to user
     subject = await subjects.find_one({
         "_id": ObjectId(subject_id),
-        "user_id": current_user["id"]
-    })
+        "user_id": current_user["id"],
+        **ACTIVE_SUBJECT
+    }, {"_id": 1})
     
     if not subject:
         raise HTTPException(
@@ -40,23 +574,47 @@ async def get_attendance(
             detail="Subject not found"
         )
     
-    cursor = attendance.find({
+    query = {
         "subject_id": subject_id,
         "user_id": current_user["id"]
-    })
+    }
+    
+    date_range = {}
+    if date_from:
+        date_range["$gte"] = date_from
+    if date_to:
+        date_range["$lte"] = date_to
+    if after:
+        after_date = decode_cursor(after)
+        if date_from and after_date < date_from:
+            after_date = None
+        if after_date:
+            date_range.pop("$gte", None)
+            date_range["$gt"] = after_date
+    if date_range:
+        query["date"] = date_range
+    
+    # One extra document tells us whether another page exists
+    cursor = store.find(query, sort=[("date", 1)], limit=limit + 1)
+    
+    if FAST_JSON_RESPONSES or encoding.compact:
+        rows = [attendance_row(record) async for record in cursor]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["date"])
+        return encoded_response({"records": rows, "next_cursor": next_cursor}, encoding, response)
     
     records = []
     async for record in cursor:
-        records.append(AttendanceResponse(
-            id=str(record["_id"]),
-            subject_id=record["subject_id"],
-            user_id=record["user_id"],
-            date=record["date"],
-            status=record["status"],
-            created_at=record["created_at"]
-        ))
+        records.append(to_attendance_response(record))
+    
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].date)
     
-    return records
+    return AttendancePage(records=records, next_cursor=next_cursor)
 
 @router.post("/", response_model=AttendanceResponse)
 async def mark_attendance(
@@ -66,20 +624,30 @@ async def mark_attendance(
     """
     Mark or update attendance for a subject on a specific date.
     
+    The unique (user_id, subject_id, date) index makes the upsert atomic, so
+    concurrent taps on the same day cannot create duplicate records. With
+    ATTENDANCE_STORAGE=buckets the same write is a single $set on the
+    month's bucket (see app.attendance_store). With WRITE_BEHIND=1 the mark
+    is only buffered and written by the next flush (see app.write_behind);
+    the returned id is provisional.
+    
     Example MongoDB upsert:
-    attendance.update_one(
+    attendance.find_one_and_update(
         {"subject_id": "...", "user_id": "...", "date": "2024-01-15"},
-        {"$set": {"status": "present", ...}},
-        upsert=True
+        {"$set": {"status": "present"}, "$setOnInsert": {"created_at": ...}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
     )
+    subjects.update_one({"_id": ...}, {"$inc": {"counts.present": 1, "counts.total": 1}})
     """
-    attendance = get_attendance_collection()
+    store = get_attendance_store()
     subjects = get_subjects_collection()
     
     # Verify subject belongs to user
     subject = await subjects.find_one({
         "_id": ObjectId(attendance_data.subject_id),
-        "user_id": current_user["id"]
+        "user_id": current_user["id"],
+        **ACTIVE_SUBJECT
     })
     
     if not subject:
@@ -88,101 +656,263 @@ async def mark_attendance(
             detail="Subject not found"
         )
     
-    # Check if attendance record exists for this date
-    existing = await attendance.find_one({
-        "subject_id": attendance_data.subject_id,
-        "user_id": current_user["id"],
-        "date": attendance_data.date
-    })
-    
-    if existing:
-        # Update existing record
-        await attendance.update_one(
-            {"_id": existing["_id"]},
-            {"$set": {"status": attendance_data.status}}
+    if write_behind.enabled:
+        marked_at = write_behind.add(
+            current_user["id"], attendance_data.subject_id, attendance_data.date, attendance_data.status
         )
-        
-        print(f"✅ Attendance updated in MongoDB: {attendance_data.date} -> {attendance_data.status}")
-        
-        return AttendanceResponse(
-            id=str(existing["_id"]),
-            subject_id=attendance_data.subject_id,
-            user_id=current_user["id"],
-            date=attendance_data.date,
-            status=attendance_data.status,
-            created_at=existing["created_at"]
-        )
-    else:
-        # Create new record
-        new_record = {
-            "subject_id": attendance_data.subject_id,
+        return to_attendance_response(pending_record(
+            current_user["id"], attendance_data.subject_id, attendance_data.date,
+            attendance_data.status, marked_at
+        ))
+    
+    # The previous status comes back with the write so the counters can be adjusted
+    record, previous = await store.upsert(
+        current_user["id"], attendance_data.subject_id, attendance_data.date, attendance_data.status
+    )
+    
+    delta = status_delta(previous, attendance_data.status)
+    await apply_counter_deltas(
+        subjects, current_user["id"], {attendance_data.subject_id: delta}
+    )
+    
+    await bump_data_version(current_user["id"])
+    
+    logger.info(
+        "Attendance saved",
+        extra={
             "user_id": current_user["id"],
+            "subject_id": attendance_data.subject_id,
             "date": attendance_data.date,
             "status": attendance_data.status,
-            "created_at": datetime.utcnow()
-        }
-        
-        result = await attendance.insert_one(new_record)
-        
-        print(f"✅ Attendance marked in MongoDB: {attendance_data.date} -> {attendance_data.status}")
-        
-        return AttendanceResponse(
-            id=str(result.inserted_id),
-            subject_id=attendance_data.subject_id,
-            user_id=current_user["id"],
-            date=attendance_data.date,
-            status=attendance_data.status,
-            created_at=new_record["created_at"]
+            "sampled": True,
+        },
+    )
+    
+    return AttendanceResponse(
+        id=str(record["_id"]),
+        subject_id=attendance_data.subject_id,
+        user_id=current_user["id"],
+        date=attendance_data.date,
+        status=attendance_data.status,
+        created_at=record["created_at"]
+    )
+
+@router.post("/bulk", response_model=AttendanceBulkResponse)
+async def mark_attendance_bulk(
+    bulk_data: AttendanceBulkCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Mark or update attendance for many (subject, date) pairs at once.
+
+    Ownership of every referenced subject is checked with one query and all
+    valid records are written as concurrent single-record upserts, so one
+    bad subject_id only fails its own items. Each upsert returns the status
+    it replaced, which keeps the counter deltas exact when a single mark
+    races the batch.
+
+    Example MongoDB upsert, one per record:
+    attendance.find_one_and_update(
+        {"subject_id": "...", "user_id": "...", "date": "2024-01-15"},
+        {"$set": {"status": "present"}, "$setOnInsert": {"created_at": ...}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    """
+    await write_behind.flush_user(current_user["id"])
+    store = get_attendance_store()
+    subjects = get_subjects_collection()
+    records = bulk_data.records
+
+    # Verify all referenced subjects belong to user in one query
+    requested_ids = {r.subject_id for r in records if ObjectId.is_valid(r.subject_id)}
+    owned_ids = set()
+    if requested_ids:
+        cursor = subjects.find(
+            {
+                "_id": {"$in": [ObjectId(sid) for sid in requested_ids]},
+                "user_id": current_user["id"],
+                **ACTIVE_SUBJECT
+            },
+            {"_id": 1}
+        )
+        async for subject in cursor:
+            owned_ids.add(str(subject["_id"]))
+
+    results = [
+        AttendanceBulkItemResult(
+            index=index,
+            subject_id=record.subject_id,
+            date=record.date,
+            status=record.status,
+            ok=record.subject_id in owned_ids,
+            error=None if record.subject_id in owned_ids else "Subject not found"
         )
+        for index, record in enumerate(records)
+    ]
+
+    # Collapse repeated (subject, date) pairs so the last status wins
+    latest = {}
+    for index, record in enumerate(records):
+        if record.subject_id in owned_ids:
+            latest[(record.subject_id, record.date)] = index
+
+    op_indexes = sorted(latest.values())
+
+    if op_indexes:
+        # One atomic upsert per record, run concurrently
+        written = await store.bulk_upsert(
+            current_user["id"],
+            [(records[i].subject_id, records[i].date, records[i].status) for i in op_indexes]
+        )
+        for i, outcome in zip(op_indexes, written):
+            results[i].id = outcome["id"]
+            if outcome["error"]:
+                results[i].ok = False
+                results[i].error = outcome["error"]
+
+        deltas = {}
+        for i, outcome in zip(op_indexes, written):
+            if results[i].ok:
+                record = records[i]
+                merge_delta(
+                    deltas.setdefault(record.subject_id, {}),
+                    status_delta(outcome["previous"], record.status)
+                )
+        await apply_counter_deltas(subjects, current_user["id"], deltas)
+
+        # Superseded duplicates share the outcome of the write that replaced them
+        for index, record in enumerate(records):
+            winner = latest.get((record.subject_id, record.date))
+            if winner is not None and winner != index:
+                results[index].ok = results[winner].ok
+                results[index].id = results[winner].id
+                results[index].error = results[winner].error
+
+    failed = sum(1 for r in results if not r.ok)
+    if failed < len(results):
+        await bump_data_version(current_user["id"])
+
+    logger.info(
+        "Bulk attendance written",
+        extra={"user_id": current_user["id"], "written": len(results) - failed, "failed": failed},
+    )
+
+    return AttendanceBulkResponse(
+        written=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+@router.post("/import", response_model=AttendanceImportResponse)
+async def import_attendance(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    create_missing_subjects: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Import attendance from a raw CSV or NDJSON request body.
+
+    The body is parsed as it streams in and written in fixed-size unordered
+    bulk_write batches. Rows may name the subject by subject_id or
+    subject_name; unknown names are created when create_missing_subjects is
+    set. Rejected rows are reported with their line numbers.
+
+    Example:
+    curl -X POST "/api/attendance/import?create_missing_subjects=true" \\
+      -H "Content-Type: text/csv" --data-binary @attendance.csv
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    await write_behind.flush_user(current_user["id"])
+    importer = AttendanceImporter(get_database(), current_user["id"], create_missing_subjects)
+    await importer.load_subjects()
+
+    async for line_number, row, error in iter_rows(request.stream(), format):
+        if error:
+            importer.reject(line_number, error)
+        else:
+            await importer.add(line_number, row)
+
+    await importer.finish()
+    await bump_data_version(current_user["id"])
+
+    summary = importer.summary()
+    logger.info(
+        "Attendance imported",
+        extra={
+            "user_id": current_user["id"],
+            "inserted": summary["inserted"],
+            "updated": summary["updated"],
+            "rejected": summary["rejected"],
+        },
+    )
+
+    return AttendanceImportResponse(**summary)
 
 @router.get("/{subject_id}/stats", response_model=AttendanceStats)
 async def get_attendance_stats(
     subject_id: str,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get attendance statistics for a subject.
     
-    Example MongoDB aggregation:
-    attendance.aggregate([
-        {"$match": {"subject_id": "...", "user_id": "..."}},
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ])
-    """
-    attendance = get_attendance_collection()
-    subjects = get_subjects_collection()
-    
-    # Verify subject belongs to user
-    subject = await subjects.find_one({
-        "_id": ObjectId(subject_id),
-        "user_id": current_user["id"]
-    })
+    Reads the counters kept on the subject document by the write paths.
+    Subjects created before counters existed are backfilled on first read.
+    Served from the response cache when warm; every attendance write
+    invalidates it.
     
-    if not subject:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Subject not found"
+    Example MongoDB find:
+    subjects.find_one({"_id": ObjectId("..."), "user_id": "..."}, {"counts": 1})
+    """
+    await write_behind.flush_user(current_user["id"])
+
+    async def load():
+        store = get_attendance_store()
+        subjects = get_subjects_collection()
+        
+        # Verify subject belongs to user (and fetch its counters in the same read)
+        subject = await subjects.find_one(
+            {"_id": ObjectId(subject_id), "user_id": current_user["id"], **ACTIVE_SUBJECT},
+            {"counts": 1}
         )
+        
+        if not subject:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Subject not found"
+            )
+        
+        if "counts" in subject:
+            stats = normalize_counts(subject["counts"])
+        else:
+            stats = await store.count_statuses(current_user["id"], subject_id)
+            await subjects.update_one(
+                {"_id": subject["_id"], "counts": {"$exists": False}},
+                {"$set": {"counts": stats}}
+            )
+        
+        total = stats["total"]
+        percentage = (stats["present"] / total * 100) if total > 0 else 0
+        
+        return {
+            "total": total,
+            "present": stats["present"],
+            "absent": stats["absent"],
+            "leave": stats["leave"],
+            "percentage": round(percentage, 1),
+        }
     
-    # Aggregate attendance counts
-    pipeline = [
-        {"$match": {"subject_id": subject_id, "user_id": current_user["id"]}},
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    
-    cursor = attendance.aggregate(pipeline)
-    
-    stats = {"present": 0, "absent": 0, "leave": 0}
-    async for doc in cursor:
-        stats[doc["_id"]] = doc["count"]
-    
-    total = stats["present"] + stats["absent"] + stats["leave"]
-    percentage = (stats["present"] / total * 100) if total > 0 else 0
-    
-    return AttendanceStats(
-        total=total,
-        present=stats["present"],
-        absent=stats["absent"],
-        leave=stats["leave"],
-        percentage=round(percentage, 1)
+    cached, stats = await read_through(
+        request, response, current_user["id"], f"stats:{subject_id}", load
     )
+    if cached:
+        return cached
+    
+    return AttendanceStats(**stats)
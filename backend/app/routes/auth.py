@@ -3,43 +3,82 @@ Authentication routes
 Handles user registration, login, and profile
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
-import jwt
 import os
 
-from dotenv import load_dotenv
 from bson import ObjectId
 from pydantic import BaseModel, EmailStr, Field
 
+from app.cache import AsyncLRUCache
 from app.database import get_users_collection
-
-load_dotenv()
+from app.hashing import (
+    HASH_RETRY_AFTER_SECONDS,
+    HashingOverloaded,
+    hash_password,
+    verify_password,
+)
+from app.rate_limit import RateLimited, client_ip, rate_limiter
+from app.settings import get_settings
 
 router = APIRouter()
 security = HTTPBearer()
 
 # ================= JWT CONFIG =================
-SECRET_KEY = os.getenv("JWT_SECRET", "change-this-in-production")
+# PyJWT is imported by the token functions on first use (the startup
+# warm-up imports it early), keeping it off the cold-start import path
+SECRET_KEY = get_settings().jwt_secret
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
-# ================= PASSWORD HASHING =================
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"
+# ================= USER CACHE =================
+# Authenticated users keyed by user id, so warm requests skip the users lookup.
+# Only id, name, email and created_at are cached, and no route changes them
+# or deletes users; one that does must call user_cache.invalidate(user_id).
+user_cache = AsyncLRUCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "300")),
 )
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def load_user(user_id: str):
+    users = get_users_collection()
+    user = await users.find_one({"_id": ObjectId(user_id)})
+
+    if not user:
+        return None
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return {
+        "id": str(user["_id"]),
+        "name": user["name"],
+        "email": user["email"],
+        "created_at": user["created_at"],
+    }
+
+# ================= PASSWORD HASHING =================
+def hashing_overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, please retry",
+        headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+    )
+
+# ================= RATE LIMITING =================
+async def enforce_rate_limit(action: str, request: Request, email: str) -> None:
+    """Checked before any lookup or hashing so throttled attempts cost nothing."""
+    try:
+        await rate_limiter.check(action, client_ip(request), email)
+    except RateLimited as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, please retry later",
+            headers={"Retry-After": exc.retry_after_header},
+        )
 
 # ================= TOKEN =================
 def create_access_token(user_id: str, email: str) -> str:
+    import jwt
+
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {
         "sub": user_id,
@@ -73,6 +112,8 @@ class TokenResponse(BaseModel):
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
+    import jwt
+
     token = credentials.credentials
 
     try:
@@ -82,18 +123,12 @@ async def get_current_user(
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        users = get_users_collection()
-        user = await users.find_one({"_id": ObjectId(user_id)})
+        user = await user_cache.get_or_load(user_id, lambda: load_user(user_id))
 
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
-        return {
-            "id": str(user["_id"]),
-            "name": user["name"],
-            "email": user["email"],
-            "created_at": user["created_at"],
-        }
+        return user
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -102,16 +137,22 @@ async def get_current_user(
 
 # ================= ROUTES =================
 @router.post("/register", response_model=TokenResponse)
-async def register(user: UserRegister):
+async def register(user: UserRegister, request: Request):
+    await enforce_rate_limit("register", request, user.email)
     users = get_users_collection()
 
     if await users.find_one({"email": user.email.lower()}):
         raise HTTPException(status_code=409, detail="Email already exists")
 
+    try:
+        hashed_password = await hash_password(user.password)
+    except HashingOverloaded:
+        raise hashing_overloaded()
+
     new_user = {
         "name": user.name.strip(),
         "email": user.email.lower(),
-        "hashed_password": hash_password(user.password),
+        "hashed_password": hashed_password,
         "created_at": datetime.utcnow(),
     }
 
@@ -131,11 +172,20 @@ async def register(user: UserRegister):
     )
 
 @router.post("/login", response_model=TokenResponse)
-async def login(user: UserLogin):
+async def login(user: UserLogin, request: Request):
+    await enforce_rate_limit("login", request, user.email)
     users = get_users_collection()
     db_user = await users.find_one({"email": user.email.lower()})
 
-    if not db_user or not verify_password(user.password, db_user["hashed_password"]):
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    try:
+        valid = await verify_password(user.password, db_user["hashed_password"])
+    except HashingOverloaded:
+        raise hashing_overloaded()
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(str(db_user["_id"]), db_user["email"])
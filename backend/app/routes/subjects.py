@@ -3,46 +3,60 @@ Subject routes
 Handles CRUD operations for subjects
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from datetime import datetime
 from bson import ObjectId
+import logging
 
-from app.database import get_subjects_collection, get_attendance_collection
-from app.models.subject import SubjectCreate, SubjectResponse
+from app.counters import EMPTY_COUNTS
+from app.database import get_subjects_collection
+from app.deletions import ACTIVE_SUBJECT, deletion_queue
+from app.models.subject import SUBJECT_COLORS, SubjectCreate, SubjectDeletionStatus, SubjectResponse
 from app.routes.auth import get_current_user
+from app.serialization import (
+    FAST_JSON_RESPONSES,
+    SUBJECT_PROJECTION,
+    encoded_response,
+    negotiate_encoding,
+    subject_row,
+)
+from app.versions import bump_data_version, read_through
+from app.write_behind import write_behind
 
 router = APIRouter()
 
-# Color palette for subjects
-SUBJECT_COLORS = [
-    "#8B5CF6", "#EC4899", "#F59E0B", "#10B981",
-    "#3B82F6", "#EF4444", "#6366F1", "#14B8A6"
-]
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=List[SubjectResponse])
-async def get_subjects(current_user: dict = Depends(get_current_user)):
+async def get_subjects(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
     """
     Get all subjects for the current user.
     
+    Served from the response cache when warm; creating or deleting a
+    subject invalidates it.
+    
     Example MongoDB find:
     subjects.find({"user_id": "user123"})
     """
-    subjects = get_subjects_collection()
-    
-    cursor = subjects.find({"user_id": current_user["id"]})
-    subject_list = []
+    async def load():
+        subjects = get_subjects_collection()
+        cursor = subjects.find({"user_id": current_user["id"], **ACTIVE_SUBJECT}, SUBJECT_PROJECTION)
+        return [subject_row(doc) async for doc in cursor]
+
+    encoding = negotiate_encoding(request, response)
+    cached, rows = await read_through(request, response, current_user["id"], "subjects", load, encoding)
+    if cached:
+        return cached
     
-    async for subject in cursor:
-        subject_list.append(SubjectResponse(
-            id=str(subject["_id"]),
-            user_id=subject["user_id"],
-            name=subject["name"],
-            color=subject["color"],
-            created_at=subject["created_at"]
-        ))
+    if FAST_JSON_RESPONSES or encoding.compact:
+        return encoded_response(rows, encoding, response)
     
-    return subject_list
+    return [SubjectResponse(**row) for row in rows]
 
 @router.post("/", response_model=SubjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_subject(
@@ -65,7 +79,8 @@ async def create_subject(
     # Check if subject with same name exists for this user
     existing = await subjects.find_one({
         "user_id": current_user["id"],
-        "name": subject_data.name
+        "name": subject_data.name,
+        **ACTIVE_SUBJECT
     })
     
     if existing:
@@ -75,7 +90,7 @@ async def create_subject(
         )
     
     # Count existing subjects to assign color
-    count = await subjects.count_documents({"user_id": current_user["id"]})
+    count = await subjects.count_documents({"user_id": current_user["id"], **ACTIVE_SUBJECT})
     color = subject_data.color or SUBJECT_COLORS[count % len(SUBJECT_COLORS)]
     
     # Create new subject document
@@ -83,13 +98,19 @@ async def create_subject(
         "user_id": current_user["id"],
         "name": subject_data.name,
         "color": color,
+        "counts": dict(EMPTY_COUNTS),
         "created_at": datetime.utcnow()
     }
     
     # Insert into MongoDB
     result = await subjects.insert_one(new_subject)
     
-    print(f"✅ Subject created in MongoDB: {subject_data.name}")
+    await bump_data_version(current_user["id"])
+    
+    logger.info(
+        "Subject created",
+        extra={"user_id": current_user["id"], "subject_id": str(result.inserted_id)},
+    )
     
     return SubjectResponse(
         id=str(result.inserted_id),
@@ -99,7 +120,20 @@ async def create_subject(
         created_at=new_subject["created_at"]
     )
 
-@router.delete("/{subject_id}", status_code=status.HTTP_204_NO_CONTENT)
+def to_deletion_status(job: dict) -> SubjectDeletionStatus:
+    return SubjectDeletionStatus(
+        subject_id=job["_id"],
+        status=job["status"],
+        deleted_records=job["deleted_records"],
+        created_at=job["created_at"],
+        finished_at=job.get("finished_at")
+    )
+
+@router.delete(
+    "/{subject_id}",
+    response_model=SubjectDeletionStatus,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def delete_subject(
     subject_id: str,
     current_user: dict = Depends(get_current_user)
@@ -107,31 +141,65 @@ async def delete_subject(
     """
     Delete a subject and all its attendance records.
     
-    Example MongoDB delete:
-    subjects.delete_one({"_id": ObjectId("..."), "user_id": "user123"})
-    attendance.delete_many({"subject_id": "..."})
+    The subject is marked deleted (and hidden from every read) right away;
+    its attendance is removed in throttled batches by the background
+    deletion queue. Poll GET /{subject_id}/deletion for progress.
+    
+    Example MongoDB update:
+    subjects.update_one(
+        {"_id": ObjectId("..."), "user_id": "user123", "deleted_at": {"$exists": False}},
+        {"$set": {"deleted_at": datetime.utcnow()}}
+    )
     """
     subjects = get_subjects_collection()
-    attendance = get_attendance_collection()
     
-    # Check if subject exists and belongs to user
-    subject = await subjects.find_one({
-        "_id": ObjectId(subject_id),
-        "user_id": current_user["id"]
-    })
+    if not ObjectId.is_valid(subject_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subject not found"
+        )
+    
+    # Buffered marks must land before the deletion job starts removing records
+    await write_behind.flush_user(current_user["id"])
     
-    if not subject:
+    # Mark the subject deleted if it exists, belongs to the user and is not already deleted
+    deleted_at = datetime.utcnow()
+    result = await subjects.update_one(
+        {"_id": ObjectId(subject_id), "user_id": current_user["id"], **ACTIVE_SUBJECT},
+        {"$set": {"deleted_at": deleted_at}}
+    )
+    
+    if result.matched_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Subject not found"
         )
     
-    # Delete all attendance records for this subject
-    await attendance.delete_many({"subject_id": subject_id})
+    job = await deletion_queue.enqueue(current_user["id"], subject_id, deleted_at)
+    
+    await bump_data_version(current_user["id"])
     
-    # Delete the subject
-    await subjects.delete_one({"_id": ObjectId(subject_id)})
+    logger.info("Subject deleted", extra={"user_id": current_user["id"], "subject_id": subject_id})
     
-    print(f"✅ Subject deleted from MongoDB: {subject['name']}")
+    return to_deletion_status(job)
+
+@router.get("/{subject_id}/deletion", response_model=SubjectDeletionStatus)
+async def get_deletion_status(
+    subject_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the progress of a subject deletion.
+    
+    Example MongoDB find:
+    deletion_jobs.find_one({"_id": "<subject_id>", "user_id": "user123"})
+    """
+    job = await deletion_queue.get_job(current_user["id"], subject_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deletion not found"
+        )
     
-    return None
+    return to_deletion_status(job)
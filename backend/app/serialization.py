@@ -0,0 +1,230 @@
+"""
+Fast JSON serialization
+Maps raw Motor documents straight to JSON bytes for the list endpoints,
+skipping per-row pydantic models and FastAPI's response_model validation.
+
+Opt-in with FAST_JSON_RESPONSES=1. Routes keep their response_model, so the
+OpenAPI schema is unchanged; they just return a FastJSONResponse instead.
+Uses orjson when installed and falls back to the standard json module.
+
+Clients can also negotiate a compact encoding with the Accept header (the
+same fast path, whatever FAST_JSON_RESPONSES says):
+
+    Accept: application/json; layout=columnar
+    Accept: application/msgpack; layout=columnar, application/json; q=0.9
+
+`application/msgpack` needs the msgpack package (otherwise JSON is sent).
+`layout=columnar` turns every list of rows into one table per list:
+
+    {"layout": "columnar", "count": 2,
+     "constants": {"user_id": "u1", "subject_id": "s1"},
+     "columns": {"id": ["a", "b"], "date": ["2024-01-01", "2024-01-02"], ...}}
+
+Keys with the same value on every row (user_id always, subject_id on a
+subject's page) are sent once in `constants`.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from functools import lru_cache
+
+from bson import ObjectId
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+@lru_cache(maxsize=None)
+def load_msgpack():
+    """The msgpack module, imported when a client first asks for it; None if not installed."""
+    try:
+        import msgpack
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return msgpack
+
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "0") == "1"
+
+SUBJECT_PROJECTION = {"user_id": 1, "name": 1, "color": 1, "created_at": 1}
+ATTENDANCE_PROJECTION = {"subject_id": 1, "user_id": 1, "date": 1, "status": 1, "created_at": 1}
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Serialize to JSON bytes (orjson if available)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+def subject_row(doc: dict) -> dict:
+    """Raw subject document -> SubjectResponse-shaped dict."""
+    return {
+        "id": str(doc["_id"]),
+        "user_id": doc["user_id"],
+        "name": doc["name"],
+        "color": doc["color"],
+        "created_at": doc["created_at"],
+    }
+
+
+def attendance_row(doc: dict) -> dict:
+    """Raw attendance document -> AttendanceResponse-shaped dict."""
+    return {
+        "id": str(doc["_id"]),
+        "subject_id": doc["subject_id"],
+        "user_id": doc["user_id"],
+        "date": doc["date"],
+        "status": doc["status"],
+        "created_at": doc["created_at"],
+    }
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def fast_json_response(content, response: Response = None) -> FastJSONResponse:
+    """
+    Build a FastJSONResponse, carrying over headers (e.g. ETag) that the
+    handler already set on FastAPI's injected `response`.
+    """
+    return FastJSONResponse(content, headers=carried_headers(response))
+
+
+def carried_headers(response: Response = None):
+    """Headers set on FastAPI's injected `response`, minus Content-Length."""
+    if response is None:
+        return None
+    return {
+        key: value for key, value in response.headers.items()
+        if key != "content-length"
+    }
+
+
+# ---------- Negotiated encodings ----------
+
+class Encoding:
+    """Representation picked from the Accept header."""
+
+    def __init__(self, media_type: str = JSON_MEDIA_TYPE, columnar: bool = False):
+        self.media_type = media_type
+        self.columnar = columnar
+
+    @property
+    def compact(self) -> bool:
+        """Anything other than plain JSON rows."""
+        return self.columnar or self.media_type != JSON_MEDIA_TYPE
+
+    @property
+    def tag(self) -> str:
+        """Short name of the representation for ETags ("" for plain JSON rows)."""
+        parts = []
+        if self.media_type != JSON_MEDIA_TYPE:
+            parts.append("msgpack")
+        if self.columnar:
+            parts.append("columnar")
+        return "-".join(parts)
+
+
+def negotiate_encoding(request: Request, response: Response = None) -> Encoding:
+    """
+    Pick the encoding for a list endpoint: the highest-q acceptable entry
+    (earliest on ties) among application/json, application/msgpack and
+    */*. Sets Vary: Accept on the injected `response`.
+    """
+    if response is not None:
+        response.headers["Vary"] = "Accept"
+
+    best, best_q = Encoding(), 0.0
+    for entry in request.headers.get("accept", "").split(","):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        options = {}
+        for param in params:
+            key, _, value = param.partition("=")
+            options[key.strip().lower()] = value.strip().strip('"').lower()
+
+        media_type = media_type.lower()
+        if media_type == MSGPACK_MEDIA_TYPE and load_msgpack() is None:
+            continue
+        if media_type not in (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, "*/*"):
+            continue
+
+        try:
+            q = float(options.get("q", "1"))
+        except ValueError:
+            continue
+        if q > best_q:
+            best_q = q
+            best = Encoding(
+                MSGPACK_MEDIA_TYPE if media_type == MSGPACK_MEDIA_TYPE else JSON_MEDIA_TYPE,
+                options.get("layout") == "columnar",
+            )
+
+    return best
+
+
+def to_columns(rows: list) -> dict:
+    """List of row dicts -> columnar table (see the module docstring)."""
+    constants, columns = {}, {}
+    if rows:
+        for key in rows[0]:
+            values = [row[key] for row in rows]
+            first = values[0]
+            if all(value == first for value in values):
+                constants[key] = first
+            else:
+                columns[key] = values
+    return {"layout": "columnar", "count": len(rows), "constants": constants, "columns": columns}
+
+
+def columnar(content):
+    """Apply to_columns to the top-level list, or to each list value of a dict."""
+    if isinstance(content, list):
+        return to_columns(content)
+    if isinstance(content, dict):
+        return {key: to_columns(value) if isinstance(value, list) else value for key, value in content.items()}
+    return content
+
+
+def _msgpack_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        # ISO strings like the JSON encoding, so clients see the same values
+        return value.isoformat()
+    raise TypeError(f"Type is not MessagePack serializable: {type(value).__name__}")
+
+
+def encoded_response(content, encoding: Encoding, response: Response = None) -> Response:
+    """
+    Serialize raw rows in the negotiated encoding, carrying over headers the
+    handler set on `response` (ETag, Vary) like fast_json_response.
+    """
+    if encoding.columnar:
+        content = columnar(content)
+    if encoding.media_type != MSGPACK_MEDIA_TYPE:
+        return fast_json_response(content, response)
+
+    return Response(
+        load_msgpack().packb(content, default=_msgpack_default),
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers=carried_headers(response),
+    )
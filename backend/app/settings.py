@@ -0,0 +1,94 @@
+"""
+Application settings
+Reads `.env` and the environment once, when the app factory (or a CLI
+entry point) first asks for the settings, instead of as a side effect of
+importing a module.
+
+Modules with their own knobs (caches, rate limits, logging) still read them
+at import; create_app loads `.env` before importing them.
+
+Environment:
+    MONGO_URL                 connection string (required to connect)
+    MONGO_*                   pool sizing and timeouts (see .env.example)
+    JWT_SECRET                token signing key
+    ATTENDANCE_STORAGE        attendance layout (see app.attendance_store)
+    READY_PING_TIMEOUT_SECONDS  /health/ready ping bound (default 2)
+    STARTUP_WARMUP            background (default) or blocking, see README
+    STARTUP_PROFILE           1 prints an import / startup phase breakdown
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load `.env` into os.environ (once; real environment variables win)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _env_loaded = True
+
+
+class Settings:
+    """Values resolved once from the environment."""
+
+    def __init__(self, **values):
+        self.mongo_url: Optional[str] = values.get("mongo_url")
+        self.mongo_max_pool_size: int = values.get("mongo_max_pool_size", 50)
+        self.mongo_min_pool_size: int = values.get("mongo_min_pool_size", 5)
+        self.mongo_max_idle_time_ms: int = values.get("mongo_max_idle_time_ms", 300000)
+        self.mongo_connect_timeout_ms: int = values.get("mongo_connect_timeout_ms", 5000)
+        self.mongo_server_selection_timeout_ms: int = values.get("mongo_server_selection_timeout_ms", 5000)
+        self.mongo_socket_timeout_ms: int = values.get("mongo_socket_timeout_ms", 20000)
+        self.mongo_wait_queue_timeout_ms: int = values.get("mongo_wait_queue_timeout_ms", 5000)
+        # Connections opened at startup so the first requests do not pay for
+        # the TCP/TLS handshake and auth (defaults to the minimum pool size)
+        self.mongo_warm_connections: int = values.get("mongo_warm_connections", self.mongo_min_pool_size)
+        self.jwt_secret: str = values.get("jwt_secret", "change-this-in-production")
+        self.attendance_storage: str = values.get("attendance_storage", "documents")
+        self.ready_ping_timeout_seconds: float = values.get("ready_ping_timeout_seconds", 2.0)
+        self.startup_warmup: str = values.get("startup_warmup", "background")
+        self.startup_profile: bool = values.get("startup_profile", False)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        min_pool_size = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+        return cls(
+            mongo_url=os.getenv("MONGO_URL"),
+            mongo_max_pool_size=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+            mongo_min_pool_size=min_pool_size,
+            mongo_max_idle_time_ms=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+            mongo_connect_timeout_ms=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+            mongo_server_selection_timeout_ms=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            mongo_socket_timeout_ms=int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+            mongo_wait_queue_timeout_ms=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+            mongo_warm_connections=int(os.getenv("MONGO_WARM_CONNECTIONS", str(min_pool_size))),
+            jwt_secret=os.getenv("JWT_SECRET", "change-this-in-production"),
+            attendance_storage=os.getenv("ATTENDANCE_STORAGE", "documents"),
+            ready_ping_timeout_seconds=float(os.getenv("READY_PING_TIMEOUT_SECONDS", "2")),
+            startup_warmup=os.getenv("STARTUP_WARMUP", "background"),
+            startup_profile=os.getenv("STARTUP_PROFILE", "0") == "1",
+        )
+
+    def mongo_client_options(self) -> dict:
+        """Pool options; they override the driver defaults and matching URL options."""
+        return {
+            "maxPoolSize": self.mongo_max_pool_size,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_time_ms,
+            "connectTimeoutMS": self.mongo_connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+            "socketTimeoutMS": self.mongo_socket_timeout_ms,
+            "waitQueueTimeoutMS": self.mongo_wait_queue_timeout_ms,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    load_env()
+    return Settings.from_env()
@@ -0,0 +1,78 @@
+"""
+Startup profiling
+With STARTUP_PROFILE=1 the app factory and lifespan time their phases
+(module imports, app assembly, MongoDB connect, warm-up, ...) and print a
+breakdown to stderr once the app is serving:
+
+    startup profile: serving (ms)
+      process start -> app.main               412.7
+      import fastapi                          655.1
+      import app.routes                        98.3
+      ...
+      lifespan mongo connect                   31.9
+      total since process start              1301.4
+
+With STARTUP_WARMUP=background a second breakdown follows once the
+warm-up (pool, indexes, auth stack) has finished.
+
+Phases are always recorded (a few perf_counter calls); only the printout
+is opt-in. "process start" comes from /proc and is skipped elsewhere.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+def process_age_ms() -> Optional[float]:
+    """Milliseconds since this process started (Linux only, else None)."""
+    try:
+        import os
+
+        with open("/proc/self/stat") as stat:
+            # Field 22 is the start time in clock ticks after boot; skip past
+            # the command name, which may contain spaces
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            booted_seconds = float(uptime.read().split()[0])
+        started_seconds = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return (booted_seconds - started_seconds) * 1000
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfile:
+    """Ordered (kind, name, milliseconds) phases of one startup."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.age_at_start = process_age_ms()
+        self.phases: List[Tuple[str, str, float]] = []
+
+    @contextmanager
+    def phase(self, kind: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((kind, name, (time.perf_counter() - started) * 1000))
+
+    def elapsed_ms(self) -> float:
+        """Since process start when known, else since the profile was created."""
+        return (self.age_at_start or 0) + (time.perf_counter() - self.started) * 1000
+
+    def stats(self) -> dict:
+        return {f"{kind} {name}": round(ms, 1) for kind, name, ms in self.phases}
+
+    def report(self, title: str) -> None:
+        if not self.enabled:
+            return
+        lines = [f"startup profile: {title} (ms)"]
+        if self.age_at_start is not None:
+            lines.append(f"  {'process start -> app.main':<36}{self.age_at_start:>9.1f}")
+        for kind, name, ms in self.phases:
+            lines.append(f"  {kind + ' ' + name:<36}{ms:>9.1f}")
+        lines.append(f"  {'total since process start':<36}{self.elapsed_ms():>9.1f}")
+        print("\n".join(lines), file=sys.stderr, flush=True)
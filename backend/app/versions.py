@@ -0,0 +1,122 @@
+"""
+Per-user data versions
+Every write that changes what a user's GET endpoints return bumps a counter
+on the user document. GET handlers derive a weak ETag from it, so a client
+revalidating with If-None-Match gets a 304 after one tiny users lookup
+instead of re-reading subjects and attendance.
+
+Handlers whose bodies are worth keeping use read_through, which serves the
+ETag check and the body from the response cache; bumping the version
+invalidates the user's cached responses.
+"""
+
+import hashlib
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import Request, Response, status
+
+from app.database import get_users_collection
+from app.response_cache import response_cache
+
+if TYPE_CHECKING:
+    from app.serialization import Encoding
+
+
+async def get_data_version(user_id: str) -> int:
+    """
+    Example MongoDB find:
+    users.find_one({"_id": ObjectId("...")}, {"data_version": 1})
+    """
+    users = get_users_collection()
+    user = await users.find_one({"_id": ObjectId(user_id)}, {"data_version": 1})
+    return (user or {}).get("data_version", 0)
+
+
+async def bump_data_version(user_id: str) -> None:
+    """
+    Example MongoDB update:
+    users.update_one({"_id": ObjectId("...")}, {"$inc": {"data_version": 1}})
+    """
+    users = get_users_collection()
+    await users.update_one({"_id": ObjectId(user_id)}, {"$inc": {"data_version": 1}})
+    await response_cache.invalidate(user_id)
+
+
+def make_etag(user_id: str, version: int, request: Request, encoding: "Encoding" = None) -> str:
+    """
+    Weak ETag scoped to the user, their data version and the exact URL.
+    Negotiated representations other than JSON rows get their own suffix
+    (W/"7-<digest>-msgpack"), so a validator for one is never a match for
+    another.
+    """
+    scope = f"{user_id}:{request.url.path}?{request.url.query}"
+    digest = hashlib.blake2s(scope.encode(), digest_size=8).hexdigest()
+    if encoding is not None and encoding.tag:
+        return f'W/"{version}-{digest}-{encoding.tag}"'
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    user_id: str,
+    version: Optional[int] = None,
+    encoding: "Encoding" = None
+) -> Optional[Response]:
+    """
+    Return a 304 Response if the client's validator is current; otherwise
+    set the ETag on `response` and return None so the handler continues.
+    Pass version if the handler already read it, and the negotiated
+    encoding for endpoints that vary on Accept.
+    """
+    if version is None:
+        version = await get_data_version(user_id)
+    etag = make_etag(user_id, version, request, encoding)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers = {"ETag": etag}
+        if encoding is not None:
+            headers["Vary"] = "Accept"
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers["ETag"] = etag
+    return None
+
+
+async def read_through(
+    request: Request,
+    response: Response,
+    user_id: str,
+    name: str,
+    load: Callable[[], Awaitable[Any]],
+    encoding: "Encoding" = None
+) -> Tuple[Optional[Response], Any]:
+    """
+    Return (304 response, None) if the client's validator is current, else
+    (None, body). A cache hit needs no database reads; on a miss the version
+    is read, then load() runs, and the body is cached unless a write
+    invalidated the user since the cache lookup (the lookup's token is taken
+    before the version is read).
+    """
+    token, hit = await response_cache.get(user_id, name)
+    if hit is not None:
+        version, body = hit
+        cached = await not_modified(request, response, user_id, version, encoding)
+        return cached, None if cached else body
+
+    version = await get_data_version(user_id)
+    cached = await not_modified(request, response, user_id, version, encoding)
+    if cached:
+        return cached, None
+
+    body = await load()
+    await response_cache.put(user_id, token, version, name, body)
+    return None, body
@@ -0,0 +1,267 @@
+"""
+Write-behind attendance buffer
+Optional (WRITE_BEHIND=1). POST /api/attendance puts the mark into an
+in-memory buffer keyed by (user, subject, date) that keeps only the latest
+status, and returns without writing. A background task flushes the buffer
+every WRITE_BEHIND_FLUSH_MS, or as soon as WRITE_BEHIND_MAX_PENDING marks
+are waiting: per user one bulk_upsert through the attendance store (an
+atomic upsert per mark, run concurrently), one counter bulk_write and one
+data version bump. Clicking a day present ->
+absent -> leave within a flush interval costs one write instead of three
+full round trips.
+
+Reads stay consistent: the calendar and the record list merge pending
+marks into what they read (merge_records); every other read, and every
+non-buffered write, flushes the user's pending marks first (flush_user).
+Marks being flushed stay visible to merges until their write completes.
+
+A flush that fails, or is cancelled, before the records are written
+requeues its marks. Once they are written, their counter deltas are owed
+instead: if the counter update or the version bump fails, only that work is
+retried on the next flush, since requeued marks would be diffed against
+their own new status.
+
+The buffer is per process and lost if the process is killed; lifespan
+shutdown drains it. Run a single worker with write-behind enabled.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.attendance_store import get_attendance_store
+from app.counters import apply_counter_deltas, merge_delta, status_delta
+from app.versions import bump_data_version
+
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "250"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "500"))
+
+logger = logging.getLogger(__name__)
+
+# (subject_id, date) -> (status, first marked at)
+Marks = Dict[Tuple[str, str], Tuple[str, datetime]]
+
+
+def pending_record(user_id: str, subject_id: str, date: str, status: str, marked_at: datetime) -> dict:
+    """A buffered mark in the record shape; the id is provisional until flushed."""
+    return {
+        "_id": f"pending:{subject_id}:{date}",
+        "user_id": user_id,
+        "subject_id": subject_id,
+        "date": date,
+        "status": status,
+        "created_at": marked_at,
+    }
+
+
+class WriteBehindBuffer:
+    """Latest-status-wins buffer of marks with a periodic flush task."""
+
+    def __init__(self, database=None, flush_ms: int = 250, max_pending: int = 500):
+        self.database = database
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+
+        self._pending: Dict[str, Marks] = {}
+        self._flushing: Dict[str, Marks] = {}
+        # user -> counter deltas of written marks not yet applied (and bumped)
+        self._owed: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.marks = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed_flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    def size(self) -> int:
+        return sum(len(marks) for marks in self._pending.values())
+
+    async def start(self, database) -> None:
+        self.database = database
+        self._full = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the flush task and write everything still pending. The task is
+        woken rather than cancelled, so a flush in progress finishes first.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._full.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    def add(self, user_id: str, subject_id: str, date: str, status: str) -> datetime:
+        """Buffer a mark. Returns when the day was first marked in this buffer."""
+        marks = self._pending.setdefault(user_id, {})
+        key = (subject_id, date)
+
+        self.marks += 1
+        if key in marks:
+            self.coalesced += 1
+            marked_at = marks[key][1]
+        else:
+            marked_at = datetime.utcnow()
+        marks[key] = (status, marked_at)
+
+        if self.size() >= self.max_pending:
+            self._full.set()
+        return marked_at
+
+    def pending(self, user_id: str) -> Marks:
+        """Marks not yet written for a user (in-flight ones included), newest wins."""
+        return {**self._flushing.get(user_id, {}), **self._pending.get(user_id, {})}
+
+    def merge_records(
+        self,
+        user_id: str,
+        records: Iterable[dict],
+        keep: Callable[[str, str], bool]
+    ) -> List[dict]:
+        """
+        Overlay the user's pending marks on records read from the store.
+        keep(subject_id, date) says whether a pending mark matches the
+        read's filter. Returns records sorted by (subject_id, date).
+        """
+        pending = self.pending(user_id)
+        if not pending:
+            return list(records)
+
+        merged = {}
+        for record in records:
+            key = (record["subject_id"], record["date"])
+            if key in pending:
+                record = {**record, "status": pending[key][0]}
+            merged[key] = record
+
+        for (subject_id, date), (status, marked_at) in pending.items():
+            if (subject_id, date) not in merged and keep(subject_id, date):
+                merged[(subject_id, date)] = pending_record(user_id, subject_id, date, status, marked_at)
+
+        return [merged[key] for key in sorted(merged)]
+
+    async def flush_user(self, user_id: str) -> None:
+        """Write the user's pending marks now (no-op if there are none)."""
+        if user_id not in self._pending and user_id not in self._flushing and user_id not in self._owed:
+            return
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            marks = self._pending.pop(user_id, None)
+            if marks:
+                await self._write(user_id, marks)
+            elif user_id in self._owed:
+                await self._settle(user_id, self._owed.pop(user_id))
+        if not lock.locked() and user_id not in self._pending:
+            self._locks.pop(user_id, None)
+
+    async def flush(self) -> None:
+        for user_id in list({**self._pending, **self._owed}):
+            await self.flush_user(user_id)
+
+    async def _write(self, user_id: str, marks: Marks) -> None:
+        """
+        Example MongoDB writes for one user:
+        attendance.find_one_and_update({...}, {"$set": {"status": ...}}, upsert=True)  # per mark
+        subjects.bulk_write([UpdateOne({...}, {"$inc": {"counts.present": 1, ...}}), ...])
+        users.update_one({"_id": ...}, {"$inc": {"data_version": 1}})
+        """
+        self._flushing[user_id] = marks
+        items = [(subject_id, date, status) for (subject_id, date), (status, _) in marks.items()]
+        try:
+            try:
+                results = await get_attendance_store(self.database).bulk_upsert(user_id, items)
+            except asyncio.CancelledError:
+                # The caller went away (e.g. its request was cancelled); the
+                # marks may or may not be written, so write them again later
+                self._requeue(user_id, marks)
+                raise
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception("Write-behind flush failed", extra={"user_id": user_id, "marks": len(marks)})
+                self._requeue(user_id, marks)
+                return
+
+            # The records are written: from here on only their counter deltas
+            # and the version bump may be retried, never the marks themselves
+            deltas = self._owed.pop(user_id, {})
+            retry: Marks = {}
+            for (subject_id, date, status), result in zip(items, results):
+                if result["error"]:
+                    retry[(subject_id, date)] = marks[(subject_id, date)]
+                    continue
+                merge_delta(deltas.setdefault(subject_id, {}), status_delta(result["previous"], status))
+
+            self.flushes += 1
+            self.written += len(items) - len(retry)
+            if retry:
+                logger.warning(
+                    "Write-behind marks failed, retrying",
+                    extra={"user_id": user_id, "failed": len(retry)},
+                )
+                self._requeue(user_id, retry)
+
+            await self._settle(user_id, deltas)
+        finally:
+            self._flushing.pop(user_id, None)
+
+    async def _settle(self, user_id: str, deltas: Dict[str, Dict[str, int]]) -> None:
+        """Apply counter deltas and bump the data version; on failure owe them to the next flush."""
+        try:
+            await apply_counter_deltas(self.database["subjects"], user_id, deltas)
+            deltas = {}
+            await bump_data_version(user_id)
+        except asyncio.CancelledError:
+            self._owe(user_id, deltas)
+            raise
+        except Exception:
+            self.failed_flushes += 1
+            logger.exception("Write-behind counter update failed, retrying", extra={"user_id": user_id})
+            self._owe(user_id, deltas)
+
+    def _owe(self, user_id: str, deltas: Dict[str, Dict[str, int]]) -> None:
+        owed = self._owed.setdefault(user_id, {})
+        for subject_id, delta in deltas.items():
+            merge_delta(owed.setdefault(subject_id, {}), delta)
+
+    def _requeue(self, user_id: str, marks: Marks) -> None:
+        # Newer marks buffered during the flush win over the ones being retried
+        self._pending[user_id] = {**marks, **self._pending.get(user_id, {})}
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.size(),
+            "owed_counters": len(self._owed),
+            "marks": self.marks,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+write_behind = WriteBehindBuffer(flush_ms=WRITE_BEHIND_FLUSH_MS, max_pending=WRITE_BEHIND_MAX_PENDING)
@@ -0,0 +1,92 @@
+"""
+Cold start benchmark
+Starts `uvicorn app.main:app` in a fresh process, repeatedly, and measures
+the time from spawning the process to the first 200 from /health (what a
+scale-from-zero request waits for) and from /health/ready (warm-up done).
+
+Runs with STARTUP_WARMUP=blocking (pool warm-up, indexes and the auth
+stack before serving, as before the app factory) and background (serve
+first, warm up afterwards).
+
+Needs a MongoDB; each process connects to the same scratch database,
+which is dropped afterwards.
+
+Usage (from backend/):
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 20 --profile
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import start_server, summarize
+
+MODES = ("blocking", "background")
+
+
+async def wait_for(client: httpx.AsyncClient, path: str, started: float, timeout: float) -> float:
+    """Poll `path` every 5 ms; return milliseconds from `started` to its first 200."""
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get(path)).status_code == 200:
+                return (time.perf_counter() - started) * 1000
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.005)
+    raise RuntimeError(f"{path} did not answer 200 within {timeout:.0f}s")
+
+
+async def cold_start(port: int, database_url: str, mode: str, profile: bool) -> dict:
+    extra_env = {"STARTUP_WARMUP": mode, "STARTUP_PROFILE": "1" if profile else "0"}
+    started = time.perf_counter()
+    server = start_server(port, database_url, extra_env=extra_env)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            health_ms = await wait_for(client, "/health", started, 60)
+            ready_ms = await wait_for(client, "/health/ready", started, 60)
+    finally:
+        server.terminate()
+        server.wait()
+    return {"health": health_ms, "ready": ready_ms}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="process starts per mode")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--profile", action="store_true", help="let the server print STARTUP_PROFILE breakdowns")
+    args = parser.parse_args()
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017").rstrip("/")
+    name = f"bench_cold_{uuid.uuid4().hex[:8]}"
+    results = {}
+
+    try:
+        for mode in MODES:
+            samples = [
+                await cold_start(args.port, f"{mongo_url}/{name}", mode, args.profile)
+                for _ in range(args.runs)
+            ]
+            results[mode] = {
+                "first_health": summarize([sample["health"] for sample in samples]),
+                "first_ready": summarize([sample["ready"] for sample in samples]),
+            }
+    finally:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(mongo_url)
+        await client.drop_database(name)
+        client.close()
+
+    print(json.dumps({"options": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Shared benchmark helpers
+Latency summaries and a uvicorn subprocess runner.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list) -> dict:
+    """Latency summary in milliseconds for a list of samples (ms)."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "mean_ms": round(statistics.fmean(samples), 2) if samples else 0.0,
+    }
+
+
+def start_server(port: int, mongo_url: str, hash_workers: int = 2, extra_env: dict = None) -> subprocess.Popen:
+    """Run `uvicorn app.main:app` in a subprocess (cwd must be backend/)."""
+    env = dict(os.environ)
+    env["MONGO_URL"] = mongo_url
+    env["PASSWORD_HASH_WORKERS"] = str(hash_workers)
+    env.update(extra_env or {})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become healthy")
@@ -0,0 +1,117 @@
+"""
+Export memory benchmark
+Seeds N attendance records for one user, streams /api/attendance/export and
+reports the server's peak RSS (VmHWM) for each N. A flat line means memory
+does not grow with history length.
+
+Linux only (reads /proc). Needs a throwaway MongoDB; each N gets its own
+database and a fresh server process so peaks do not carry over.
+
+Usage (from backend/):
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.export_memory
+    python -m benchmarks.export_memory --counts 1000 10000 100000 --format ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import httpx
+from pymongo import MongoClient
+
+from benchmarks.common import start_server, wait_until_healthy
+
+
+def read_peak_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+def seed_records(database_url: str, user_id: str, subject_count: int, count: int) -> None:
+    """Insert count records spread over subject_count subjects, directly via pymongo."""
+    mongo = MongoClient(database_url)
+    database = mongo.get_default_database()
+    subjects = database["subjects"].insert_many([
+        {"user_id": user_id, "name": f"Subject {i}", "color": "#8B5CF6", "created_at": datetime.utcnow()}
+        for i in range(subject_count)
+    ]).inserted_ids
+
+    start = date(2000, 1, 1)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "subject_id": str(subjects[i % subject_count]),
+            "user_id": user_id,
+            "date": (start + timedelta(days=i // subject_count)).isoformat(),
+            "status": ("present", "absent", "leave")[i % 3],
+            "created_at": datetime.utcnow(),
+        })
+        if len(batch) == 10000:
+            database["attendance"].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        database["attendance"].insert_many(batch, ordered=False)
+    mongo.close()
+
+
+async def measure(mongo_url: str, port: int, count: int, export_format: str) -> dict:
+    database_url = f"{mongo_url}/bench_export_{uuid.uuid4().hex[:8]}"
+    server = start_server(port, database_url, hash_workers=2)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+            await wait_until_healthy(client)
+            response = await client.post(
+                "/api/auth/register",
+                json={"name": "Export", "email": "export@example.com", "password": "benchmark-password"},
+            )
+            body = response.json()
+            headers = {"Authorization": f"Bearer {body['access_token']}"}
+
+            seed_records(database_url, body["user"]["id"], subject_count=10, count=count)
+            rss_before = read_peak_rss_kb(server.pid)
+
+            started = time.perf_counter()
+            received = 0
+            async with client.stream(
+                "GET", f"/api/attendance/export?format={export_format}", headers=headers
+            ) as stream:
+                async for chunk in stream.aiter_bytes():
+                    received += len(chunk)
+            elapsed = time.perf_counter() - started
+
+            return {
+                "records": count,
+                "bytes": received,
+                "seconds": round(elapsed, 2),
+                "peak_rss_before_mb": round(rss_before / 1024, 1),
+                "peak_rss_after_mb": round(read_peak_rss_kb(server.pid) / 1024, 1),
+            }
+    finally:
+        server.terminate()
+        server.wait()
+        mongo = MongoClient(database_url)
+        mongo.drop_database(mongo.get_default_database().name)
+        mongo.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017").rstrip("/")
+    results = [await measure(mongo_url, args.port, count, args.format) for count in args.counts]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
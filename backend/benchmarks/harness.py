@@ -0,0 +1,357 @@
+"""
+Load-test harness
+Boots app.main:app in-process against a local MongoDB stand-in, seeds
+N users x M subjects x D days of attendance, drives a weighted mix of
+register/login/list/mark/stats traffic with an async client and reports
+p50/p95/p99 latency and requests/sec per route as JSON.
+
+Backends:
+    memory  in-memory Motor-compatible fake (mongomock-motor), no server needed
+    mongod  throwaway `mongod` started in a temp directory (must be on PATH)
+    url     a scratch database on the server in MONGO_URL (dropped afterwards)
+
+Numbers are only comparable between runs with the same backend and options.
+Save a run with --output and compare a later commit against it with --compare.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.harness --output baseline.json
+    python -m benchmarks.harness --compare baseline.json --fail-on-regression
+    python -m benchmarks.harness --backend mongod --users 20 --days 120 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/benchmark")
+# All simulated users share one client address; auth rate limits would skew the mix
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+os.environ.setdefault("STARTUP_WARMUP", "blocking")
+
+import httpx  # noqa: E402
+from bson import ObjectId  # noqa: E402
+
+from benchmarks.common import summarize  # noqa: E402
+
+STATUSES = ("present", "absent", "leave")
+PASSWORD = "benchmark-password"
+
+# (label, weight) for the traffic mix
+DEFAULT_MIX = {
+    "POST /api/auth/register": 1,
+    "POST /api/auth/login": 4,
+    "GET /api/subjects/": 25,
+    "GET /api/attendance/{subject_id}": 15,
+    "GET /api/attendance/?from&to": 10,
+    "POST /api/attendance/": 30,
+    "GET /api/attendance/{subject_id}/stats": 15,
+}
+
+
+# ---------- MongoDB stand-ins ----------
+
+def memory_client_factory():
+    """AsyncIOMotorClient replacement backed by mongomock."""
+    from mongomock_motor import AsyncMongoMockClient
+
+    class InMemoryMotorClient(AsyncMongoMockClient):
+        def __init__(self, url, **kwargs):
+            super().__init__()
+            self._default_name = url.rsplit("/", 1)[-1].split("?")[0] or "benchmark"
+
+        def get_default_database(self, *args, **kwargs):
+            return self[self._default_name]
+
+    return InMemoryMotorClient
+
+
+@asynccontextmanager
+async def throwaway_mongod():
+    """Start mongod on a free port in a temp dir; yield its URL."""
+    binary = shutil.which("mongod")
+    if not binary:
+        raise SystemExit("mongod not found on PATH (use --backend memory or url)")
+
+    import socket
+    from pymongo import MongoClient
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    data_dir = tempfile.mkdtemp(prefix="bench-mongod-")
+    process = subprocess.Popen(
+        [binary, "--dbpath", data_dir, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        probe = MongoClient(f"mongodb://127.0.0.1:{port}", serverSelectionTimeoutMS=15000)
+        probe.admin.command("ping")
+        probe.close()
+        yield f"mongodb://127.0.0.1:{port}/benchmark"
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+@asynccontextmanager
+async def scratch_database(base_url: str):
+    """Yield a unique database URL on an existing server and drop it afterwards."""
+    from pymongo import MongoClient
+
+    base_url = base_url.rstrip("/")
+    name = f"bench_{uuid.uuid4().hex[:8]}"
+    try:
+        yield f"{base_url}/{name}"
+    finally:
+        mongo = MongoClient(base_url)
+        mongo.drop_database(name)
+        mongo.close()
+
+
+@asynccontextmanager
+async def database_url_for(backend: str):
+    if backend == "memory":
+        yield "mongodb://localhost:27017/benchmark"
+    elif backend == "mongod":
+        async with throwaway_mongod() as url:
+            yield url
+    else:
+        async with scratch_database(os.environ["MONGO_URL"]) as url:
+            yield url
+
+
+# ---------- Seeding ----------
+
+async def seed(database, users: int, subjects: int, days: int) -> list:
+    """
+    Insert users, subjects (with counters) and attendance directly.
+    Attendance goes through the store for the configured ATTENDANCE_STORAGE.
+    Returns [{"user_id", "email", "token", "subject_ids"}].
+    """
+    from app.attendance_store import get_attendance_store
+    from app.hashing import get_pwd_context
+    from app.routes.auth import create_access_token
+
+    hashed_password = get_pwd_context().hash(PASSWORD)
+    start = date.today() - timedelta(days=days)
+    now = datetime.utcnow()
+    store = get_attendance_store(database)
+    accounts = []
+
+    for u in range(users):
+        email = f"bench-{u}@example.com"
+        user_id = (await database["users"].insert_one({
+            "name": f"Bench User {u}",
+            "email": email,
+            "hashed_password": hashed_password,
+            "created_at": now,
+        })).inserted_id
+
+        subject_ids = []
+        records = []
+        for s in range(subjects):
+            subject_id = ObjectId()
+            counts = {"present": 0, "absent": 0, "leave": 0, "total": days}
+            for d in range(days):
+                status = STATUSES[(u + s + d) % 7 % 3]
+                counts[status] += 1
+                records.append((str(subject_id), (start + timedelta(days=d)).isoformat(), status))
+            await database["subjects"].insert_one({
+                "_id": subject_id,
+                "user_id": str(user_id),
+                "name": f"Subject {s}",
+                "color": "#8B5CF6",
+                "counts": counts,
+                "created_at": now,
+            })
+            subject_ids.append(str(subject_id))
+
+        await store.bulk_set(str(user_id), records)
+
+        accounts.append({
+            "user_id": str(user_id),
+            "email": email,
+            "token": create_access_token(str(user_id), email),
+            "subject_ids": subject_ids,
+        })
+
+    return accounts
+
+
+# ---------- Traffic ----------
+
+def build_request(label: str, account: dict, days: int):
+    """Return (method, path, json_body, headers) for a labelled operation."""
+    headers = {"Authorization": f"Bearer {account['token']}"}
+    subject_id = random.choice(account["subject_ids"]) if account["subject_ids"] else str(ObjectId())
+    day = (date.today() - timedelta(days=random.randrange(max(days, 1)))).isoformat()
+
+    if label == "POST /api/auth/register":
+        email = f"bench-new-{uuid.uuid4().hex[:12]}@example.com"
+        return "POST", "/api/auth/register", {"name": "New User", "email": email, "password": PASSWORD}, {}
+    if label == "POST /api/auth/login":
+        return "POST", "/api/auth/login", {"email": account["email"], "password": PASSWORD}, {}
+    if label == "GET /api/subjects/":
+        return "GET", "/api/subjects/", None, headers
+    if label == "GET /api/attendance/{subject_id}":
+        return "GET", f"/api/attendance/{subject_id}", None, headers
+    if label == "GET /api/attendance/?from&to":
+        window_start = (date.today() - timedelta(days=30)).isoformat()
+        return "GET", f"/api/attendance/?from={window_start}&to={date.today().isoformat()}", None, headers
+    if label == "POST /api/attendance/":
+        body = {"subject_id": subject_id, "date": day, "status": random.choice(STATUSES)}
+        return "POST", "/api/attendance/", body, headers
+    if label == "GET /api/attendance/{subject_id}/stats":
+        return "GET", f"/api/attendance/{subject_id}/stats", None, headers
+    raise ValueError(f"Unknown operation {label}")
+
+
+async def drive(client: httpx.AsyncClient, accounts: list, mix: dict, total: int, concurrency: int, days: int) -> dict:
+    labels = list(mix)
+    weights = [mix[label] for label in labels]
+    samples = {label: [] for label in labels}
+    errors = {label: 0 for label in labels}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            label = random.choices(labels, weights)[0]
+            method, path, body, headers = build_request(label, random.choice(accounts), days)
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body, headers=headers)
+            samples[label].append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors[label] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for label in labels:
+        summary = summarize(samples[label])
+        summary["rps"] = round(len(samples[label]) / elapsed, 1)
+        summary["errors"] = errors[label]
+        routes[label] = summary
+
+    all_samples = [sample for values in samples.values() for sample in values]
+    overall = summarize(all_samples)
+    overall["rps"] = round(len(all_samples) / elapsed, 1)
+    overall["seconds"] = round(elapsed, 2)
+    return {"routes": routes, "total": overall}
+
+
+# ---------- Comparison ----------
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Return regressions where p50/p95/p99 grew by more than threshold percent."""
+    regressions = []
+    for label, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(label)
+        if not before:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[key] <= 0:
+                continue
+            change = (stats[key] - before[key]) / before[key] * 100
+            stats.setdefault("change_pct", {})[key] = round(change, 1)
+            if change > threshold:
+                regressions.append(f"{label} {key}: {before[key]} -> {stats[key]} (+{change:.1f}%)")
+    return regressions
+
+
+# ---------- Main ----------
+
+async def run(args) -> dict:
+    random.seed(args.seed)
+
+    async with database_url_for(args.backend) as url:
+        os.environ["MONGO_URL"] = url
+
+        import app.database as database_module
+        if args.backend == "memory":
+            database_module.client_factory = memory_client_factory()
+
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            accounts = await seed(database_module.get_database(), args.users, args.subjects, args.days)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                # Warm up caches and lazy imports so they do not skew p99
+                await drive(client, accounts, DEFAULT_MIX, min(50, args.requests), 1, args.days)
+                result = await drive(client, accounts, DEFAULT_MIX, args.requests, args.concurrency, args.days)
+
+    result["meta"] = {
+        "backend": args.backend,
+        "users": args.users,
+        "subjects": args.subjects,
+        "days": args.days,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "mongod", "url"], default="memory")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.threshold)
+        result["regressions"] = regressions
+
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report + "\n")
+    print(report)
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
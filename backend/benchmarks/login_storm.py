@@ -0,0 +1,109 @@
+"""
+Login storm benchmark
+Measures /health and /api/subjects latency while many logins run at once,
+with bcrypt inline on the event loop (before), on the hashing pool (after)
+and on the pool with the default auth rate limits (rate_limited, where most
+of the storm is answered 429 without hashing).
+
+Needs a throwaway MongoDB; each run uses its own database.
+
+Usage (from backend/):
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.login_storm
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import start_server, summarize, wait_until_healthy
+
+
+async def timed_get(client: httpx.AsyncClient, path: str, headers: dict, samples: list) -> None:
+    started = time.perf_counter()
+    await client.get(path, headers=headers)
+    samples.append((time.perf_counter() - started) * 1000)
+
+
+async def run_storm(base_url: str, logins: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await wait_until_healthy(client)
+
+        email = f"storm-{uuid.uuid4().hex[:8]}@example.com"
+        password = "benchmark-password"
+        response = await client.post(
+            "/api/auth/register", json={"name": "Storm", "email": email, "password": password}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        await client.post("/api/subjects/", json={"name": "Benchmark"}, headers=headers)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        login_statuses = []
+
+        async def login():
+            async with semaphore:
+                r = await client.post("/api/auth/login", json={"email": email, "password": password})
+                login_statuses.append(r.status_code)
+
+        health, subjects = [], []
+        storm = asyncio.gather(*[login() for _ in range(logins)])
+        started = time.perf_counter()
+
+        # Probe the cheap endpoints while the storm is running
+        while not storm.done():
+            await asyncio.gather(
+                timed_get(client, "/health", {}, health),
+                timed_get(client, "/api/subjects/", headers, subjects),
+            )
+            await asyncio.sleep(0.01)
+        await storm
+
+        return {
+            "storm_seconds": round(time.perf_counter() - started, 2),
+            "logins": {
+                "ok": login_statuses.count(200),
+                "shed_503": login_statuses.count(503),
+                "throttled_429": login_statuses.count(429),
+            },
+            "/health": summarize(health),
+            "/api/subjects": summarize(subjects),
+        }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=2, help="PASSWORD_HASH_WORKERS for the 'after' run")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017").rstrip("/")
+    results = {}
+
+    runs = (
+        ("before_inline", 0, "off"),
+        ("after_pool", args.workers, "off"),
+        ("rate_limited", args.workers, "memory"),
+    )
+    for label, workers, rate_limit_backend in runs:
+        database_url = f"{mongo_url}/bench_login_{uuid.uuid4().hex[:8]}"
+        server = start_server(
+            args.port, database_url, workers, extra_env={"RATE_LIMIT_BACKEND": rate_limit_backend}
+        )
+        try:
+            results[label] = await run_storm(f"http://127.0.0.1:{args.port}", args.logins, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Response size benchmark
+Bytes on the wire and decode time of GET /api/attendance/ bodies in every
+negotiable representation: JSON rows, columnar JSON, MessagePack rows and
+columnar MessagePack, each uncompressed, gzip and brotli (at the
+COMPRESSION_* levels the middleware uses).
+
+Decode time is the Python equivalent of what the frontend does (parse, then
+expand columnar tables back to rows); it shows the relative cost, not the
+browser's absolute numbers. Runs in-process; no MongoDB needed.
+
+Usage (from backend/):
+    python -m benchmarks.response_size
+    python -m benchmarks.response_size --sizes 1000 10000 --subjects 6 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/benchmark")
+
+from app.compression import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL, load_brotli  # noqa: E402
+from app.serialization import _msgpack_default, attendance_row, columnar, dumps, load_msgpack  # noqa: E402
+
+brotli = load_brotli()
+msgpack = load_msgpack()
+
+
+def make_rows(count: int, subjects: int) -> list:
+    """One user's history over `subjects` subjects, as the list endpoint returns it."""
+    user_id = str(ObjectId())
+    subject_ids = [str(ObjectId()) for _ in range(subjects)]
+    start = datetime(2024, 1, 1)
+    per_subject = -(-count // subjects)
+    rows = []
+    for index in range(count):
+        day = index % per_subject
+        rows.append(attendance_row({
+            "_id": ObjectId(),
+            "subject_id": subject_ids[index // per_subject],
+            "user_id": user_id,
+            "date": (start + timedelta(days=day)).strftime("%Y-%m-%d"),
+            "status": ("present", "present", "absent", "leave")[(index * 7) % 4],
+            "created_at": start + timedelta(days=day, hours=9, seconds=index),
+        }))
+    return rows
+
+
+def expand(table) -> list:
+    """Columnar table -> rows (what lib/columnar.ts does)."""
+    if not isinstance(table, dict) or table.get("layout") != "columnar":
+        return table
+    columns = table["columns"]
+    return [
+        {**table["constants"], **{key: values[index] for key, values in columns.items()}}
+        for index in range(table["count"])
+    ]
+
+
+def representations(rows: list) -> dict:
+    encoders = {
+        "json": (lambda: dumps(rows), lambda body: json.loads(body)),
+        "json_columnar": (lambda: dumps(columnar(rows)), lambda body: expand(json.loads(body))),
+    }
+    if msgpack is not None:
+        encoders["msgpack"] = (
+            lambda: msgpack.packb(rows, default=_msgpack_default),
+            lambda body: msgpack.unpackb(body),
+        )
+        encoders["msgpack_columnar"] = (
+            lambda: msgpack.packb(columnar(rows), default=_msgpack_default),
+            lambda body: expand(msgpack.unpackb(body)),
+        )
+    return encoders
+
+
+def best_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 2)
+
+
+def measure(rows: list, repeat: int) -> dict:
+    results = {}
+    for name, (encode, decode) in representations(rows).items():
+        body = encode()
+        assert len(decode(body)) == len(rows)
+
+        gzipper = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        gzipped = gzipper.compress(body) + gzipper.flush()
+        result = {
+            "bytes": len(body),
+            "gzip_bytes": len(gzipped),
+            "encode_ms": best_ms(encode, repeat),
+            "decode_ms": best_ms(lambda: decode(body), repeat),
+            "gzip_ms": best_ms(lambda: zlib.compress(body, COMPRESSION_GZIP_LEVEL), repeat),
+        }
+        if brotli is not None:
+            result["br_bytes"] = len(brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY))
+            result["br_ms"] = best_ms(lambda: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY), repeat)
+        results[name] = result
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {
+        "msgpack": msgpack is not None,
+        "brotli": brotli is not None,
+        "gzip_level": COMPRESSION_GZIP_LEVEL,
+        "brotli_quality": COMPRESSION_BROTLI_QUALITY,
+        "sizes": [],
+    }
+    for size in args.sizes:
+        rows = make_rows(size, args.subjects)
+        results["sizes"].append({"records": size, "encodings": measure(rows, args.repeat)})
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Serialization microbenchmark
+Compares the default list-endpoint path (pydantic model per row, response_model
+re-validation, jsonable_encoder, json.dumps) with the fast path in
+app.serialization (raw document -> dict -> orjson bytes).
+
+Runs in-process on synthetic attendance documents; no MongoDB needed.
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --sizes 100 10000 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.attendance import AttendanceResponse  # noqa: E402
+from app.serialization import attendance_row, dumps, orjson  # noqa: E402
+
+
+def make_documents(count: int) -> list:
+    user_id = str(ObjectId())
+    subject_id = str(ObjectId())
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "subject_id": subject_id,
+            "user_id": user_id,
+            "date": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+            "status": ("present", "absent", "leave")[i % 3],
+            "created_at": start + timedelta(days=i, seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+response_adapter = TypeAdapter(List[AttendanceResponse])
+
+
+def pydantic_path(documents: list) -> bytes:
+    records = [
+        AttendanceResponse(
+            id=str(doc["_id"]),
+            subject_id=doc["subject_id"],
+            user_id=doc["user_id"],
+            date=doc["date"],
+            status=doc["status"],
+            created_at=doc["created_at"],
+        )
+        for doc in documents
+    ]
+    # What FastAPI does with response_model before rendering
+    validated = response_adapter.validate_python(records, from_attributes=True)
+    content = jsonable_encoder(response_adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(documents: list) -> bytes:
+    return dumps([attendance_row(doc) for doc in documents])
+
+
+def measure(func, documents: list, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(documents)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(documents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "best_ms": round(best * 1000, 2),
+        "records_per_sec": int(len(documents) / best) if best else 0,
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"encoder": "orjson" if orjson is not None else "json", "sizes": []}
+    for size in args.sizes:
+        documents = make_documents(size)
+        assert json.loads(pydantic_path(documents[:3])) == json.loads(fast_path(documents[:3]))
+        results["sizes"].append({
+            "records": size,
+            "pydantic": measure(pydantic_path, documents, args.repeat),
+            "fast": measure(fast_path, documents, args.repeat),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
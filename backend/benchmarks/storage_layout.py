@@ -0,0 +1,136 @@
+"""
+Attendance storage layout benchmark
+Seeds the same attendance history into both layouts (`attendance` documents
+and `attendance_buckets` month buckets), then reports storage and index size
+from collStats and the latency of the queries the routes run:
+
+    month      one subject's records for one month      (calendar, /?from&to)
+    page       first 50 records of a subject by date     (GET /{subject_id})
+    counts     status counts of a subject                (stats backfill, import)
+    upsert     marking one day                           (POST /)
+
+Needs a real MongoDB (mongomock has no collStats); a scratch database is
+created on the server in MONGO_URL and dropped afterwards.
+
+Usage (from backend/):
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.storage_layout
+    python -m benchmarks.storage_layout --users 50 --subjects 8 --days 365 --samples 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.common import summarize
+
+STATUSES = ("present", "absent", "leave")
+LAYOUTS = ("documents", "buckets")
+
+
+async def seed(store, users: int, subjects: int, days: int) -> list:
+    """Write the same deterministic history into a store. Returns [(user_id, subject_id)]."""
+    start = date.today() - timedelta(days=days)
+    pairs = []
+    for u in range(users):
+        user_id = f"user-{u}"
+        items = []
+        for s in range(subjects):
+            subject_id = f"subject-{u}-{s}"
+            pairs.append((user_id, subject_id))
+            for d in range(days):
+                items.append((subject_id, (start + timedelta(days=d)).isoformat(), STATUSES[(u + s + d) % 7 % 3]))
+        await store.bulk_set(user_id, items)
+    return pairs
+
+
+async def time_query(samples: int, run) -> dict:
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        await run()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return summarize(latencies)
+
+
+async def measure(database, layout: str, args) -> dict:
+    from app.attendance_store import get_attendance_store
+
+    store = get_attendance_store(database, layout)
+    pairs = await seed(store, args.users, args.subjects, args.days)
+
+    stats = await database.command("collStats", store.collection_name)
+    result = {
+        "layout": layout,
+        "documents": stats["count"],
+        "data_size_kb": round(stats["size"] / 1024, 1),
+        "storage_size_kb": round(stats["storageSize"] / 1024, 1),
+        "index_size_kb": round(stats["totalIndexSize"] / 1024, 1),
+        "latency": {},
+    }
+
+    rng = random.Random(42)
+    today = date.today()
+
+    async def month():
+        user_id, subject_id = rng.choice(pairs)
+        first = (today - timedelta(days=rng.randrange(args.days))).replace(day=1)
+        query = {
+            "user_id": user_id,
+            "subject_id": subject_id,
+            "date": {"$gte": first.isoformat(), "$lte": f"{first.isoformat()[:7]}-31"},
+        }
+        [record async for record in store.find(query)]
+
+    async def page():
+        user_id, subject_id = rng.choice(pairs)
+        query = {"user_id": user_id, "subject_id": subject_id}
+        [record async for record in store.find(query, sort=[("date", 1)], limit=51)]
+
+    async def counts():
+        user_id, subject_id = rng.choice(pairs)
+        await store.count_statuses(user_id, subject_id)
+
+    async def upsert():
+        user_id, subject_id = rng.choice(pairs)
+        day = (today - timedelta(days=rng.randrange(args.days))).isoformat()
+        await store.upsert(user_id, subject_id, day, rng.choice(STATUSES))
+
+    for name, run in (("month", month), ("page", page), ("counts", counts), ("upsert", upsert)):
+        result["latency"][name] = await time_query(args.samples, run)
+
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--days", type=int, default=240)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    from app.indexes import ensure_indexes
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017").rstrip("/")
+    client = AsyncIOMotorClient(mongo_url)
+    name = f"bench_layout_{uuid.uuid4().hex[:8]}"
+    try:
+        database = client[name]
+        await ensure_indexes(database)
+        results = [await measure(database, layout, args) for layout in LAYOUTS]
+    finally:
+        await client.drop_database(name)
+        client.close()
+
+    print(json.dumps({"options": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Shared fixtures
+The app runs against mongomock_motor's in-memory client, so the suite needs
+no MongoDB. Async tests use the anyio plugin (@pytest.mark.anyio).
+"""
+
+import os
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("STARTUP_WARMUP", "blocking")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import app.database as database_module  # noqa: E402
+
+
+class MockClient(AsyncMongoMockClient):
+    def get_default_database(self, *args, **kwargs):
+        return self["test"]
+
+
+async def no_explain(database) -> dict:
+    # mongomock has no explain(); index creation itself still runs
+    return {}
+
+
+database_module.client_factory = lambda url, **options: MockClient()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def database():
+    """A fresh in-memory database for store-level tests."""
+    return MockClient()["test"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """TestClient with the lifespan running against a fresh in-memory database."""
+    monkeypatch.setattr(database_module, "verify_indexes", no_explain)
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def register(client, email: str = "student@example.com") -> dict:
+    """Register a user and return their Authorization header."""
+    response = client.post(
+        "/api/auth/register", json={"name": "Student", "email": email, "password": "secret1"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def auth_headers(client) -> dict:
+    return register(client)
@@ -0,0 +1,88 @@
+import base64
+
+import pytest
+
+from app.routes.attendance import CALENDAR_ROW_BYTES, pack_month
+
+
+@pytest.fixture
+def subject_id(client, auth_headers) -> str:
+    response = client.post("/api/subjects/", json={"name": "Maths", "color": "#3B82F6"}, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def mark(client, headers, subject_id, date, status="present"):
+    return client.post(
+        "/api/attendance/", json={"subject_id": subject_id, "date": date, "status": status}, headers=headers
+    )
+
+
+@pytest.mark.parametrize("date", ["2024-02-31", "2023-02-29", "2024-13-01", "2024-00-10", "2024-1-5"])
+def test_mark_rejects_impossible_dates(client, auth_headers, subject_id, date):
+    assert mark(client, auth_headers, subject_id, date).status_code == 422
+
+
+def test_bulk_rejects_impossible_dates(client, auth_headers, subject_id):
+    response = client.post("/api/attendance/bulk", json={"records": [
+        {"subject_id": subject_id, "date": "2024-02-29", "status": "present"},
+        {"subject_id": subject_id, "date": "2024-04-31", "status": "present"},
+    ]}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_mark_and_stats(client, auth_headers, subject_id):
+    assert mark(client, auth_headers, subject_id, "2024-02-29").status_code == 200
+    assert mark(client, auth_headers, subject_id, "2024-03-01", "absent").status_code == 200
+
+    stats = client.get(f"/api/attendance/{subject_id}/stats", headers=auth_headers).json()
+    assert (stats["present"], stats["absent"], stats["total"]) == (1, 1, 2)
+
+
+def test_pack_month_skips_malformed_dates():
+    records = [
+        {"subject_id": "a", "date": "2024-01-31", "status": "leave"},
+        {"subject_id": "a", "date": "2024-1-5", "status": "present"},
+        {"subject_id": "a", "date": "2024-01-00", "status": "present"},
+    ]
+    bitmap = pack_month(records, {"a": 0}, 1)
+    assert len(bitmap) == CALENDAR_ROW_BYTES
+    assert bitmap[7] == 3 << 4  # day 31 -> bits 60-61
+    assert sum(bitmap[:7]) == 0
+
+
+@pytest.fixture
+def january(client, auth_headers, subject_id) -> str:
+    for date, status in (("2024-01-01", "present"), ("2024-01-02", "absent"), ("2024-01-31", "leave")):
+        assert mark(client, auth_headers, subject_id, date, status).status_code == 200
+    return subject_id
+
+
+def test_calendar_bitmap(client, auth_headers, january):
+    calendar = client.get(
+        f"/api/attendance/calendar?month=2024-01&subject_ids={january}", headers=auth_headers
+    ).json()
+    bitmap = base64.b64decode(calendar["bitmap"])
+    assert calendar["days"] == 31 and len(bitmap) == CALENDAR_ROW_BYTES
+    assert bitmap[0] == 0b1001  # day 1 present, day 2 absent
+    assert bitmap[7] == 3 << 4  # day 31 leave
+
+
+def test_projection(client, auth_headers, january):
+    projection = client.get("/api/attendance/projection?target=75&remaining=4", headers=auth_headers).json()
+    subject = projection["subjects"][0]
+    assert (subject["present"], subject["total"]) == (1, 3)
+    assert subject["classes_to_attend"] == 5  # (1 + 5) / (3 + 5) = 75%
+    assert subject["projected_percentage"] == 71.4
+
+
+def test_record_pages_follow_the_cursor(client, auth_headers, january):
+    dates, after = [], None
+    while True:
+        url = f"/api/attendance/{january}?limit=2" + (f"&after={after}" if after else "")
+        page = client.get(url, headers=auth_headers).json()
+        dates += [record["date"] for record in page["records"]]
+        after = page["next_cursor"]
+        if not after:
+            break
+    assert dates == ["2024-01-01", "2024-01-02", "2024-01-31"]
@@ -0,0 +1,107 @@
+import pytest
+
+from app.attendance_store import BucketStore, DocumentStore
+from app.counters import EMPTY_COUNTS, merge_delta, status_delta
+
+pytestmark = pytest.mark.anyio
+
+USER = "user-1"
+SUBJECT = "subject-1"
+SPARSE_DAYS = ["2024-01-05", "2024-02-07", "2024-03-09"]
+
+
+@pytest.fixture(params=[DocumentStore, BucketStore], ids=["documents", "buckets"])
+def store(request, database):
+    return request.param(database)
+
+
+async def dates(cursor) -> list:
+    return [record["date"] async for record in cursor]
+
+
+async def test_upsert_returns_previous_status(store):
+    record, previous = await store.upsert(USER, SUBJECT, "2024-01-05", "present")
+    assert previous is None
+    assert record["date"] == "2024-01-05"
+
+    _, previous = await store.upsert(USER, SUBJECT, "2024-01-05", "absent")
+    assert previous == "present"
+    assert await store.count_statuses(USER, SUBJECT) == {"present": 0, "absent": 1, "leave": 0, "total": 1}
+
+
+async def test_keyset_pages_over_sparse_months(store):
+    for date in SPARSE_DAYS:
+        await store.upsert(USER, SUBJECT, date, "present")
+
+    query = {"user_id": USER, "subject_id": SUBJECT}
+    seen = []
+    after = None
+    while True:
+        page_query = dict(query, date={"$gt": after}) if after else query
+        page = await dates(store.find(page_query, sort=[("date", 1)], limit=2))
+        seen.extend(page[:1])
+        if len(page) < 2:
+            break
+        after = page[0]
+
+    assert seen == SPARSE_DAYS
+
+
+async def test_cursor_inside_month_with_nothing_left(store):
+    for date in SPARSE_DAYS:
+        await store.upsert(USER, SUBJECT, date, "present")
+
+    query = {"user_id": USER, "subject_id": SUBJECT, "date": {"$gt": "2024-01-05"}}
+    assert await dates(store.find(query, sort=[("date", 1)], limit=1)) == ["2024-02-07"]
+
+    query["date"]["$lte"] = "2024-03-01"
+    assert await dates(store.find(query, sort=[("date", 1)], limit=5)) == ["2024-02-07"]
+
+
+async def test_bulk_upsert_reports_previous(store):
+    await store.upsert(USER, SUBJECT, "2024-01-05", "absent")
+    results = await store.bulk_upsert(USER, [
+        (SUBJECT, "2024-01-05", "present"),
+        (SUBJECT, "2024-01-06", "leave"),
+    ])
+    assert [result["previous"] for result in results] == ["absent", None]
+    assert all(result["error"] is None for result in results)
+    assert await store.count_statuses(USER, SUBJECT) == {"present": 1, "absent": 0, "leave": 1, "total": 2}
+
+
+async def test_bulk_upsert_previous_is_exact_with_a_racing_mark(store, monkeypatch):
+    await store.upsert(USER, SUBJECT, "2024-01-05", "leave")
+    racing = {}
+
+    def race_before(name):
+        real = getattr(store.collection, name)
+
+        async def write(*args, **kwargs):
+            # A single mark lands just before the batch's first write
+            if not racing:
+                racing["started"] = True
+                racing["previous"] = (await store.upsert(USER, SUBJECT, "2024-01-05", "absent"))[1]
+            return await real(*args, **kwargs)
+
+        monkeypatch.setattr(store.collection, name, write)
+
+    race_before("find_one_and_update")
+    race_before("bulk_write")
+    (result,) = await store.bulk_upsert(USER, [(SUBJECT, "2024-01-05", "present")])
+
+    # Replaying both transitions from "leave" must land on the final status
+    counts = {**EMPTY_COUNTS, "leave": 1, "total": 1}
+    merge_delta(counts, status_delta(racing["previous"], "absent"))
+    merge_delta(counts, status_delta(result["previous"], "present"))
+    assert counts == await store.count_statuses(USER, SUBJECT)
+
+
+async def test_bulk_set_reports_previous(store):
+    await store.upsert(USER, SUBJECT, "2024-01-05", "absent")
+    results = await store.bulk_set(USER, [
+        (SUBJECT, "2024-01-05", "present"),
+        (SUBJECT, "2024-02-06", "leave"),
+    ])
+    assert [result["previous"] for result in results] == ["absent", None]
+    assert all(result["error"] is None for result in results)
+    assert await store.count_statuses(USER, SUBJECT) == {"present": 1, "absent": 0, "leave": 1, "total": 2}
@@ -0,0 +1,24 @@
+from conftest import register
+
+
+def test_register_login_and_me(client):
+    headers = register(client, "ada@example.com")
+    assert client.get("/api/auth/me", headers=headers).json()["email"] == "ada@example.com"
+
+    response = client.post("/api/auth/login", json={"email": "ada@example.com", "password": "secret1"})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_duplicate_email_and_wrong_password(client):
+    register(client, "bob@example.com")
+    response = client.post(
+        "/api/auth/register", json={"name": "Bob", "email": "bob@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 409
+    assert client.post("/api/auth/login", json={"email": "bob@example.com", "password": "nope"}).status_code == 401
+
+
+def test_invalid_token(client):
+    assert client.get("/api/auth/me", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
@@ -0,0 +1,65 @@
+import pytest
+
+from app.attendance_store import BucketStore, DocumentStore
+from app.bucket_migration import MIGRATION_ID, copy_records, verify
+from app.indexes import ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+USER = "user-1"
+DAYS = [
+    ("maths", "2024-01-05", "present"),
+    ("maths", "2024-01-06", "absent"),
+    ("maths", "2024-02-01", "present"),
+    ("physics", "2024-01-05", "leave"),
+    ("physics", "2024-03-10", "present"),
+]
+
+
+@pytest.fixture
+async def stores(database):
+    await ensure_indexes(database)
+    documents = DocumentStore(database)
+    for subject_id, date, status in DAYS:
+        await documents.upsert(USER, subject_id, date, status)
+    return documents, BucketStore(database)
+
+
+async def records(store, subject_id) -> list:
+    cursor = store.find({"user_id": USER, "subject_id": subject_id}, sort=[("date", 1)])
+    return [(record["date"], record["status"]) async for record in cursor]
+
+
+async def test_copy_in_batches_and_verify(database, stores):
+    documents, buckets = stores
+    assert await copy_records(database, batch_size=2, pause=0) == len(DAYS)
+    assert await verify(database) == []
+
+    for subject_id in ("maths", "physics"):
+        assert await records(buckets, subject_id) == await records(documents, subject_id)
+    assert await database["attendance_buckets"].count_documents({}) == 4
+
+    state = await database["migrations"].find_one({"_id": MIGRATION_ID})
+    assert state["copied"] == len(DAYS)
+
+
+async def test_resumes_after_the_last_copied_record(database, stores):
+    documents, _ = stores
+    await copy_records(database, batch_size=2, pause=0)
+    assert await copy_records(database, batch_size=2, pause=0) == 0
+
+    await documents.upsert(USER, "maths", "2024-02-02", "leave")
+    assert await copy_records(database, batch_size=2, pause=0) == 1
+    assert await verify(database) == []
+
+
+async def test_dual_write_newer_than_the_copy_is_kept(database, stores):
+    _, buckets = stores
+    # Written to both layouts by dual mode after the document the copy will read
+    await buckets.upsert(USER, "maths", "2024-01-06", "leave")
+
+    await copy_records(database, batch_size=10, pause=0)
+    assert ("2024-01-06", "leave") in await records(buckets, "maths")
+    assert {(report["status"], report["documents"], report["buckets"]) for report in await verify(database)} == {
+        ("absent", 1, 0), ("leave", 0, 1)
+    }
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import AsyncLRUCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lru_eviction():
+    cache = AsyncLRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.evictions == 1
+
+
+async def test_ttl_expiry(monkeypatch):
+    cache = AsyncLRUCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: real_monotonic() + 6)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncLRUCache()
+    calls = []
+    release = asyncio.Event()
+
+    async def loader():
+        calls.append(1)
+        await release.wait()
+        return "value"
+
+    tasks = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*tasks) == ["value"] * 3
+    assert len(calls) == 1
+    assert await cache.get_or_load("k", loader) == "value" and cache.hits == 1
+
+
+async def test_load_invalidated_in_flight_is_not_stored():
+    cache = AsyncLRUCache()
+    values = iter(["stale", "fresh"])
+    release = asyncio.Event()
+
+    async def slow_loader():
+        value = next(values)
+        await release.wait()
+        return value
+
+    in_flight = asyncio.create_task(cache.get_or_load("k", slow_loader))
+    await asyncio.sleep(0)
+    cache.invalidate("k")
+
+    # A caller after the invalidation does not join the stale load
+    fresh = asyncio.create_task(cache.get_or_load("k", slow_loader))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await in_flight == "stale"
+    assert await fresh == "fresh"
+    assert cache.get("k") == "fresh"
+
+
+async def test_cancelled_waiter_leaves_the_load_running():
+    cache = AsyncLRUCache()
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    loading = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await loading == "value"
+    assert waiter.cancelled()
+    assert cache.get("k") == "value"
+
+
+async def test_waiters_reload_when_the_loading_caller_is_cancelled():
+    cache = AsyncLRUCache()
+    calls = []
+    release = asyncio.Event()
+
+    async def loader():
+        calls.append(1)
+        await release.wait()
+        return "value"
+
+    loading = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    loading.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "value"
+    assert loading.cancelled()
+    assert len(calls) == 2
+
+
+async def test_failed_and_empty_loads_are_not_cached():
+    cache = AsyncLRUCache()
+
+    async def failing():
+        raise RuntimeError("down")
+
+    async def empty():
+        return None
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("k", failing)
+    assert await cache.get_or_load("k", empty) is None
+    assert len(cache) == 0 and cache.misses == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from app.compression import accepted_encodings
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=0.5, br, identity;q=0, bad;q=x") == {
+        "gzip": 0.5, "br": 1.0, "identity": 0.0, "bad": 0.0
+    }
+
+
+@pytest.fixture
+def history(client, auth_headers):
+    subject_id = client.post("/api/subjects/", json={"name": "Biology"}, headers=auth_headers).json()["id"]
+    client.post("/api/attendance/bulk", json={"records": [
+        {"subject_id": subject_id, "date": f"2024-{month:02d}-{day:02d}", "status": "present"}
+        for month in range(1, 4) for day in range(1, 29)
+    ]}, headers=auth_headers)
+    return subject_id
+
+
+@pytest.mark.parametrize("accept_encoding, coding", [("gzip", "gzip"), ("br, gzip", "br"), ("identity", None)])
+def test_large_responses_are_compressed(client, auth_headers, history, accept_encoding, coding):
+    if coding == "br":
+        pytest.importorskip("brotli")
+    response = client.get("/api/attendance/", headers={**auth_headers, "Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == coding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.json()) == 84
+
+
+def test_small_and_not_modified_responses_are_not_compressed(client, auth_headers, history):
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+    small = client.get(f"/api/attendance/{history}/stats", headers=headers)
+    assert "content-encoding" not in small.headers
+
+    etag = client.get("/api/attendance/", headers=headers).headers["ETag"]
+    not_modified = client.get("/api/attendance/", headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304 and "content-encoding" not in not_modified.headers
+
+
+def test_export_streams_compressed(client, auth_headers, history):
+    response = client.get("/api/attendance/export?format=ndjson", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.strip().split("\n")) == 84
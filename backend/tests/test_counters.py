@@ -0,0 +1,54 @@
+import pytest
+
+from app.attendance_store import DocumentStore
+from app.counters import EMPTY_COUNTS, reconcile_counters, status_delta
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("old, new, delta", [
+    (None, "present", {"present": 1, "total": 1}),
+    ("present", "absent", {"present": -1, "absent": 1}),
+    ("leave", "leave", {}),
+])
+def test_status_delta(old, new, delta):
+    assert status_delta(old, new) == delta
+
+
+@pytest.fixture
+async def subjects(database):
+    store = DocumentStore(database)
+    ids = {}
+    for name, counts in (
+        ("correct", {**EMPTY_COUNTS, "present": 2, "total": 2}),
+        ("drifted", {**EMPTY_COUNTS, "present": 5, "total": 5}),
+        ("missing", None),
+    ):
+        doc = {"user_id": "user-1", "name": name}
+        if counts is not None:
+            doc["counts"] = counts
+        ids[name] = str((await database["subjects"].insert_one(doc)).inserted_id)
+        await store.upsert("user-1", ids[name], "2024-01-05", "present")
+        await store.upsert("user-1", ids[name], "2024-01-06", "present")
+
+    deleted = await database["subjects"].insert_one(
+        {"user_id": "user-1", "name": "deleted", "counts": dict(EMPTY_COUNTS), "deleted_at": 1}
+    )
+    await store.upsert("user-1", str(deleted.inserted_id), "2024-01-05", "absent")
+    return ids
+
+
+async def test_reports_drift_without_fixing(database, subjects):
+    drift = await reconcile_counters(database)
+    assert sorted(report["subject_id"] for report in drift) == sorted([subjects["drifted"], subjects["missing"]])
+    assert all(report["actual"] == {**EMPTY_COUNTS, "present": 2, "total": 2} for report in drift)
+
+    assert await reconcile_counters(database) == drift
+
+
+async def test_fix_overwrites_drifted_counters(database, subjects):
+    assert len(await reconcile_counters(database, fix=True)) == 2
+    assert await reconcile_counters(database) == []
+
+    async for subject in database["subjects"].find({"name": {"$ne": "deleted"}}):
+        assert subject["counts"] == {**EMPTY_COUNTS, "present": 2, "total": 2}
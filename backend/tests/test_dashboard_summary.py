@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from app.attendance_store import BucketStore, DocumentStore
+from app.routes.attendance import dashboard_pipeline, dashboard_summary
+
+pytestmark = pytest.mark.anyio
+
+USER = "user-1"
+
+
+async def run_pipeline(database, pipeline: list) -> dict:
+    """
+    Run dashboard_pipeline on mongomock, which has no $lookup with let: the
+    stages before the $lookup run on subjects, the joined pipeline runs per
+    subject with $$subject_id bound, and the remaining stages run on the
+    joined documents.
+    """
+    split = next(index for index, stage in enumerate(pipeline) if "$lookup" in stage)
+    lookup = pipeline[split]["$lookup"]
+    assert lookup["let"] == {"subject_id": {"$toString": "$_id"}}
+
+    joined = await database["subjects"].aggregate(pipeline[:split]).to_list(length=None)
+    for subject in joined:
+        inner = []
+        for stage in lookup["pipeline"]:
+            if "$match" in stage and "$expr" in stage["$match"]:
+                match = {key: value for key, value in stage["$match"].items() if key != "$expr"}
+                stage = {"$match": {**match, "subject_id": str(subject["_id"])}}
+            inner.append(stage)
+        subject[lookup["as"]] = await database[lookup["from"]].aggregate(inner).to_list(length=None)
+
+    if joined:
+        await database["joined"].insert_many(joined)
+    result = await database["joined"].aggregate(pipeline[split + 1:]).to_list(length=1)
+    return result[0] if result else {"subjects": [], "totals": []}
+
+
+@pytest.fixture(params=[DocumentStore, BucketStore], ids=["documents", "buckets"])
+def store(request, database):
+    return request.param(database)
+
+
+@pytest.fixture
+async def subjects(database, store):
+    ids = []
+    for index, name in enumerate(("Maths", "Physics", "Deleted")):
+        doc = {"user_id": USER, "name": name, "color": "#3B82F6", "created_at": datetime(2024, 1, index + 1)}
+        if name == "Deleted":
+            doc["deleted_at"] = datetime(2024, 2, 1)
+        ids.append(str((await database["subjects"].insert_one(doc)).inserted_id))
+
+    maths, physics, deleted = ids
+    for subject_id, date, status in (
+        (maths, "2024-01-08", "present"),
+        (maths, "2024-01-09", "present"),
+        (maths, "2024-02-05", "absent"),
+        (physics, "2024-01-08", "leave"),
+        (deleted, "2024-01-08", "present"),
+    ):
+        await store.upsert(USER, subject_id, date, status)
+    await store.upsert("user-2", maths, "2024-01-10", "absent")
+    return ids
+
+
+async def test_summary_of_all_history(database, store, subjects):
+    facets = await run_pipeline(database, dashboard_pipeline(store, USER, None, None))
+    summary = dashboard_summary(facets)
+
+    assert summary.totalSubjects == 2
+    assert (summary.totalPresent, summary.totalAbsent, summary.totalLeave) == (2, 1, 1)
+    assert summary.overallPercentage == 50
+    maths, physics = summary.subjectStats
+    assert (maths.subject.name, maths.total, maths.present, maths.percentage) == ("Maths", 3, 2, 67)
+    assert (physics.subject.name, physics.total, physics.leave, physics.percentage) == ("Physics", 1, 1, 0)
+
+
+async def test_summary_within_a_date_window(database, store, subjects):
+    pipeline = dashboard_pipeline(store, USER, "2024-02-01", "2024-02-29")
+    summary = dashboard_summary(await run_pipeline(database, pipeline))
+
+    assert summary.totalSubjects == 2
+    assert (summary.totalPresent, summary.totalAbsent, summary.totalLeave) == (0, 1, 0)
+    assert [stats.total for stats in summary.subjectStats] == [1, 0]
+
+
+def test_empty_summary():
+    summary = dashboard_summary({"subjects": [], "totals": []})
+    assert (summary.totalSubjects, summary.overallPercentage, summary.subjectStats) == (0, 0, [])
@@ -0,0 +1,54 @@
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+MSGPACK = "application/msgpack"
+COLUMNAR = "application/json; layout=columnar"
+
+
+@pytest.fixture
+def subject_id(client, auth_headers) -> str:
+    subject_id = client.post("/api/subjects/", json={"name": "Physics"}, headers=auth_headers).json()["id"]
+    for day in range(1, 4):
+        client.post("/api/attendance/", json={
+            "subject_id": subject_id, "date": f"2024-01-0{day}", "status": "present"
+        }, headers=auth_headers)
+    return subject_id
+
+
+@pytest.fixture(params=["/api/subjects/", "/api/attendance/", "page"])
+def path(request, subject_id) -> str:
+    return f"/api/attendance/{subject_id}" if request.param == "page" else request.param
+
+
+def test_etag_depends_on_the_representation(client, auth_headers, path):
+    json_response = client.get(path, headers=auth_headers)
+    json_etag = json_response.headers["ETag"]
+    assert json_response.headers["content-type"].startswith("application/json")
+
+    for accept, suffix in ((MSGPACK, '-msgpack"'), (COLUMNAR, '-columnar"'), (f"{MSGPACK}; layout=columnar", '-msgpack-columnar"')):
+        response = client.get(path, headers={**auth_headers, "Accept": accept, "If-None-Match": json_etag})
+        assert response.status_code == 200, accept
+        assert response.headers["ETag"].endswith(suffix)
+        assert "Accept" in response.headers["Vary"]
+
+        revalidated = client.get(path, headers={**auth_headers, "Accept": accept, "If-None-Match": response.headers["ETag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["Vary"] == "Accept"
+
+    response = client.get(path, headers={**auth_headers, "If-None-Match": json_etag})
+    assert response.status_code == 304
+
+
+def test_msgpack_body_matches_json(client, auth_headers):
+    rows = client.get("/api/subjects/", headers=auth_headers).json()
+    response = client.get("/api/subjects/", headers={**auth_headers, "Accept": MSGPACK})
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == rows
+
+
+def test_columnar_table(client, auth_headers, subject_id):
+    table = client.get("/api/attendance/", headers={**auth_headers, "Accept": COLUMNAR}).json()
+    assert table["layout"] == "columnar" and table["count"] == 3
+    assert table["constants"]["subject_id"] == subject_id
+    assert table["columns"]["date"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
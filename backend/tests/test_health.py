@@ -0,0 +1,42 @@
+import logging
+from types import SimpleNamespace
+
+import app.database as database_module
+
+
+class FailedTask:
+    def done(self):
+        return True
+
+    def cancelled(self):
+        return False
+
+    def exception(self):
+        return RuntimeError("mongodb://admin:hunter2@db:27017 refused")
+
+
+def test_liveness_and_readiness(client):
+    assert client.get("/health").json() == {"status": "healthy"}
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200 and ready.json()["status"] == "ready"
+
+
+def test_failed_ping_is_logged_not_returned(client, monkeypatch, caplog):
+    async def refuse(*args, **kwargs):
+        raise ConnectionError("mongodb://admin:hunter2@db:27017 refused")
+
+    with monkeypatch.context() as patch, caplog.at_level(logging.WARNING, logger="app.main"):
+        patch.setattr(database_module, "client", SimpleNamespace(admin=SimpleNamespace(command=refuse)))
+        response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable"}
+    record = next(record for record in caplog.records if record.getMessage() == "Readiness ping failed")
+    assert "hunter2" in record.error
+
+
+def test_failed_warm_up_is_not_returned(client, monkeypatch):
+    monkeypatch.setattr(client.app.state, "warm_up", FailedTask())
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable"}
@@ -0,0 +1,73 @@
+import pytest
+
+from app.importer import MAX_LINE_LENGTH, iter_lines, iter_rows
+from app.models.subject import SUBJECT_COLORS
+
+pytestmark = pytest.mark.anyio
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+async def test_lines_split_across_chunks():
+    body = "﻿subject_name,date,status\r\nMaths,2024-01-05,present\r\nCafé,2024-01-06,absent".encode()
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+    assert await collect(iter_lines(stream(*chunks))) == [
+        (1, "subject_name,date,status"),
+        (2, "Maths,2024-01-05,present"),
+        (3, "Café,2024-01-06,absent"),
+    ]
+
+
+async def test_long_lines_are_dropped_while_streaming():
+    long_line = b"x" * 50
+    chunks = [b"ok\n" + long_line[:20], long_line[20:], b"\nnext\n", long_line]
+    assert await collect(iter_lines(stream(*chunks), max_length=10)) == [
+        (1, "ok"), (2, None), (3, "next"), (4, None)
+    ]
+
+
+async def test_long_row_is_rejected_with_its_line_number():
+    body = "date,status,subject_name\n" + "2024-01-05,present," + "x" * MAX_LINE_LENGTH + "\n2024-01-06,absent,Maths\n"
+    rows = await collect(iter_rows(stream(body.encode()), "csv"))
+    assert rows[0] == (2, None, f"Line longer than {MAX_LINE_LENGTH} characters")
+    assert rows[1] == (3, {"date": "2024-01-06", "status": "absent", "subject_name": "Maths"}, None)
+
+
+async def test_ndjson_rows():
+    body = b'{"subject_id": "s1", "date": "2024-01-05", "status": "present"}\n\n[1]\nnot json\n'
+    rows = await collect(iter_rows(stream(body), "ndjson"))
+    assert [(line, error) for line, _, error in rows] == [
+        (1, None), (3, "Expected a JSON object"), (4, "Invalid JSON")
+    ]
+
+
+def test_import_creates_subjects_and_rejects_bad_rows(client, auth_headers):
+    body = "\n".join([
+        "subject_name,date,status",
+        "Chemistry,2024-01-05,present",
+        "Chemistry,2024-01-06,absent",
+        "Chemistry,2024-02-30,present",
+        "Chemistry,2024-01-07," + "x" * MAX_LINE_LENGTH,
+        "Chemistry,2024-01-08,late",
+    ])
+    response = client.post(
+        "/api/attendance/import?create_missing_subjects=true",
+        content=body.encode(),
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted"], result["rejected"], result["created_subjects"]) == (2, 3, ["Chemistry"])
+    assert [error["line"] for error in result["errors"]] == [4, 5, 6]
+
+    subjects = client.get("/api/subjects/", headers=auth_headers).json()
+    assert subjects[0]["color"] in SUBJECT_COLORS
+    stats = client.get(f"/api/attendance/{subjects[0]['id']}/stats", headers=auth_headers).json()
+    assert (stats["present"], stats["absent"], stats["total"]) == (1, 1, 2)
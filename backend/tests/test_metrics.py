@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from bson.int64 import Int64
+
+from app.metrics import MongoCommandMetrics, mongo_command_duration
+
+
+def command_events(name: str, command: dict, request_id: int):
+    common = dict(command_name=name, connection_id=("localhost", 27017), request_id=request_id)
+    return SimpleNamespace(command=command, **common), SimpleNamespace(duration_micros=1500, **common)
+
+
+def count_line(command: str, collection: str) -> str:
+    labels = f'collection="{collection}",command="{command}"'
+    return next(
+        (line for line in mongo_command_duration.render() if line.startswith(f"mongodb_command_duration_seconds_count{{{labels}}}")),
+        "",
+    )
+
+
+def test_commands_are_labelled_with_their_collection():
+    listener = MongoCommandMetrics()
+    for request_id, (name, command) in enumerate([
+        ("find", {"find": "subjects", "filter": {}}),
+        ("getMore", {"getMore": Int64(8123456789), "collection": "attendance_buckets"}),
+        ("ping", {"ping": 1}),
+    ]):
+        started, succeeded = command_events(name, command, request_id)
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    assert count_line("find", "subjects")
+    assert count_line("getMore", "attendance_buckets")
+    assert count_line("ping", "")
+    assert not count_line("getMore", "")
+
+
+def test_metrics_endpoint_reports_routes(client, auth_headers):
+    client.get("/api/subjects/", headers=auth_headers)
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/subjects/",status="200"}' in body
+    assert "mongodb_command_duration_seconds_count" in body
@@ -0,0 +1,172 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app import rate_limit
+from app.rate_limit import Limit, MemoryBackend, MongoBackend, RateLimited, RateLimiter, client_ip
+
+from conftest import register
+
+
+class Clock:
+    """Shifts time.monotonic and datetime.utcnow forward on demand."""
+
+    def __init__(self, monkeypatch):
+        self.offset = 0.0
+        real_monotonic = time.monotonic
+        clock = self
+
+        class ShiftedDatetime(datetime):
+            @classmethod
+            def utcnow(cls):
+                return datetime.utcnow() + timedelta(seconds=clock.offset)
+
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: real_monotonic() + self.offset)
+        monkeypatch.setattr(rate_limit, "datetime", ShiftedDatetime)
+
+    def advance(self, seconds: float) -> None:
+        self.offset += seconds
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def backend(request, database):
+    return MemoryBackend() if request.param == "memory" else MongoBackend(database)
+
+
+@pytest.mark.anyio
+async def test_burst_then_retry_after(backend):
+    limit = Limit(3, 60)
+    assert [await backend.take("key", limit) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    retry_after = await backend.take("key", limit)
+    assert 19 < retry_after <= 20  # one token every 20s
+    assert await backend.take("other", limit) == 0.0
+
+
+@pytest.mark.anyio
+async def test_refill(backend, monkeypatch):
+    clock = Clock(monkeypatch)
+    limit = Limit(2, 10)
+    await backend.take("key", limit)
+    await backend.take("key", limit)
+    assert await backend.take("key", limit) > 0
+
+    clock.advance(5)
+    assert await backend.take("key", limit) == 0.0
+    assert await backend.take("key", limit) > 0
+
+    clock.advance(60)  # refills to capacity, never above
+    assert [await backend.take("key", limit) for _ in range(3)][-1] > 0
+
+
+@pytest.mark.anyio
+async def test_memory_backend_forgets_full_buckets(monkeypatch):
+    clock = Clock(monkeypatch)
+    backend = MemoryBackend(max_keys=2)
+    limit = Limit(1, 10)
+    await backend.take("a", limit)
+    clock.advance(11)
+    await backend.take("b", limit)
+    assert len(backend) == 1  # "a" was full again
+
+    await backend.take("c", limit)
+    await backend.take("d", limit)
+    assert len(backend) == 2 and backend.evictions == 1
+
+
+@pytest.mark.anyio
+async def test_email_key_is_case_insensitive():
+    limiter = RateLimiter(MemoryBackend(), {"login": {"email": Limit(1, 60)}})
+    await limiter.check("login", "10.0.0.1", "Student@Example.com")
+    with pytest.raises(RateLimited):
+        await limiter.check("login", "10.0.0.2", "student@example.COM")
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.anyio
+async def test_rejected_ip_does_not_charge_email():
+    limits = {"login": {"ip": Limit(1, 60), "email": Limit(1, 60)}}
+    limiter = RateLimiter(MemoryBackend(), limits)
+    await limiter.check("login", "10.0.0.1", "a@example.com")
+    with pytest.raises(RateLimited):
+        await limiter.check("login", "10.0.0.1", "b@example.com")
+    await limiter.check("login", "10.0.0.2", "b@example.com")
+
+
+def test_retry_after_header_rounds_up():
+    assert RateLimited(0.2).retry_after_header == "1"
+    assert RateLimited(19.01).retry_after_header == "20"
+
+
+def request_from(peer, forwarded=None):
+    headers = {"x-forwarded-for": forwarded} if forwarded else {}
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host=peer))
+
+
+def test_client_ip_ignores_forwarded_for_without_proxies():
+    assert client_ip(request_from("10.0.0.9", "1.2.3.4"), trusted_proxies=0) == "10.0.0.9"
+
+
+def test_client_ip_takes_hops_from_the_right():
+    forged = request_from("10.0.0.9", "6.6.6.6, 1.2.3.4")
+    assert client_ip(forged, trusted_proxies=1) == "1.2.3.4"
+
+    two_proxies = request_from("10.0.0.9", "6.6.6.6, 1.2.3.4, 10.0.0.5")
+    assert client_ip(two_proxies, trusted_proxies=2) == "1.2.3.4"
+
+
+def test_client_ip_short_header_falls_back_to_peer():
+    assert client_ip(request_from("10.0.0.9", "1.2.3.4"), trusted_proxies=2) == "10.0.0.9"
+    assert client_ip(request_from("10.0.0.9"), trusted_proxies=1) == "10.0.0.9"
+
+
+def test_login_is_throttled_with_retry_after(client, monkeypatch):
+    register(client, "throttled@example.com")
+    monkeypatch.setattr(rate_limit.rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limit.rate_limiter, "limits", {"login": {"email": Limit(2, 60)}})
+
+    attempt = {"email": "Throttled@example.com", "password": "wrong-password"}
+    assert [client.post("/api/auth/login", json=attempt).status_code for _ in range(2)] == [401, 401]
+
+    response = client.post("/api/auth/login", json={**attempt, "password": "secret1"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+
+def test_register_is_throttled_per_email(client, monkeypatch):
+    assert "email" in rate_limit.LIMITS["register"]
+    monkeypatch.setattr(rate_limit.rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limit.rate_limiter, "limits", {"register": {"email": Limit(1, 60)}})
+
+    register(client, "signup@example.com")
+    response = client.post(
+        "/api/auth/register", json={"name": "Student", "email": "SignUp@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 429
+
+
+@pytest.mark.anyio
+async def test_mongo_backend_retries_a_lost_first_hit_race(database, monkeypatch):
+    backend = MongoBackend(database)
+    collection = database[MongoBackend.collection_name]
+    real_find_one_and_update = collection.find_one_and_update
+    upserts = []
+
+    async def racing_find_one_and_update(*args, upsert=False, **kwargs):
+        if upsert:
+            upserts.append(1)
+            # A concurrent first attempt inserts the bucket and wins the race
+            await real_find_one_and_update(*args, upsert=True, **kwargs)
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return await real_find_one_and_update(*args, **kwargs)
+
+    monkeypatch.setattr(collection, "find_one_and_update", racing_find_one_and_update)
+    monkeypatch.setattr(backend, "_collection", lambda: collection)
+
+    limit = Limit(2, 60)
+    assert await backend.take("key", limit) == 0.0
+    assert await backend.take("key", limit) > 0  # both attempts took a token
+    assert len(upserts) == 2
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from fastapi import Request, Response
+
+import app.database as database_module
+from app import response_cache as response_cache_module
+from app.response_cache import KVBackend, LocalKV, MemoryBackend, ResponseCache
+from app.versions import bump_data_version, read_through
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["memory", "kv"])
+def cache(request):
+    if request.param == "memory":
+        return ResponseCache(MemoryBackend(maxsize=16, ttl=60))
+    return ResponseCache(KVBackend(LocalKV(), ttl=60))
+
+
+async def test_local_kv(monkeypatch):
+    kv = LocalKV()
+    await kv.set("a", b"1", ex=5)
+    await kv.set("b", b"2")
+    assert await kv.mget(["a", "b", "c"]) == [b"1", b"2", None]
+    assert [await kv.incr("n"), await kv.incr("n")] == [1, 2]
+
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: real_monotonic() + 10)
+    assert await kv.get("a") is None
+    assert await kv.get("b") == b"2"
+
+    await kv.delete("b")
+    assert await kv.get("b") is None
+
+
+async def test_put_then_hit(cache):
+    token, hit = await cache.get("u1", "subjects")
+    assert hit is None
+    assert await cache.put("u1", token, 3, "subjects", [{"name": "Maths"}])
+
+    token, hit = await cache.get("u1", "subjects")
+    assert hit == (3, [{"name": "Maths"}])
+    assert await cache.put("u1", token, 3, "stats:s1", {"total": 1})
+    assert (await cache.get("u1", "subjects"))[1] == (3, [{"name": "Maths"}])
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+async def test_new_version_replaces_bodies(cache):
+    token, _ = await cache.get("u1", "subjects")
+    await cache.put("u1", token, 3, "subjects", ["old"])
+    await cache.put("u1", token, 4, "stats:s1", {"total": 1})
+    assert (await cache.get("u1", "subjects"))[1] is None
+    assert (await cache.get("u1", "stats:s1"))[1] == (4, {"total": 1})
+
+
+async def test_put_after_invalidation_is_dropped(cache):
+    token, _ = await cache.get("u1", "subjects")
+    # A write lands while the body for the old version is being loaded
+    await cache.invalidate("u1")
+
+    await cache.put("u1", token, 3, "subjects", ["stale"])
+    token, hit = await cache.get("u1", "subjects")
+    assert hit is None
+
+    assert await cache.put("u1", token, 4, "subjects", ["fresh"])
+    assert (await cache.get("u1", "subjects"))[1] == (4, ["fresh"])
+
+
+async def test_dropped_put_leaves_the_cached_entry_untouched(cache):
+    stale_token, _ = await cache.get("u1", "stats:s1")
+    await cache.invalidate("u1")
+    token, _ = await cache.get("u1", "subjects")
+    assert await cache.put("u1", token, 3, "subjects", ["fresh"])
+
+    assert not await cache.put("u1", stale_token, 3, "stats:s1", {"total": 0})
+    assert (await cache.get("u1", "stats:s1"))[1] is None
+    assert (await cache.get("u1", "subjects"))[1] == (3, ["fresh"])
+
+async def test_invalidation_is_per_user(cache):
+    token, _ = await cache.get("u1", "subjects")
+    await cache.invalidate("u2")
+    await cache.put("u1", token, 3, "subjects", ["kept"])
+    assert (await cache.get("u1", "subjects"))[1] == (3, ["kept"])
+
+
+async def test_memory_backend_forgets_old_invalidations_safely():
+    cache = ResponseCache(MemoryBackend(maxsize=2, ttl=60))
+    token, _ = await cache.get("u1", "subjects")
+    for user_id in ("u1", "u2", "u3"):
+        await cache.invalidate(user_id)
+    # u1's invalidation was folded into the floor, which still rejects the put
+    assert not await cache.put("u1", token, 3, "subjects", ["stale"])
+
+
+@pytest.fixture
+async def user_id(database, monkeypatch):
+    monkeypatch.setattr(database_module, "database", database)
+    return str((await database["users"].insert_one({"data_version": 7})).inserted_id)
+
+
+def get_request(path: str = "/api/subjects/") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+async def test_read_through_drops_body_loaded_across_a_write(user_id, cache, monkeypatch):
+    import app.versions as versions
+    monkeypatch.setattr(versions, "response_cache", cache)
+
+    async def load_racing_a_write():
+        await bump_data_version(user_id)
+        return ["loaded at version 7"]
+
+    _, body = await read_through(get_request(), Response(), user_id, "subjects", load_racing_a_write)
+    assert body == ["loaded at version 7"]
+    assert (await cache.get(user_id, "subjects"))[1] is None
+
+    async def load():
+        return ["loaded at version 8"]
+
+    await read_through(get_request(), Response(), user_id, "subjects", load)
+    response = Response()
+    cached, body = await read_through(get_request(), response, user_id, "subjects", None)
+    assert cached is None and body == ["loaded at version 8"]
+    assert response.headers["ETag"].startswith('W/"8-')
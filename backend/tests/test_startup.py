@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def modules_after_import(statement: str, modules: list) -> dict:
+    """Import in a fresh interpreter (this one already has everything loaded)."""
+    script = f"import sys\n{statement}\nprint(*[name in sys.modules for name in {modules!r}])"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND, env=os.environ.copy(),
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return dict(zip(modules, [value == "True" for value in output]))
+
+
+@pytest.mark.parametrize("module", ["msgpack", "brotli", "motor", "jwt", "passlib"])
+def test_app_import_defers_optional_and_auth_modules(module):
+    assert modules_after_import("import app.main", [module]) == {module: False}
+
+
+def test_models_do_not_import_email_validator():
+    loaded = modules_after_import("import app.models", ["email_validator", "app.routes.auth"])
+    assert loaded == {"email_validator": False, "app.routes.auth": False}
@@ -0,0 +1,47 @@
+import time
+
+from conftest import register
+
+
+def create(client, headers, name, color=None) -> dict:
+    response = client.post("/api/subjects/", json={"name": name, "color": color}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_subjects_are_scoped_to_their_user(client, auth_headers):
+    create(client, auth_headers, "Maths")
+    other = register(client, "other@example.com")
+    assert client.get("/api/subjects/", headers=other).json() == []
+    assert [subject["name"] for subject in client.get("/api/subjects/", headers=auth_headers).json()] == ["Maths"]
+
+
+def test_subject_list_revalidates_until_a_write(client, auth_headers):
+    create(client, auth_headers, "Maths", "#000000")
+    etag = client.get("/api/subjects/", headers=auth_headers).headers["ETag"]
+    assert client.get("/api/subjects/", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    create(client, auth_headers, "Physics")
+    response = client.get("/api/subjects/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200 and len(response.json()) == 2
+
+
+def test_delete_hides_the_subject_and_removes_its_records(client, auth_headers):
+    subject = create(client, auth_headers, "History")
+    for day in range(1, 6):
+        client.post("/api/attendance/", json={
+            "subject_id": subject["id"], "date": f"2024-01-0{day}", "status": "present"
+        }, headers=auth_headers)
+
+    response = client.delete(f"/api/subjects/{subject['id']}", headers=auth_headers)
+    assert response.status_code == 202
+    assert client.get("/api/subjects/", headers=auth_headers).json() == []
+    assert client.get("/api/attendance/", headers=auth_headers).json() == []
+
+    deadline = time.monotonic() + 5
+    while True:
+        job = client.get(f"/api/subjects/{subject['id']}/deletion", headers=auth_headers).json()
+        if job["status"] == "done" or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert (job["status"], job["deleted_records"]) == ("done", 5)
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+import app.database as database_module
+from app import write_behind as write_behind_module
+from app.attendance_store import get_attendance_store
+from app.write_behind import WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+ZERO = {"present": 0, "absent": 0, "leave": 0, "total": 0}
+
+
+@pytest.fixture
+async def setup(database, monkeypatch):
+    monkeypatch.setattr(database_module, "database", database)
+    user_id = (await database["users"].insert_one({"email": "wb@example.com", "data_version": 0})).inserted_id
+    subject_id = (await database["subjects"].insert_one({"user_id": str(user_id), "counts": dict(ZERO)})).inserted_id
+    return database, str(user_id), str(subject_id)
+
+
+def fail_once(monkeypatch, name: str):
+    real = getattr(write_behind_module, name)
+    calls = []
+
+    async def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError(f"{name} failed")
+        return await real(*args, **kwargs)
+
+    monkeypatch.setattr(write_behind_module, name, flaky)
+    return calls
+
+
+async def counts(database, subject_id) -> dict:
+    return (await database["subjects"].find_one({"_id": ObjectId(subject_id)}))["counts"]
+
+
+async def data_version(database, user_id) -> int:
+    return (await database["users"].find_one({"_id": ObjectId(user_id)}))["data_version"]
+
+
+async def test_coalesced_marks_are_written_once(setup):
+    database, user_id, subject_id = setup
+    buffer = WriteBehindBuffer(database)
+    for status in ("present", "absent", "leave"):
+        buffer.add(user_id, subject_id, "2024-01-01", status)
+
+    await buffer.flush_user(user_id)
+    assert await counts(database, subject_id) == {**ZERO, "leave": 1, "total": 1}
+    assert buffer.stats()["coalesced"] == 2 and buffer.stats()["written"] == 1
+    assert await data_version(database, user_id) == 1
+
+
+async def test_counter_failure_retries_only_the_deltas(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    buffer = WriteBehindBuffer(database)
+    fail_once(monkeypatch, "apply_counter_deltas")
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    buffer.add(user_id, subject_id, "2024-01-02", "absent")
+    await buffer.flush_user(user_id)
+
+    assert await counts(database, subject_id) == ZERO
+    assert buffer.stats()["pending"] == 0 and buffer.stats()["owed_counters"] == 1
+    assert await get_attendance_store(database).count_statuses(user_id, subject_id) == {
+        **ZERO, "present": 1, "absent": 1, "total": 2
+    }
+
+    # A toggle buffered before the retry is diffed against the written record
+    buffer.add(user_id, subject_id, "2024-01-01", "absent")
+    await buffer.flush_user(user_id)
+
+    assert await counts(database, subject_id) == {**ZERO, "absent": 2, "total": 2}
+    assert buffer.stats()["owed_counters"] == 0
+    assert await data_version(database, user_id) == 1
+
+
+async def test_owed_deltas_are_retried_without_new_marks(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    buffer = WriteBehindBuffer(database)
+    fail_once(monkeypatch, "apply_counter_deltas")
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    await buffer.flush()
+    await buffer.flush()
+
+    assert await counts(database, subject_id) == {**ZERO, "present": 1, "total": 1}
+    assert await data_version(database, user_id) == 1
+
+
+async def test_version_bump_failure_does_not_apply_counters_twice(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    buffer = WriteBehindBuffer(database)
+    fail_once(monkeypatch, "bump_data_version")
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    await buffer.flush_user(user_id)
+    assert await data_version(database, user_id) == 0
+
+    await buffer.flush_user(user_id)
+    assert await counts(database, subject_id) == {**ZERO, "present": 1, "total": 1}
+    assert await data_version(database, user_id) == 1
+
+
+async def test_store_failure_requeues_the_marks(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    buffer = WriteBehindBuffer(database)
+    store = get_attendance_store(database)
+    real_bulk_upsert = store.bulk_upsert
+    calls = []
+
+    async def flaky_bulk_upsert(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("bulk_upsert failed")
+        return await real_bulk_upsert(*args)
+
+    monkeypatch.setattr(store, "bulk_upsert", flaky_bulk_upsert)
+    monkeypatch.setattr(write_behind_module, "get_attendance_store", lambda database: store)
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    await buffer.flush_user(user_id)
+    assert buffer.stats()["pending"] == 1 and buffer.stats()["failed_flushes"] == 1
+
+    # A newer mark buffered before the retry wins over the requeued one
+    buffer.add(user_id, subject_id, "2024-01-01", "leave")
+    await buffer.flush_user(user_id)
+    assert await counts(database, subject_id) == {**ZERO, "leave": 1, "total": 1}
+
+
+def slow_store(monkeypatch, database, started: asyncio.Event):
+    store = get_attendance_store(database)
+    real_bulk_upsert = store.bulk_upsert
+
+    async def slow_bulk_upsert(*args):
+        started.set()
+        await asyncio.sleep(0.05)
+        return await real_bulk_upsert(*args)
+
+    monkeypatch.setattr(store, "bulk_upsert", slow_bulk_upsert)
+    monkeypatch.setattr(write_behind_module, "get_attendance_store", lambda database: store)
+
+
+async def test_stop_mid_flush_drains_the_buffer(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    started = asyncio.Event()
+    slow_store(monkeypatch, database, started)
+    buffer = WriteBehindBuffer(flush_ms=10)
+    await buffer.start(database)
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    await started.wait()
+    buffer.add(user_id, subject_id, "2024-01-02", "absent")
+    await buffer.stop()
+
+    assert buffer.stats()["pending"] == 0
+    assert await counts(database, subject_id) == {"present": 1, "absent": 1, "leave": 0, "total": 2}
+    assert await database["attendance"].count_documents({}) == 2
+
+
+async def test_cancelled_flush_requeues_the_marks(setup, monkeypatch):
+    database, user_id, subject_id = setup
+    started = asyncio.Event()
+    slow_store(monkeypatch, database, started)
+    buffer = WriteBehindBuffer(database)
+
+    buffer.add(user_id, subject_id, "2024-01-01", "present")
+    flush = asyncio.create_task(buffer.flush_user(user_id))
+    await started.wait()
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+    assert buffer.stats()["pending"] == 1
+
+    await buffer.flush_user(user_id)
+    assert await counts(database, subject_id) == {**ZERO, "present": 1, "total": 1}